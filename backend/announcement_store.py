@@ -0,0 +1,138 @@
+"""
+Indexed in-memory store for announcements.
+
+Announcements live in an id → dict map. Secondary indexes keep, per value of
+`ann_status`, `category`, `region` and per enabled channel, a sorted list of
+ids. Ids are assigned in creation order and `date` is stamped at creation and
+never edited, so id order is date order and every index is newest-last; a new
+announcement is an append and a status toggle is two bisects.
+
+A listing with filters walks the smallest matching index newest-first and
+checks the remaining filters on each record, so its cost follows the size of
+the result rather than of the history.
+"""
+
+import bisect
+import threading
+from typing import Iterable, Iterator
+
+INDEXED_FIELDS = ("ann_status", "category", "region")
+
+
+class AnnouncementStore:
+    """Thread-safe. Records are returned by reference — change them only
+    through update(), which keeps the indexes in step."""
+
+    def __init__(self, announcements: Iterable[dict] = ()):
+        self._by_id: dict[int, dict] = {}
+        self._index: dict[tuple[str, str], list[int]] = {}   # (field, value) → sorted ids
+        self._lock = threading.Lock()
+        self._next_id = 1
+        for ann in sorted(announcements, key=lambda a: (a["date"], a["id"])):
+            self._insert(ann)
+            self._next_id = max(self._next_id, ann["id"] + 1)
+
+    # ── index maintenance ──
+
+    @staticmethod
+    def _keys(ann: dict) -> set[tuple[str, str]]:
+        keys = {(field, ann.get(field, "")) for field in INDEXED_FIELDS}
+        keys.update(("channel", ch) for ch, on in (ann.get("channels") or {}).items() if on)
+        return keys
+
+    def _index_add(self, key: tuple[str, str], ann_id: int):
+        ids = self._index.setdefault(key, [])
+        if not ids or ids[-1] < ann_id:
+            ids.append(ann_id)
+        else:
+            bisect.insort(ids, ann_id)
+
+    def _index_remove(self, key: tuple[str, str], ann_id: int):
+        ids = self._index[key]
+        del ids[bisect.bisect_left(ids, ann_id)]
+        if not ids:
+            del self._index[key]
+
+    def _insert(self, ann: dict):
+        self._by_id[ann["id"]] = ann
+        for key in self._keys(ann):
+            self._index_add(key, ann["id"])
+
+    # ── CRUD ──
+
+    def __len__(self) -> int:
+        return len(self._by_id)
+
+    def get(self, ann_id: int) -> dict | None:
+        return self._by_id.get(ann_id)
+
+    def add(self, ann: dict) -> dict:
+        """Store a new announcement under the next id; returns the stored record."""
+        with self._lock:
+            ann = {"id": self._next_id, **ann}
+            self._next_id += 1
+            self._insert(ann)
+        return ann
+
+    def update(self, ann_id: int, changes: dict) -> dict | None:
+        with self._lock:
+            ann = self._by_id.get(ann_id)
+            if ann is None:
+                return None
+            before = self._keys(ann)
+            ann.update(changes)
+            after = self._keys(ann)
+            for key in before - after:
+                self._index_remove(key, ann_id)
+            for key in after - before:
+                self._index_add(key, ann_id)
+        return ann
+
+    def delete(self, ann_id: int) -> bool:
+        with self._lock:
+            ann = self._by_id.pop(ann_id, None)
+            if ann is None:
+                return False
+            for key in self._keys(ann):
+                self._index_remove(key, ann_id)
+        return True
+
+    # ── listing ──
+
+    def list(
+        self,
+        *,
+        status: str | None = None,
+        channel: str | None = None,
+        category: str | None = None,
+        region: str | None = None,
+    ) -> list[dict]:
+        """Announcements matching every given filter, newest first."""
+        wanted = [
+            key for key in (("ann_status", status), ("channel", channel),
+                            ("category", category), ("region", region))
+            if key[1]
+        ]
+        with self._lock:
+            if not wanted:
+                ids: Iterator[int] = reversed(self._by_id.keys())
+                rest = []
+            else:
+                lists = sorted((self._index.get(key, []) for key in wanted), key=len)
+                if not lists[0]:
+                    return []
+                ids = reversed(lists[0])
+                rest = [key for key in wanted if self._index.get(key) is not lists[0]]
+            out = []
+            for ann_id in ids:
+                ann = self._by_id[ann_id]
+                if all(self._matches(ann, key) for key in rest):
+                    out.append(ann)
+        return out
+
+    @staticmethod
+    def _matches(ann: dict, key: tuple[str, str]) -> bool:
+        field, value = key
+        if field == "channel":
+            return bool((ann.get("channels") or {}).get(value, False))
+        return ann.get(field, "") == value
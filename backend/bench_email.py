@@ -0,0 +1,310 @@
+"""
+Load-tests email fan-out (announcements and VC alert rules) against the
+in-process SMTP stand-in — no mail relay or network access needed.
+Run:  python backend/bench_email.py --out bench_email.json
+      python backend/bench_email.py --announcements 500 --recipients 200 --vc-rules 2000
+      python backend/bench_email.py --latency 0.02 --temp-fail-rate 0.05 --drop-rate 0.01
+
+The stand-in starts on a free local port and the SMTP_* settings point at it
+before main is imported, so the real delivery pipeline (queue, connection
+pool, batching, retry outbox) does the sending. State goes to a throwaway
+OBS_STATE_DB. Two scenarios run in turn:
+
+  announcements  POST-equivalent create_announcement() calls, each emailing
+                 --recipients addresses, submitted as fast as possible
+  vc_rules       --vc-rules View Central rules over random scopes, each with a
+                 few recipients from a shared pool, then one full evaluation
+                 pass (grouped scopes, coalescing per recipient, delivery)
+
+Reports messages/sec, recipients/sec, end-to-end latency percentiles (submit →
+accepted by the stand-in), pipeline latency and queue growth (peak depth and a
+sampled timeline). Results go to --out as JSON (stdout if omitted); a summary
+is printed to stderr.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+logging.disable(logging.ERROR)   # injected faults would flood stderr
+
+from smtp_standin import SMTPStandIn  # noqa: E402
+
+QUEUE_SAMPLE_INTERVAL = 0.01   # seconds
+TIMELINE_POINTS = 200
+
+
+# ── measurement ───────────────────────────────────────────────────────────────
+
+def _pct(sorted_vals: list[float], p: float) -> float | None:
+    if not sorted_vals:
+        return None
+    idx = min(len(sorted_vals) - 1, max(0, round(p / 100 * (len(sorted_vals) - 1))))
+    return round(sorted_vals[idx], 2)
+
+
+def _latency_summary(samples_ms: list[float]) -> dict:
+    samples_ms = sorted(samples_ms)
+    return {
+        "n": len(samples_ms),
+        "p50_ms": _pct(samples_ms, 50),
+        "p95_ms": _pct(samples_ms, 95),
+        "p99_ms": _pct(samples_ms, 99),
+        "max_ms": round(samples_ms[-1], 2) if samples_ms else None,
+        "mean_ms": round(statistics.fmean(samples_ms), 2) if samples_ms else None,
+    }
+
+
+class QueueSampler:
+    """Samples pipeline queue depth and in-flight count on a background thread."""
+
+    def __init__(self, main):
+        self.main = main
+        self.samples: list[tuple[float, int, int]] = []   # (t, queued, in_flight)
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._t0 = time.perf_counter()
+
+    def _run(self):
+        while not self._stop.is_set():
+            m = self.main
+            queued = m._email_queue.qsize() if m._email_queue is not None else 0
+            self.samples.append((time.perf_counter() - self._t0, queued, m._email_metrics["in_flight"]))
+            self._stop.wait(QUEUE_SAMPLE_INTERVAL)
+
+    def __enter__(self) -> "QueueSampler":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+
+    def summary(self) -> dict:
+        if not self.samples:
+            return {"peak_queued": 0, "peak_in_flight": 0, "timeline": []}
+        step = max(1, len(self.samples) // TIMELINE_POINTS)
+        return {
+            "peak_queued": max(q for _, q, _ in self.samples),
+            "peak_in_flight": max(f for _, _, f in self.samples),
+            "timeline": [
+                {"t_s": round(t, 3), "queued": q, "in_flight": f} for t, q, f in self.samples[::step]
+            ],
+        }
+
+
+def _pipeline_snapshot(main) -> dict:
+    m = main._email_pipeline_metrics()
+    return {k: m[k] for k in ("enqueued", "sent", "errors", "rejected", "deferred", "dead_lettered",
+                              "connections_opened", "reconnects", "batches")}
+
+
+def _delta(after: dict, before: dict) -> dict:
+    return {k: after[k] - before[k] for k in after}
+
+
+def _drain(main, server: SMTPStandIn, expected: int, timeout: float):
+    """Wait until the stand-in has `expected` messages and the pipeline is idle."""
+    server.wait_for(expected, timeout)
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        idle = (main._email_queue is None or main._email_queue.empty()) and main._email_metrics["in_flight"] == 0
+        if idle:
+            return
+        time.sleep(0.01)
+
+
+def _result(name: str, main, server: SMTPStandIn, submitted: dict[str, float], t0: float,
+            submit_s: float, before: dict, sampler: QueueSampler, extra: dict) -> dict:
+    accepted = [m for m in server.messages if m.subject in submitted]
+    e2e = [(m.received_at - submitted[m.subject]) * 1000 for m in accepted]
+    wall = (max(m.received_at for m in accepted) - t0) if accepted else 0.0
+    recipients = sum(len(m.rcpt_to) for m in accepted)
+    pipeline = _delta(_pipeline_snapshot(main), before)
+    return {
+        "scenario": name,
+        **extra,
+        "messages_submitted": len(submitted),
+        "messages_delivered": len(accepted),
+        "recipients_delivered": recipients,
+        "submit_s": round(submit_s, 3),
+        "wall_s": round(wall, 3),
+        "messages_per_s": round(len(accepted) / wall, 1) if wall else None,
+        "recipients_per_s": round(recipients / wall, 1) if wall else None,
+        "e2e_latency": _latency_summary(e2e),
+        "pipeline": pipeline,
+        "standin": {k: v for k, v in vars(server.stats).items() if k != "by_connection"},
+        "queue": sampler.summary(),
+    }
+
+
+# ── scenarios ─────────────────────────────────────────────────────────────────
+
+def bench_announcements(main, server: SMTPStandIn, n: int, recipients: int, timeout: float) -> dict:
+    server.reset()
+    before = _pipeline_snapshot(main)
+    submitted: dict[str, float] = {}
+    with QueueSampler(main) as sampler:
+        t0 = time.perf_counter()
+
+        async def submit():
+            for i in range(n):
+                title = f"bench-announcement-{i}"
+                payload = main.AnnouncementCreate(
+                    title=title,
+                    description=f"Load-test announcement {i}",
+                    channels={"email": True},
+                    email_recipients=[f"user{i}-{j}@bench.local" for j in range(recipients)],
+                )
+                submitted[f"[Announcement] {title}"] = time.perf_counter()
+                await main.create_announcement(payload)
+
+        asyncio.run(submit())
+        submit_s = time.perf_counter() - t0
+        _drain(main, server, n, timeout)
+    return _result("announcements", main, server, submitted, t0, submit_s, before, sampler,
+                   {"announcements": n, "recipients_each": recipients})
+
+
+def bench_vc_rules(main, server: SMTPStandIn, n_rules: int, recipient_pool: int, per_rule: int,
+                   seed: int, timeout: float) -> dict:
+    rng = random.Random(seed)
+    apps = main._get_enriched_apps()
+    lobs = sorted({a["lob"] for a in apps if a.get("lob")})
+    seals = [a["seal"] for a in apps]
+    view = "bench-view"
+    main._vc_notifications.pop(view, None)
+    for i in range(n_rules):
+        kind = rng.random()
+        if kind < 0.2:
+            scope = {}
+        elif kind < 0.5:
+            scope = {"lob": [rng.choice(lobs)]}
+        else:
+            scope = {"seal": rng.sample(seals, rng.randint(1, 5))}
+        main.create_vc_notification(view, main.VCNotificationCreate(
+            name=f"bench-rule-{i}",
+            alert_types=["critical", "warning", "slo"],
+            channels={"email": True},
+            email_recipients=[f"oncall{j}@bench.local" for j in rng.sample(range(recipient_pool), per_rule)],
+            view_filters=scope,
+        ))
+
+    server.reset()
+    before = _pipeline_snapshot(main)
+    submitted: dict[str, float] = {}
+    real_send = main.send_email_async
+
+    async def timed_send(recipients, subject, html_body, plain_body=""):
+        # Subjects repeat across recipient groups — tag each send so it can be matched
+        subject = f"{subject} #{len(submitted)}"
+        submitted[subject] = time.perf_counter()
+        return await real_send(recipients, subject, html_body, plain_body)
+
+    main.send_email_async = timed_send
+    try:
+        with QueueSampler(main) as sampler:
+            t0 = time.perf_counter()
+            asyncio.run(main._evaluate_all_notifications())
+            cycle_s = time.perf_counter() - t0
+            _drain(main, server, len(submitted), timeout)
+    finally:
+        main.send_email_async = real_send
+        for notif in main._vc_notifications.pop(view, []):
+            main._forget_vc_alerts(notif["id"])
+        main._index_vc_rules()
+    return _result("vc_rules", main, server, submitted, t0, cycle_s, before, sampler,
+                   {"rules": n_rules, "recipient_pool": recipient_pool, "recipients_per_rule": per_rule,
+                    "evaluation_cycle_s": round(cycle_s, 3)})
+
+
+# ── CLI ───────────────────────────────────────────────────────────────────────
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--announcements", type=int, default=200)
+    parser.add_argument("--recipients", type=int, default=100, help="Recipients per announcement")
+    parser.add_argument("--vc-rules", type=int, default=1000)
+    parser.add_argument("--recipient-pool", type=int, default=2000, help="Distinct VC rule recipients")
+    parser.add_argument("--recipients-per-rule", type=int, default=3)
+    parser.add_argument("--latency", type=float, default=0.0, help="Stand-in delay per reply (s)")
+    parser.add_argument("--data-latency", type=float, default=0.0, help="Extra stand-in delay per message (s)")
+    parser.add_argument("--temp-fail-rate", type=float, default=0.0)
+    parser.add_argument("--perm-fail-rate", type=float, default=0.0)
+    parser.add_argument("--drop-rate", type=float, default=0.0)
+    parser.add_argument("--max-recipients", type=int, help="Stand-in RCPT limit per transaction")
+    parser.add_argument("--timeout", type=float, default=120.0, help="Seconds to wait for delivery per scenario")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--out", help="Write JSON results here (default: stdout)")
+    args = parser.parse_args()
+
+    server = SMTPStandIn(
+        latency=args.latency, data_latency=args.data_latency, temp_fail_rate=args.temp_fail_rate,
+        perm_fail_rate=args.perm_fail_rate, drop_rate=args.drop_rate,
+        max_recipients=args.max_recipients, seed=args.seed,
+    ).start()
+    state_dir = tempfile.TemporaryDirectory(prefix="bench_email_")
+    os.environ.update({
+        "SMTP_HOST": server.host, "SMTP_PORT": str(server.port), "SMTP_USE_TLS": "false",
+        "SMTP_USER": "bench", "SMTP_PASSWORD": "bench",
+        "OBS_STATE_DB": str(Path(state_dir.name) / "obs_state.db"),
+    })
+    import main  # noqa: E402 — reads the SMTP settings at import
+    main._init_state_store()   # outbox, VC rules and dedup tables (normally the startup hook)
+
+    results = []
+    try:
+        if args.announcements:
+            results.append(bench_announcements(main, server, args.announcements, args.recipients, args.timeout))
+        if args.vc_rules:
+            results.append(bench_vc_rules(main, server, args.vc_rules, args.recipient_pool,
+                                          args.recipients_per_rule, args.seed, args.timeout))
+    finally:
+        main._stop_email_pipeline()
+        server.stop()
+        state_dir.cleanup()
+
+    for r in results:
+        lat = r["e2e_latency"]
+        print(f"── {r['scenario']}", file=sys.stderr)
+        print(f"   delivered {r['messages_delivered']:,}/{r['messages_submitted']:,} messages "
+              f"({r['recipients_delivered']:,} recipients) in {r['wall_s']}s — "
+              f"{r['messages_per_s']} msg/s, {r['recipients_per_s']} rcpt/s", file=sys.stderr)
+        print(f"   e2e latency p50={lat['p50_ms']}ms p95={lat['p95_ms']}ms p99={lat['p99_ms']}ms max={lat['max_ms']}ms",
+              file=sys.stderr)
+        print(f"   queue peak={r['queue']['peak_queued']} in_flight peak={r['queue']['peak_in_flight']}  "
+              f"pipeline={r['pipeline']}", file=sys.stderr)
+
+    report = {
+        "meta": {
+            "timestamp": datetime.utcnow().strftime("%Y-%m-%dT%H:%M:%SZ"),
+            "python": platform.python_version(),
+            "seed": args.seed,
+            "standin": {
+                "latency": args.latency, "data_latency": args.data_latency,
+                "temp_fail_rate": args.temp_fail_rate, "perm_fail_rate": args.perm_fail_rate,
+                "drop_rate": args.drop_rate, "max_recipients": args.max_recipients,
+            },
+        },
+        "results": results,
+    }
+    if args.out:
+        Path(args.out).write_text(json.dumps(report, indent=2))
+    else:
+        print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,262 @@
+"""
+Benchmarks the knowledge-graph algorithms and endpoints on synthetic graphs.
+Run:  python backend/bench_graph.py --sizes 1000,10000,100000 --out bench_graph.json
+      python backend/bench_graph.py --sizes 1000000 --iterations 20   # ~1M edges
+
+Synthetic graphs are tiered (frontends → gateways → services → data stores) with
+preferential attachment, so a few shared components become hubs, plus a small
+share of back edges that create cycles. Components are grouped into SEALs, the
+first of which carry the registry's app SEALs so apps enrich onto the synthetic
+graph and the SEAL graph, rollup and what-if paths have real work to do. Each
+graph is loaded into the app's in-memory structures via main._reindex_graph(),
+so the real code paths run.
+
+Reports p50/p99 latency, peak allocated memory (tracemalloc) and JSON response
+size per operation. Results go to --out as JSON (stdout if omitted) so runs can
+be diffed across graph-store changes; a summary table is printed to stderr.
+"""
+
+import argparse
+import json
+import logging
+import platform
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+logging.disable(logging.WARNING)
+
+import main  # noqa: E402
+from apps_registry import APPS_REGISTRY  # noqa: E402
+from fastapi import Response  # noqa: E402
+
+TIERS = 5              # 0 = frontends … 4 = data stores
+BACK_EDGE_SHARE = 0.02  # edges pointing up a tier → cycles
+SEAL_SIZE = 12
+STATUS_WEIGHTS = (("healthy", 85), ("warning", 10), ("critical", 5))
+
+
+# ── synthetic graph ───────────────────────────────────────────────────────────
+
+def build_graph(n_edges: int, seed: int) -> dict:
+    rng = random.Random(seed)
+    n_nodes = max(60, n_edges // 4)
+    tier_of = [min(TIERS - 1, int(rng.random() ** 1.5 * TIERS)) for _ in range(n_nodes)]
+    by_tier = [[i for i in range(n_nodes) if tier_of[i] == t] for t in range(TIERS)]
+    # Preferential attachment pools: a node appears once per incoming edge (+1)
+    pools = [list(nodes) for nodes in by_tier]
+
+    edges: set[tuple[int, int]] = set()
+    attempts = 0
+    while len(edges) < n_edges and attempts < n_edges * 4:
+        attempts += 1
+        src = rng.randrange(n_nodes)
+        t = tier_of[src]
+        if rng.random() < BACK_EDGE_SHARE and t > 0:
+            dst_tier = rng.randrange(t)
+        elif t < TIERS - 1:
+            dst_tier = rng.randrange(t + 1, TIERS)
+        else:
+            dst_tier = t
+        pool = pools[dst_tier]
+        if not pool:
+            continue
+        dst = rng.choice(pool)
+        if dst == src or (src, dst) in edges:
+            continue
+        edges.add((src, dst))
+        pool.append(dst)
+
+    statuses, weights = zip(*STATUS_WEIGHTS)
+    ids = [f"svc-{i}" for i in range(n_nodes)]
+    nodes = [
+        {"id": ids[i], "label": ids[i].upper(), "status": rng.choices(statuses, weights)[0],
+         "team": "Synthetic", "sla": "99.9%", "incidents_30d": rng.randrange(5)}
+        for i in range(n_nodes)
+    ]
+    platforms = [pn["id"] for pn in main.PLATFORM_NODES]
+    app_seals = list(dict.fromkeys(app["seal"] for app in APPS_REGISTRY))
+    groups = range(0, n_nodes, SEAL_SIZE)
+    seal_ids = [app_seals[g] if g < len(app_seals) else f"S{g}" for g in range(len(groups))]
+    return {
+        "nodes": nodes,
+        "edges": [(ids[a], ids[b]) for a, b in edges],
+        "seals": {seal_ids[g]: ids[i:i + SEAL_SIZE] for g, i in enumerate(groups)},
+        "indicators": [
+            {"id": f"ind-{cid}", "label": cid, "indicator_type": "Service", "health": "green", "component": cid}
+            for cid in ids if rng.random() < 0.9
+        ],
+        "platform_edges": [(cid, rng.choice(platforms)) for cid in ids],
+    }
+
+
+def load_graph(graph: dict):
+    main.NODES[:] = graph["nodes"]
+    main.EDGES_RAW[:] = graph["edges"]
+    main.INDICATOR_NODES[:] = graph["indicators"]
+    main.COMPONENT_PLATFORM_EDGES[:] = graph["platform_edges"]
+    main.SEAL_COMPONENTS.clear()
+    main.SEAL_COMPONENTS.update(graph["seals"])
+    main._reindex_graph()
+
+
+# ── measurement ───────────────────────────────────────────────────────────────
+
+def _pct(sorted_vals: list[float], p: float) -> float:
+    idx = min(len(sorted_vals) - 1, max(0, round(p / 100 * (len(sorted_vals) - 1))))
+    return sorted_vals[idx]
+
+
+def measure(fn, args_list: list, mem_samples: int = 3) -> dict:
+    timings = []
+    size = 0
+    for args in args_list:
+        t0 = time.perf_counter()
+        result = fn(*args)
+        timings.append((time.perf_counter() - t0) * 1000)
+        if result is not None:
+            size = max(size, len(json.dumps(result, default=str)))
+    peak = 0
+    for args in args_list[:mem_samples]:
+        tracemalloc.start()
+        fn(*args)
+        peak = max(peak, tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+    timings.sort()
+    return {
+        "n": len(timings),
+        "p50_ms": round(_pct(timings, 50), 3),
+        "p99_ms": round(_pct(timings, 99), 3),
+        "mean_ms": round(statistics.fmean(timings), 3),
+        "peak_kb": round(peak / 1024, 1),
+        "resp_bytes": size,
+    }
+
+
+def _flip_status(cid: str, rng: random.Random):
+    current = main.NODE_MAP[cid]["status"]
+    main._set_component_status(cid, rng.choice([s for s in ("critical", "warning", "healthy") if s != current]))
+
+
+def _uncached_dependency_layout(cid: str):
+    with main._layout_lock:
+        main._layout_cache.clear()
+    return main.get_dependencies(cid, layout=True)["layout"]
+
+
+def _uncached_seal_graph():
+    main._seal_graph_cache = None
+    return main.get_seal_graph()
+
+
+def _uncached_root_causes():
+    main._root_cause_cache = None
+    return main._rank_root_causes(None, limit=10)
+
+
+def bench_size(n_edges: int, iterations: int, seed: int) -> dict:
+    rng = random.Random(seed)
+    t0 = time.perf_counter()
+    graph = build_graph(n_edges, seed)
+    gen_s = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    load_graph(graph)
+    index_s = time.perf_counter() - t0
+
+    ids = list(main.NODE_MAP)
+    hubs = sorted(ids, key=lambda i: len(main.reverse_adj[i]), reverse=True)[:max(1, iterations // 4)]
+    # Mix of random nodes and hubs — hub blast radii are the expensive case
+    sample = [rng.choice(ids) for _ in range(iterations - len(hubs))] + hubs
+    seals = list(main.SEAL_COMPONENTS)
+    pairs = [(rng.choice(ids), rng.choice(hubs)) for _ in range(iterations)]
+    platforms = [pn["id"] for pn in main.PLATFORM_NODES]
+    main._get_enriched_apps()   # what-if and rollups read the enrichment snapshot
+
+    ops = {
+        "bfs_forward": measure(lambda cid: main.bfs(cid, main.forward_adj), [(c,) for c in sample]),
+        "bfs_reverse": measure(lambda cid: main.bfs(cid, main.reverse_adj), [(c,) for c in sample]),
+        "get_dependencies": measure(lambda cid: main.get_dependencies(cid, layout=False), [(c,) for c in sample]),
+        "get_blast_radius": measure(
+            lambda cid: main.get_blast_radius(cid, rollup=False, layout=False), [(c,) for c in sample],
+        ),
+        "get_blast_radius_rollup": measure(
+            lambda cid: main.get_blast_radius(cid, rollup=True, layout=False), [(c,) for c in sample],
+        ),
+        "get_graph_layers": measure(main.get_graph_layers, [(rng.choice(seals),) for _ in range(iterations)]),
+        "layered_layout_dependencies": measure(_uncached_dependency_layout, [(c,) for c in sample[:max(3, iterations // 4)]]),
+        "node_search": measure(
+            lambda q: main.get_all_nodes(Response(), q=q, match="substring", seal=None, status=None,
+                                         indicator_type=None, fields="id,label,status", limit=50, offset=0),
+            [(rng.choice(ids)[rng.randrange(3):][:6],) for _ in range(iterations)],
+        ),
+        "get_graph_path": measure(
+            lambda a, b: main.get_graph_path(a, b, mode="shortest", k=5, max_length=10, max_paths=100), pairs,
+        ),
+        "seal_graph_build": measure(_uncached_seal_graph, [() for _ in range(max(3, iterations // 10))]),
+        "seal_graph_traversal": measure(
+            lambda seal: main.get_seal_graph_traversal(seal, direction="both"),
+            [(rng.choice(seals),) for _ in range(iterations)],
+        ),
+        "what_if_platform": measure(
+            lambda plat: main.what_if(main.WhatIfScenario(failed_platforms=[plat])),
+            [(rng.choice(platforms),) for _ in range(iterations)],
+        ),
+        "what_if_sweep_datacenters": measure(
+            lambda: main.what_if_batch(main.WhatIfBatchRequest(sweep="datacenters")),
+            [() for _ in range(max(3, iterations // 10))],
+        ),
+        "status_propagation_incremental": measure(lambda cid: _flip_status(cid, rng), [(c,) for c in sample]),
+        "root_cause_ranking": measure(_uncached_root_causes, [() for _ in range(max(3, iterations // 10))]),
+        "status_propagation_full": measure(main._index_status_propagation, [() for _ in range(max(3, iterations // 10))]),
+    }
+    return {
+        "edges": len(main.EDGES_RAW),
+        "nodes": len(main.NODES),
+        "sccs": len(main._scc_members),
+        "largest_scc": max(len(m) for m in main._scc_members),
+        "generate_s": round(gen_s, 3),
+        "index_s": round(index_s, 3),
+        "ops": ops,
+    }
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="1000,10000,100000", help="Comma-separated edge counts")
+    parser.add_argument("--iterations", type=int, default=100, help="Samples per operation")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--out", help="Write JSON results here (default: stdout)")
+    args = parser.parse_args()
+
+    results = []
+    for size in (int(s) for s in args.sizes.split(",")):
+        print(f"── {size:,} edges", file=sys.stderr)
+        r = bench_size(size, args.iterations, args.seed)
+        results.append(r)
+        print(f"   nodes={r['nodes']:,} sccs={r['sccs']:,} largest_scc={r['largest_scc']:,} index={r['index_s']}s", file=sys.stderr)
+        for name, m in r["ops"].items():
+            print(f"   {name:<32} p50={m['p50_ms']:>10.3f}ms  p99={m['p99_ms']:>10.3f}ms  "
+                  f"peak={m['peak_kb']:>10.1f}KB  resp={m['resp_bytes']:>10,}B", file=sys.stderr)
+
+    report = {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
+            "python": platform.python_version(),
+            "iterations": args.iterations,
+            "seed": args.seed,
+        },
+        "results": results,
+    }
+    if args.out:
+        Path(args.out).write_text(json.dumps(report, indent=2))
+    else:
+        print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main_cli()
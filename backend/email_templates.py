@@ -0,0 +1,80 @@
+"""
+Precompiled HTML templates for outgoing email.
+
+A template is parsed once into literal chunks and named slots; rendering fills
+the slots and joins the chunks in one pass. Slot values are HTML-escaped unless
+the slot is written `{name:raw}`, which is reserved for fragments that were
+themselves rendered from a template (a table inside an email body, say) or for
+HTML the user authored on purpose.
+
+RenderCache memoizes rendered fragments by a hashable key, so an alert table
+shared by several rules or recipients is rendered once.
+"""
+
+import html
+import threading
+from collections import OrderedDict
+from string import Formatter
+
+
+class Template:
+    """`{name}` slots are escaped, `{name:raw}` slots are inserted as-is."""
+
+    __slots__ = ("source", "_chunks", "_slots")
+
+    def __init__(self, source: str):
+        self.source = source
+        chunks: list[str] = []
+        slots: list[tuple[int, str, bool]] = []   # (chunk index, name, raw)
+        for literal, name, spec, conversion in Formatter().parse(source):
+            if literal:
+                chunks.append(literal)
+            if name is None:
+                continue
+            if not name.isidentifier() or conversion or spec not in ("", "raw"):
+                raise ValueError(f"Unsupported template slot {{{name}{':' + spec if spec else ''}}}")
+            slots.append((len(chunks), name, spec == "raw"))
+            chunks.append("")
+        self._chunks = tuple(chunks)
+        self._slots = tuple(slots)
+
+    @property
+    def slot_names(self) -> set[str]:
+        return {name for _, name, _ in self._slots}
+
+    def render(self, **values) -> str:
+        out = list(self._chunks)
+        for i, name, raw in self._slots:
+            value = values[name]
+            out[i] = value if raw else html.escape(str(value))
+        return "".join(out)
+
+
+class RenderCache:
+    """Thread-safe LRU of rendered fragments with hit/miss counters."""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[object, str]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_render(self, key, render) -> str:
+        with self._lock:
+            hit = self._entries.get(key)
+            if hit is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return hit
+            self.misses += 1
+        rendered = render()
+        with self._lock:
+            self._entries[key] = rendered
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return rendered
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
@@ -4,30 +4,81 @@ import sys
 # Ensure sibling modules (apps_registry, etc.) are importable regardless of cwd
 sys.path.insert(0, str(Path(__file__).resolve().parent))
 
-from fastapi import FastAPI, HTTPException, Query, BackgroundTasks
+from fastapi import FastAPI, HTTPException, Query, Response
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import FileResponse, StreamingResponse
 from fastapi.staticfiles import StaticFiles
-from pydantic import BaseModel
-from typing import Optional, List
-from collections import deque
-from datetime import datetime
+from pydantic import AfterValidator, BaseModel
+from typing import Annotated, Optional, List
+from collections import ChainMap, OrderedDict, deque
+from datetime import datetime, timedelta
 import copy
 import asyncio
+import bisect
+import heapq
+import threading
 import random
 import uuid
 import json
 import os
 import logging
 import smtplib
+import socket
+import sqlite3
+import time
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
-from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import Future
+
+from announcement_store import AnnouncementStore
+from email_templates import RenderCache, Template
+from smtp_client import SMTPClient
 
 # ── Logging ──────────────────────────────────────────────────────────────────
 logger = logging.getLogger("obs-dashboard")
 logging.basicConfig(level=logging.INFO)
 
+# ── Local State Store ────────────────────────────────────────────────────────
+# Small SQLite database for state that must survive restarts (alert dedup, …).
+# One shared connection; callers serialize through _state_db_lock. Sections
+# register their table setup / reload with @_state_store_init; the startup hook
+# runs them, so importing this module (tools, benches) never creates the file.
+OBS_STATE_DB = os.environ.get("OBS_STATE_DB", str(Path(__file__).resolve().parent / "obs_state.db"))
+
+_state_db_lock = threading.RLock()
+_state_conn: sqlite3.Connection | None = None
+
+
+def _state_db() -> sqlite3.Connection:
+    global _state_conn
+    with _state_db_lock:
+        if _state_conn is None:
+            _state_conn = sqlite3.connect(OBS_STATE_DB, check_same_thread=False, isolation_level=None)
+            _state_conn.execute("PRAGMA journal_mode=WAL")
+            _state_conn.execute("PRAGMA synchronous=NORMAL")
+        return _state_conn
+
+
+_state_store_inits: list = []
+_state_store_ready = False
+
+
+def _state_store_init(fn):
+    """Register a function that creates tables or reloads state from the store."""
+    _state_store_inits.append(fn)
+    return fn
+
+
+def _init_state_store():
+    """Run the registered setup once, in registration order. Idempotent."""
+    global _state_store_ready
+    with _state_db_lock:
+        if not _state_store_ready:
+            for fn in _state_store_inits:
+                fn()
+            _state_store_ready = True
+
+
 # ── SMTP Configuration ──────────────────────────────────────────────────────
 SMTP_HOST = os.environ.get("SMTP_HOST", "")
 SMTP_PORT = int(os.environ.get("SMTP_PORT", "587"))
@@ -43,26 +94,46 @@ if not _smtp_configured:
         "Set SMTP_HOST, SMTP_PORT, SMTP_USER, SMTP_PASSWORD, SMTP_FROM to enable."
     )
 
-_email_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="smtp")
+# Delivery pipeline: a bounded queue drained on a dedicated asyncio loop
+# thread by the non-blocking client in smtp_client.py. Up to
+# SMTP_MAX_CONCURRENCY sends run at once; each borrows a persistent
+# authenticated connection from an idle pool (at most SMTP_POOL_SIZE kept) and
+# sends up to SMTP_BATCH_MAX queued messages over it before handing it back.
+SMTP_POOL_SIZE = int(os.environ.get("SMTP_POOL_SIZE", "8"))
+SMTP_MAX_CONCURRENCY = int(os.environ.get("SMTP_MAX_CONCURRENCY", "16"))
+SMTP_TIMEOUT = float(os.environ.get("SMTP_TIMEOUT", "30"))
+SMTP_QUEUE_MAX = int(os.environ.get("SMTP_QUEUE_MAX", "1000"))
+SMTP_BATCH_MAX = int(os.environ.get("SMTP_BATCH_MAX", "20"))
+SMTP_IDLE_TIMEOUT = float(os.environ.get("SMTP_IDLE_TIMEOUT", "60"))   # close connections idle this long
+SMTP_ENQUEUE_TIMEOUT = 5.0   # seconds a blocking caller waits for queue space
+
+# Failed deliveries (transient SMTP errors, or no queue space) are persisted to
+# an outbox in the local state store and retried with jittered exponential
+# backoff; permanent rejections and messages out of attempts are dead-lettered.
+EMAIL_RETRY_MAX_ATTEMPTS = int(os.environ.get("EMAIL_RETRY_MAX_ATTEMPTS", "8"))
+EMAIL_RETRY_BASE_DELAY = float(os.environ.get("EMAIL_RETRY_BASE_DELAY", "30"))    # seconds, doubles per attempt
+EMAIL_RETRY_MAX_DELAY = float(os.environ.get("EMAIL_RETRY_MAX_DELAY", "3600"))
+EMAIL_RETRY_POLL = 5.0       # seconds between outbox scans
+EMAIL_RETRY_CLAIM = 300.0    # seconds a requeued row stays hidden while its attempt is in flight
+EMAIL_RETRY_BATCH = 200      # rows requeued per scan
 
 
 # ── Email Sending ────────────────────────────────────────────────────────────
 
-def _send_email_sync(
-    recipients: list[str],
-    subject: str,
-    html_body: str,
-    plain_body: str = "",
-) -> dict:
-    """Send an email via SMTP (blocking). Called from a thread pool."""
-    if not _smtp_configured:
-        logger.info("SMTP not configured — skipping email to %s", recipients)
-        return {"status": "sent", "detail": "smtp_not_configured"}
+def _check_email_address(addr: str) -> str:
+    """Reject CR/LF: in an address they would inject SMTP commands or headers."""
+    if "\r" in addr or "\n" in addr:
+        raise ValueError("email address must not contain line breaks")
+    return addr
 
-    if not recipients:
-        logger.warning("No recipients provided — skipping email")
-        return {"status": "sent", "detail": "no_recipients"}
 
+EmailAddress = Annotated[str, AfterValidator(_check_email_address)]   # for request models
+
+# Fallback body for messages without authored HTML; the text is escaped.
+_EMAIL_PARAGRAPH = Template("<p>{text}</p>")
+
+
+def _build_email_message(recipients: list[str], subject: str, html_body: str, plain_body: str = "") -> str:
     msg = MIMEMultipart("alternative")
     msg["From"] = SMTP_FROM
     msg["To"] = ", ".join(recipients)
@@ -71,25 +142,273 @@ def _send_email_sync(
     if plain_body:
         msg.attach(MIMEText(plain_body, "plain", "utf-8"))
     msg.attach(MIMEText(html_body, "html", "utf-8"))
+    return msg.as_string()
+
+
+_email_loop: asyncio.AbstractEventLoop | None = None
+_email_loop_lock = threading.Lock()
+_email_queue: asyncio.Queue | None = None        # lives on _email_loop
+_email_slots = threading.BoundedSemaphore(SMTP_QUEUE_MAX)   # queue capacity, taken by producers
+_email_concurrency: asyncio.Semaphore | None = None
+_email_dispatcher: asyncio.Task | None = None
+_email_tasks: set[asyncio.Task] = set()
+_smtp_idle: deque = deque()                      # (SMTPClient, monotonic time returned)
+_email_metrics_lock = threading.Lock()
+_email_metrics = {
+    "enqueued": 0, "sent": 0, "errors": 0, "rejected": 0,
+    "deferred": 0, "retried": 0, "dead_lettered": 0,
+    "connections_opened": 0, "reconnects": 0, "batches": 0, "in_flight": 0,
+}
+_email_latency_ms: deque = deque(maxlen=1000)   # enqueue → delivered
+_email_send_ms: deque = deque(maxlen=1000)      # SMTP transaction time only
+
+
+def _email_count(key: str, n: int = 1):
+    with _email_metrics_lock:
+        _email_metrics[key] += n
+
+
+async def _smtp_connect() -> SMTPClient:
+    client = SMTPClient(
+        SMTP_HOST, SMTP_PORT, timeout=SMTP_TIMEOUT,
+        start_tls=SMTP_USE_TLS, require_tls=SMTP_USE_TLS,
+        username=SMTP_USER, password=SMTP_PASSWORD,
+    )
+    await client.connect()
+    _email_count("connections_opened")
+    return client
+
+
+def _smtp_borrow() -> SMTPClient | None:
+    """Most recently used idle connection that is still fresh, if any."""
+    now = time.monotonic()
+    while _smtp_idle:
+        client, returned_at = _smtp_idle.pop()
+        if client.is_connected and now - returned_at < SMTP_IDLE_TIMEOUT:
+            return client
+        client.close()
+    return None
+
+
+async def _smtp_return(client: SMTPClient | None):
+    if client is None or not client.is_connected:
+        return
+    if len(_smtp_idle) < SMTP_POOL_SIZE:
+        _smtp_idle.append((client, time.monotonic()))
+    else:
+        await client.quit()
 
+
+async def _reap_idle_connections():
+    now = time.monotonic()
+    while _smtp_idle and now - _smtp_idle[0][1] >= SMTP_IDLE_TIMEOUT:
+        client, _ = _smtp_idle.popleft()
+        await client.quit()
+
+
+def _smtp_transient(exc: Exception) -> bool:
+    """Whether a failed send is worth retrying: network trouble and 4xx replies."""
+    if isinstance(exc, smtplib.SMTPRecipientsRefused):
+        return all(400 <= code < 500 for code, _ in exc.recipients.values())
+    if isinstance(exc, smtplib.SMTPResponseException):
+        return exc.smtp_code == -1 or 400 <= exc.smtp_code < 500
+    return isinstance(exc, (smtplib.SMTPServerDisconnected, OSError, TimeoutError))
+
+
+async def _deliver(client: SMTPClient | None, job: dict) -> tuple[SMTPClient | None, dict]:
+    """Send one job on a pooled connection, reconnecting once if the server
+    dropped it. Returns the (possibly new) connection and the result."""
+    for attempt in (0, 1):
+        try:
+            if client is None or not client.is_connected:
+                client = await _smtp_connect()
+            t0 = time.perf_counter()
+            await client.sendmail(SMTP_FROM, job["recipients"], job["message"])
+            _email_send_ms.append((time.perf_counter() - t0) * 1000)
+            logger.info("Email sent to %s (subject: %s)", job["recipients"], job["subject"])
+            return client, {"status": "sent"}
+        except smtplib.SMTPServerDisconnected as exc:
+            if client is not None:
+                client.close()
+            client = None
+            if attempt == 0:
+                _email_count("reconnects")
+                continue
+            logger.error("SMTP error sending to %s: %s", job["recipients"], exc)
+            return None, {"status": "error", "detail": str(exc), "transient": True}
+        except (smtplib.SMTPRecipientsRefused, smtplib.SMTPDataError, smtplib.SMTPSenderRefused, ValueError) as exc:
+            # Message-level rejection (ValueError: malformed address) — the connection is still usable
+            logger.error("SMTP error sending to %s: %s", job["recipients"], exc)
+            return client, {"status": "error", "detail": str(exc), "transient": _smtp_transient(exc)}
+        except Exception as exc:
+            logger.error("Unexpected error sending email to %s: %s", job["recipients"], exc)
+            if client is not None:
+                client.close()
+            return None, {"status": "error", "detail": str(exc), "transient": _smtp_transient(exc)}
+
+
+def _abandon_email_job(job: dict):
+    """Resolve a job the pipeline will not attempt because it is shutting down.
+    Outbox retries keep their row and are picked up again after the claim lapses."""
+    if not job["future"].done():
+        job["future"].set_result({"status": "error", "detail": "shutdown"})
+
+
+async def _email_send_batch(first: dict):
+    """Send `first` plus whatever else is queued (up to SMTP_BATCH_MAX) over one connection.
+    Holds one _email_concurrency slot, taken by the dispatcher."""
+    batch = [first]
+    pending = 0
     try:
-        with smtplib.SMTP(SMTP_HOST, SMTP_PORT, timeout=30) as server:
-            if SMTP_USE_TLS:
-                server.ehlo()
-                server.starttls()
-                server.ehlo()
-            if SMTP_USER:
-                server.login(SMTP_USER, SMTP_PASSWORD)
-            server.sendmail(SMTP_FROM, recipients, msg.as_string())
-
-        logger.info("Email sent to %s (subject: %s)", recipients, subject)
-        return {"status": "sent"}
-    except smtplib.SMTPException as exc:
-        logger.error("SMTP error sending to %s: %s", recipients, exc)
-        return {"status": "error", "detail": str(exc)}
-    except Exception as exc:
-        logger.error("Unexpected error sending email to %s: %s", recipients, exc)
-        return {"status": "error", "detail": str(exc)}
+        while len(batch) < SMTP_BATCH_MAX and not _email_queue.empty():
+            job = _email_queue.get_nowait()
+            if job is None:
+                _email_queue.put_nowait(None)   # leave the stop signal for the dispatcher
+                break
+            _email_slots.release()
+            batch.append(job)
+        _email_count("batches")
+        _email_count("in_flight", len(batch))
+        pending = len(batch)
+        client = _smtp_borrow()
+        for job in batch:
+            client, result = await _deliver(client, job)
+            _email_latency_ms.append((time.perf_counter() - job["enqueued_at"]) * 1000)
+            _email_count("sent" if result["status"] == "sent" else "errors")
+            _email_count("in_flight", -1)
+            pending -= 1
+            try:
+                if result["status"] != "sent":
+                    result = _retry_or_dead_letter(job, result["detail"], result.get("transient", False))
+                elif job["outbox_id"] is not None:
+                    _outbox_delete(job["outbox_id"])
+            except sqlite3.Error as exc:
+                logger.error("Email outbox update failed for %s: %s", job["recipients"], exc)
+            job["future"].set_result(result)
+        await _smtp_return(client)
+    except asyncio.CancelledError:
+        _email_count("in_flight", -pending)
+        for job in batch:
+            _abandon_email_job(job)
+        raise
+    finally:
+        _email_concurrency.release()
+
+
+async def _email_dispatch():
+    """Hand queued jobs to send tasks, at most SMTP_MAX_CONCURRENCY at a time.
+    A send slot is taken before dequeuing, so when every slot is busy jobs wait
+    in the queue — where they count against SMTP_QUEUE_MAX — and producers are
+    turned away."""
+    while True:
+        await _email_concurrency.acquire()
+        try:
+            job = await asyncio.wait_for(_email_queue.get(), SMTP_IDLE_TIMEOUT)
+        except asyncio.TimeoutError:
+            _email_concurrency.release()
+            await _reap_idle_connections()
+            continue
+        except asyncio.CancelledError:
+            _email_concurrency.release()
+            raise
+        if job is None:
+            _email_concurrency.release()
+            return
+        _email_slots.release()
+        task = asyncio.create_task(_email_send_batch(job))
+        _email_tasks.add(task)
+        task.add_done_callback(_email_tasks.discard)
+
+
+async def _start_email_dispatcher():
+    global _email_queue, _email_concurrency, _email_dispatcher
+    _email_queue = asyncio.Queue()
+    _email_concurrency = asyncio.Semaphore(SMTP_MAX_CONCURRENCY)
+    _email_dispatcher = asyncio.create_task(_email_dispatch())
+
+
+def _ensure_email_loop() -> asyncio.AbstractEventLoop:
+    """Start the delivery loop thread on first use."""
+    global _email_loop
+    with _email_loop_lock:
+        if _email_loop is None:
+            loop = asyncio.new_event_loop()
+            threading.Thread(target=loop.run_forever, name="smtp", daemon=True).start()
+            asyncio.run_coroutine_threadsafe(_start_email_dispatcher(), loop).result()
+            _email_loop = loop
+        return _email_loop
+
+
+def _email_job(
+    recipients: list[str], subject: str, message: str, attempts: int = 0, outbox_id: int | None = None,
+) -> dict:
+    return {
+        "recipients": list(recipients),
+        "subject": subject,
+        "message": message,
+        "attempts": attempts,        # delivery attempts already made (retries come from the outbox)
+        "outbox_id": outbox_id,
+        "future": Future(),
+        "enqueued_at": time.perf_counter(),
+    }
+
+
+def _submit_email_job(job: dict, block: bool) -> bool:
+    """Hand a job to the delivery loop if a queue slot is free (after waiting
+    up to SMTP_ENQUEUE_TIMEOUT when `block`). Returns whether it was queued."""
+    loop = _ensure_email_loop()
+    if not (_email_slots.acquire(timeout=SMTP_ENQUEUE_TIMEOUT) if block else _email_slots.acquire(blocking=False)):
+        return False
+    _email_count("enqueued")
+    loop.call_soon_threadsafe(_email_queue.put_nowait, job)
+    return True
+
+
+def _enqueue_email(
+    recipients: list[str], subject: str, html_body: str, plain_body: str = "",
+    block: bool = True, durable: bool = True,
+) -> Future:
+    """Queue a message for the delivery pipeline from any thread. The returned
+    future resolves to {"status": "sent"}, {"status": "queued", ...} when the
+    message was handed to the retry outbox, or {"status": "error", "detail": ...}.
+    When the queue is full (backpressure; blocking callers first wait up to
+    SMTP_ENQUEUE_TIMEOUT) durable messages go to the outbox and the rest
+    resolve at once with detail "queue_full"."""
+    if not _smtp_configured:
+        logger.info("SMTP not configured — skipping email to %s", recipients)
+        return _resolved({"status": "sent", "detail": "smtp_not_configured"})
+    if not recipients:
+        logger.warning("No recipients provided — skipping email")
+        return _resolved({"status": "sent", "detail": "no_recipients"})
+
+    job = _email_job(recipients, subject, _build_email_message(recipients, subject, html_body, plain_body))
+    if _submit_email_job(job, block):
+        return job["future"]
+    _email_count("rejected")
+    if durable:
+        logger.warning("Email queue full (%d) — deferring email to %s", SMTP_QUEUE_MAX, recipients)
+        try:
+            return _resolved(_outbox_defer(job, "queue_full", attempted=False))
+        except sqlite3.Error as exc:
+            logger.error("Email outbox write failed for %s: %s", recipients, exc)
+    logger.error("Email queue full (%d) — dropping email to %s", SMTP_QUEUE_MAX, recipients)
+    return _resolved({"status": "error", "detail": "queue_full"})
+
+
+def _resolved(result: dict) -> Future:
+    future: Future = Future()
+    future.set_result(result)
+    return future
+
+
+def _send_email_sync(
+    recipients: list[str],
+    subject: str,
+    html_body: str,
+    plain_body: str = "",
+) -> dict:
+    """Send an email through the delivery pipeline, waiting for the result (blocking)."""
+    return _enqueue_email(recipients, subject, html_body, plain_body).result()
 
 
 async def send_email_async(
@@ -98,18 +417,93 @@ async def send_email_async(
     html_body: str,
     plain_body: str = "",
 ) -> dict:
-    """Non-blocking wrapper that runs _send_email_sync in a thread pool."""
-    loop = asyncio.get_running_loop()
-    return await loop.run_in_executor(
-        _email_executor,
-        _send_email_sync,
-        recipients,
-        subject,
-        html_body,
-        plain_body,
+    """Non-blocking send: enqueue without waiting for queue space, await delivery
+    (which runs on the delivery loop, never on the caller's thread)."""
+    return await asyncio.wrap_future(
+        _enqueue_email(recipients, subject, html_body, plain_body, block=False)
     )
 
 
+def _pct_ms(samples, p: float) -> float | None:
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    return round(ordered[min(len(ordered) - 1, int(p / 100 * len(ordered)))], 1)
+
+
+def _email_pipeline_metrics() -> dict:
+    with _email_metrics_lock:
+        counters = dict(_email_metrics)
+    latency, send = list(_email_latency_ms), list(_email_send_ms)
+    return {
+        "configured": _smtp_configured,
+        "queue_depth": _email_queue.qsize() if _email_queue is not None else 0,
+        "queue_max": SMTP_QUEUE_MAX,
+        "max_concurrency": SMTP_MAX_CONCURRENCY,
+        "connections_idle": len(_smtp_idle),
+        "pool_size": SMTP_POOL_SIZE,
+        "batch_max": SMTP_BATCH_MAX,
+        **counters,
+        **_email_outbox_counts(),
+        "template_cache": {"rows": _vc_row_cache.stats(), "tables": _vc_table_cache.stats()},
+        "latency_ms": {"p50": _pct_ms(latency, 50), "p95": _pct_ms(latency, 95), "p99": _pct_ms(latency, 99)},
+        "send_ms": {"p50": _pct_ms(send, 50), "p95": _pct_ms(send, 95), "p99": _pct_ms(send, 99)},
+    }
+
+
+async def _drain_email_queue():
+    _email_queue.put_nowait(None)
+    await _email_dispatcher
+    if _email_tasks:
+        await asyncio.gather(*_email_tasks, return_exceptions=True)
+    while _smtp_idle:
+        client, _ = _smtp_idle.pop()
+        await client.quit()
+
+
+async def _abort_email_pipeline() -> int:
+    """Cancel the dispatcher and in-flight sends, then resolve every job still
+    queued with a "shutdown" result so no caller waits on it forever."""
+    tasks = [_email_dispatcher, *_email_tasks]
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    abandoned = 0
+    while not _email_queue.empty():
+        job = _email_queue.get_nowait()
+        if job is not None:
+            _email_slots.release()
+            _abandon_email_job(job)
+            abandoned += 1
+    while _smtp_idle:
+        _smtp_idle.pop()[0].close()
+    return abandoned
+
+
+def _stop_email_pipeline(timeout: float = 10.0):
+    """Send whatever is queued, close pooled connections and stop the loop thread.
+    Jobs not sent within `timeout` resolve with detail "shutdown"."""
+    global _email_loop
+    with _email_loop_lock:
+        loop, _email_loop = _email_loop, None
+    if loop is None:
+        return
+    try:
+        asyncio.run_coroutine_threadsafe(_drain_email_queue(), loop).result(timeout)
+    except Exception as exc:
+        if isinstance(exc, TimeoutError):
+            logger.error("Email pipeline did not drain within %.0fs", timeout)
+        else:
+            logger.error("Email pipeline did not drain cleanly: %s", exc)
+        try:
+            abandoned = asyncio.run_coroutine_threadsafe(_abort_email_pipeline(), loop).result(timeout)
+            if abandoned:
+                logger.warning("Email pipeline stopped with %d queued email(s) unsent", abandoned)
+        except Exception as exc:
+            logger.error("Email pipeline did not stop cleanly: %s", exc)
+    loop.call_soon_threadsafe(loop.stop)
+
+
 app = FastAPI(title="Observability Dashboard API")
 
 app.add_middleware(
@@ -119,6 +513,396 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+
+@app.on_event("startup")
+async def _open_state_store():
+    await asyncio.get_running_loop().run_in_executor(None, _init_state_store)
+
+# ── Background Job Leadership ────────────────────────────────────────────────
+# Under `uvicorn --workers N` every worker runs the startup hooks. Jobs that must
+# run once per host (VC alert evaluation, digests, snapshot builders, …) register
+# with @_leader_job and run only in the worker holding the lease row in the local
+# state store. The holder renews every LEADER_RENEW_INTERVAL; if it dies, the
+# lease lapses after LEADER_LEASE_TTL and the next worker to poll takes over.
+# Changes other workers make to the state those jobs read reach the leader
+# through the state_events log (Cross-worker state sync, below).
+LEADER_LEASE_TTL = float(os.environ.get("LEADER_LEASE_TTL", "15"))   # seconds
+LEADER_RENEW_INTERVAL = LEADER_LEASE_TTL / 3
+_LEADER_LEASE = "background-jobs"
+_WORKER_ID = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+_leader_jobs: list = []                   # coroutine functions started on election
+_leader_tasks: list[asyncio.Task] = []    # non-empty while this worker leads
+_leader_loop_task: asyncio.Task | None = None
+
+
+def _leader_job(fn):
+    """Register a background coroutine that should run in one worker only."""
+    _leader_jobs.append(fn)
+    return fn
+
+
+def _try_acquire_lease(name: str = _LEADER_LEASE) -> bool:
+    """Take the lease if it is free or expired, or renew it if we already hold it.
+    A single guarded UPSERT, so concurrent workers cannot both win."""
+    now = time.time()
+    with _state_db_lock:
+        cur = _state_db().execute(
+            "INSERT INTO leader_lease (name, holder, expires_at) VALUES (?, ?, ?) "
+            "ON CONFLICT(name) DO UPDATE SET holder = excluded.holder, expires_at = excluded.expires_at "
+            "WHERE leader_lease.holder = excluded.holder OR leader_lease.expires_at <= ?",
+            (name, _WORKER_ID, now + LEADER_LEASE_TTL, now),
+        )
+        return cur.rowcount > 0
+
+
+def _release_lease(name: str = _LEADER_LEASE):
+    """Give the lease up (if held) so another worker can take over immediately."""
+    with _state_db_lock:
+        _state_db().execute("DELETE FROM leader_lease WHERE name = ? AND holder = ?", (name, _WORKER_ID))
+
+
+async def _stop_leader_jobs():
+    tasks = list(_leader_tasks)
+    _leader_tasks.clear()
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+
+def _init_leader_lease():
+    with _state_db_lock:
+        _state_db().execute(
+            "CREATE TABLE IF NOT EXISTS leader_lease "
+            "(name TEXT PRIMARY KEY, holder TEXT NOT NULL, expires_at REAL NOT NULL)"
+        )
+
+
+async def _leader_election_loop():
+    """Poll the lease; start the registered jobs on election, cancel them on loss.
+    Lease reads and writes can wait on SQLite locks, so they run in the executor."""
+    loop = asyncio.get_running_loop()
+    await loop.run_in_executor(None, _init_leader_lease)
+    logger.info("Leader election started (worker=%s, ttl=%ss)", _WORKER_ID, LEADER_LEASE_TTL)
+    while True:
+        try:
+            try:
+                leading = await loop.run_in_executor(None, _try_acquire_lease)
+            except sqlite3.Error as exc:
+                # Can't prove we still hold it — step down rather than risk two leaders
+                logger.error("Leader lease check failed: %s", exc)
+                leading = False
+            if leading and not _leader_tasks:
+                logger.info("Worker %s elected leader, starting %d background jobs", _WORKER_ID, len(_leader_jobs))
+                _leader_tasks.extend(asyncio.create_task(job()) for job in _leader_jobs)
+            elif not leading and _leader_tasks:
+                logger.warning("Worker %s lost leadership, stopping background jobs", _WORKER_ID)
+                await _stop_leader_jobs()
+            await asyncio.sleep(LEADER_RENEW_INTERVAL)
+        except asyncio.CancelledError:
+            await _stop_leader_jobs()
+            break
+
+
+@app.on_event("startup")
+async def _start_leader_election():
+    global _leader_loop_task
+    # Catch up on other workers' changes first, so leader jobs start from the shared state
+    await asyncio.get_running_loop().run_in_executor(None, _apply_state_events)
+    _leader_loop_task = asyncio.create_task(_leader_election_loop())
+
+
+@app.on_event("shutdown")
+async def _resign_leadership():
+    if _leader_loop_task is not None:
+        _leader_loop_task.cancel()
+        await asyncio.gather(_leader_loop_task, return_exceptions=True)
+    try:
+        await asyncio.get_running_loop().run_in_executor(None, _release_lease)
+    except sqlite3.Error as exc:
+        logger.error("Could not release leader lease: %s", exc)
+
+
+# ── Cross-worker state sync ──────────────────────────────────────────────────
+# Leader jobs evaluate state that any worker's endpoints may change: component
+# statuses, indicator exclusions and VC rules. Each such change is applied
+# locally and appended to the state_events table; every worker polls the table
+# every STATE_SYNC_INTERVAL and applies the other workers' events through the
+# same code path, so the leader's snapshot listeners see them as local changes.
+# Per key the highest event id wins, which keeps workers convergent when two of
+# them change the same key at once. A starting worker replays the retained log;
+# the leader prunes events older than STATE_EVENT_RETENTION except the latest
+# one per key.
+STATE_SYNC_INTERVAL = float(os.environ.get("STATE_SYNC_INTERVAL", "1"))   # seconds
+STATE_EVENT_RETENTION = 3600   # seconds
+
+_state_event_handlers: dict = {}                   # kind → fn(key, payload)
+_state_event_latest: dict[tuple[str, str], int] = {}   # (kind, key) → id applied or written
+_state_event_seen = 0                              # highest event id read from the table
+_state_sync_lock = threading.RLock()               # local change + publish vs. applying events
+_state_sync_task: asyncio.Task | None = None
+
+
+def _state_event_handler(kind: str):
+    """Register how another worker's event of this kind is applied here."""
+    def register(fn):
+        _state_event_handlers[kind] = fn
+        return fn
+    return register
+
+
+@_state_store_init
+def _init_state_events():
+    with _state_db_lock:
+        db = _state_db()
+        db.execute(
+            "CREATE TABLE IF NOT EXISTS state_events ("
+            " id INTEGER PRIMARY KEY AUTOINCREMENT, worker TEXT NOT NULL, kind TEXT NOT NULL,"
+            " key TEXT NOT NULL, payload TEXT NOT NULL, created_at REAL NOT NULL)"
+        )
+        db.execute("CREATE INDEX IF NOT EXISTS state_events_key ON state_events (kind, key, id)")
+
+
+def _publish_state_event(kind: str, key: str, payload: dict | None = None):
+    """Record a change this worker has already applied, for the others to replay."""
+    with _state_db_lock:
+        cur = _state_db().execute(
+            "INSERT INTO state_events (worker, kind, key, payload, created_at) VALUES (?, ?, ?, ?, ?)",
+            (_WORKER_ID, kind, key, json.dumps(payload or {}), time.time()),
+        )
+    with _state_sync_lock:
+        _state_event_latest[(kind, key)] = max(_state_event_latest.get((kind, key), 0), cur.lastrowid)
+
+
+def _apply_state_events() -> int:
+    """Apply other workers' events written since the last call. Returns how many."""
+    global _state_event_seen
+    with _state_db_lock:
+        rows = _state_db().execute(
+            "SELECT id, worker, kind, key, payload FROM state_events WHERE id > ? ORDER BY id",
+            (_state_event_seen,),
+        ).fetchall()
+    applied = 0
+    for event_id, worker, kind, key, payload in rows:
+        _state_event_seen = event_id
+        with _state_sync_lock:
+            if worker == _WORKER_ID or _state_event_latest.get((kind, key), 0) > event_id:
+                continue
+            _state_event_latest[(kind, key)] = event_id
+            handler = _state_event_handlers.get(kind)
+            if handler is None:
+                continue
+            try:
+                handler(key, json.loads(payload))
+                applied += 1
+            except Exception as exc:
+                logger.error("State event %d (%s %s) failed to apply: %s", event_id, kind, key, exc)
+    return applied
+
+
+def _prune_state_events():
+    with _state_db_lock:
+        _state_db().execute(
+            "DELETE FROM state_events WHERE created_at < ?"
+            " AND id NOT IN (SELECT MAX(id) FROM state_events GROUP BY kind, key)",
+            (time.time() - STATE_EVENT_RETENTION,),
+        )
+
+
+async def _state_sync_loop():
+    loop = asyncio.get_running_loop()
+    while True:
+        try:
+            await asyncio.sleep(STATE_SYNC_INTERVAL)
+            await loop.run_in_executor(None, _apply_state_events)
+        except asyncio.CancelledError:
+            break
+        except Exception as exc:
+            logger.error("State sync error: %s", exc)
+
+
+@_leader_job
+async def _state_event_prune_loop():
+    while True:
+        try:
+            await asyncio.get_running_loop().run_in_executor(None, _prune_state_events)
+            await asyncio.sleep(STATE_EVENT_RETENTION / 4)
+        except asyncio.CancelledError:
+            break
+        except Exception as exc:
+            logger.error("State event prune error: %s", exc)
+            await asyncio.sleep(STATE_EVENT_RETENTION / 4)
+
+
+@app.on_event("startup")
+async def _start_state_sync():
+    global _state_sync_task
+    _state_sync_task = asyncio.create_task(_state_sync_loop())
+
+
+@app.on_event("shutdown")
+async def _stop_state_sync():
+    if _state_sync_task is not None:
+        _state_sync_task.cancel()
+        await asyncio.gather(_state_sync_task, return_exceptions=True)
+
+
+
+# ── Email Retry Outbox ───────────────────────────────────────────────────────
+# Messages enter the outbox only when they need another try, so the delivery
+# fast path stays in memory. Any worker may write rows; the leader's retry job
+# requeues the due ones, hiding each for EMAIL_RETRY_CLAIM while it is in flight
+# (a worker that dies mid-attempt leaves the row to be picked up again).
+
+@_state_store_init
+def _init_email_outbox():
+    with _state_db_lock:
+        db = _state_db()
+        db.execute(
+            "CREATE TABLE IF NOT EXISTS email_outbox ("
+            " id INTEGER PRIMARY KEY AUTOINCREMENT, recipients TEXT NOT NULL, subject TEXT NOT NULL,"
+            " message TEXT NOT NULL, attempts INTEGER NOT NULL, next_attempt_at REAL NOT NULL,"
+            " last_error TEXT, created_at REAL NOT NULL)"
+        )
+        db.execute("CREATE INDEX IF NOT EXISTS email_outbox_due ON email_outbox (next_attempt_at)")
+        db.execute(
+            "CREATE TABLE IF NOT EXISTS email_dead_letter ("
+            " id INTEGER PRIMARY KEY AUTOINCREMENT, recipients TEXT NOT NULL, subject TEXT NOT NULL,"
+            " message TEXT NOT NULL, attempts INTEGER NOT NULL, last_error TEXT,"
+            " created_at REAL NOT NULL, failed_at REAL NOT NULL)"
+        )
+
+
+def _retry_delay(attempts: int) -> float:
+    """Exponential backoff with equal jitter: half the capped delay is fixed,
+    half random, so a burst of failures does not retry in lockstep."""
+    delay = min(EMAIL_RETRY_MAX_DELAY, EMAIL_RETRY_BASE_DELAY * 2 ** (attempts - 1))
+    return delay / 2 + random.uniform(0, delay / 2)
+
+
+def _outbox_defer(job: dict, error: str, attempted: bool) -> dict:
+    """Persist a job for a later attempt. `attempted` is False when it never
+    reached SMTP (queue full), which does not use up an attempt."""
+    attempts = job["attempts"] + (1 if attempted else 0)
+    delay = _retry_delay(max(1, attempts))
+    now = time.time()
+    with _state_db_lock:
+        db = _state_db()
+        if job["outbox_id"] is None:
+            db.execute(
+                "INSERT INTO email_outbox (recipients, subject, message, attempts, next_attempt_at, last_error, created_at)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (json.dumps(job["recipients"]), job["subject"], job["message"], attempts, now + delay, error, now),
+            )
+        else:
+            db.execute(
+                "UPDATE email_outbox SET attempts = ?, next_attempt_at = ?, last_error = ? WHERE id = ?",
+                (attempts, now + delay, error, job["outbox_id"]),
+            )
+    _email_count("deferred")
+    logger.warning(
+        "Email to %s deferred (attempt %d/%d, retry in %.0fs): %s",
+        job["recipients"], attempts, EMAIL_RETRY_MAX_ATTEMPTS, delay, error,
+    )
+    return {"status": "queued", "detail": "retry_scheduled", "error": error,
+            "attempts": attempts, "retry_in_s": round(delay, 1)}
+
+
+def _retry_or_dead_letter(job: dict, error: str, transient: bool) -> dict:
+    """Route a failed delivery: back to the outbox with backoff, or to the dead letters."""
+    attempts = job["attempts"] + 1
+    if transient and attempts < EMAIL_RETRY_MAX_ATTEMPTS:
+        return _outbox_defer(job, error, attempted=True)
+    now = time.time()
+    with _state_db_lock:
+        db = _state_db()
+        db.execute("BEGIN")
+        if job["outbox_id"] is None:
+            db.execute(
+                "INSERT INTO email_dead_letter (recipients, subject, message, attempts, last_error, created_at, failed_at)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (json.dumps(job["recipients"]), job["subject"], job["message"], attempts, error, now, now),
+            )
+        else:
+            db.execute(
+                "INSERT INTO email_dead_letter (recipients, subject, message, attempts, last_error, created_at, failed_at)"
+                " SELECT recipients, subject, message, ?, ?, created_at, ? FROM email_outbox WHERE id = ?",
+                (attempts, error, now, job["outbox_id"]),
+            )
+            db.execute("DELETE FROM email_outbox WHERE id = ?", (job["outbox_id"],))
+        db.execute("COMMIT")
+    _email_count("dead_lettered")
+    logger.error("Email to %s dead-lettered after %d attempt(s): %s", job["recipients"], attempts, error)
+    return {"status": "error", "detail": error, "dead_lettered": True}
+
+
+def _outbox_delete(outbox_id: int):
+    with _state_db_lock:
+        _state_db().execute("DELETE FROM email_outbox WHERE id = ?", (outbox_id,))
+
+
+def _requeue_due_emails() -> int:
+    """Claim the outbox rows whose backoff has elapsed and hand them to the pipeline."""
+    now = time.time()
+    with _state_db_lock:
+        db = _state_db()
+        db.execute("BEGIN IMMEDIATE")
+        rows = db.execute(
+            "SELECT id, recipients, subject, message, attempts FROM email_outbox"
+            " WHERE next_attempt_at <= ? ORDER BY next_attempt_at LIMIT ?",
+            (now, EMAIL_RETRY_BATCH),
+        ).fetchall()
+        db.executemany(
+            "UPDATE email_outbox SET next_attempt_at = ? WHERE id = ?",
+            [(now + EMAIL_RETRY_CLAIM, row[0]) for row in rows],
+        )
+        db.execute("COMMIT")
+    requeued = 0
+    for i, (outbox_id, recipients, subject, message, attempts) in enumerate(rows):
+        if not _submit_email_job(_email_job(json.loads(recipients), subject, message, attempts, outbox_id), block=False):
+            # Pipeline is saturated — release the rest of the claim with a short jittered delay
+            with _state_db_lock:
+                _state_db().executemany(
+                    "UPDATE email_outbox SET next_attempt_at = ? WHERE id = ?",
+                    [(now + _retry_delay(1), row[0]) for row in rows[i:]],
+                )
+            break
+        requeued += 1
+    if requeued:
+        _email_count("retried", requeued)
+    return requeued
+
+
+def _email_outbox_counts() -> dict:
+    with _state_db_lock:
+        db = _state_db()
+        return {
+            "outbox_depth": db.execute("SELECT COUNT(*) FROM email_outbox").fetchone()[0],
+            "dead_letters": db.execute("SELECT COUNT(*) FROM email_dead_letter").fetchone()[0],
+        }
+
+
+@_leader_job
+async def _email_retry_loop():
+    """Requeue due outbox messages. Runs in the leader only, so each row is retried once.
+    The claim is a BEGIN IMMEDIATE transaction on the shared state DB, so it runs
+    in the executor rather than stalling the event loop on SQLite locks."""
+    logger.info("Email retry scheduler started (max attempts=%d)", EMAIL_RETRY_MAX_ATTEMPTS)
+    loop = asyncio.get_running_loop()
+    while True:
+        try:
+            if _smtp_configured:
+                await loop.run_in_executor(None, _requeue_due_emails)
+            await asyncio.sleep(EMAIL_RETRY_POLL)
+        except asyncio.CancelledError:
+            logger.info("Email retry scheduler stopped")
+            break
+        except Exception as exc:
+            logger.error("Email retry loop error: %s", exc)
+            await asyncio.sleep(EMAIL_RETRY_POLL)
+
+
+
 # ── Mock Data ─────────────────────────────────────────────────────────────────
 
 # ── Enriched app cache — single source of truth for all dashboard endpoints ──
@@ -126,57 +910,55 @@ app.add_middleware(
 # In production, _filter_dashboard_apps becomes a database query with WHERE clauses.
 
 _enriched_cache: list[dict] | None = None
+_enriched_cache_by_slug: dict[str, dict] = {}
 
 def _get_enriched_apps() -> list[dict]:
     """Return all apps with computed status from the enriched pipeline.
-    Cached at module level since mock data is deterministic."""
+    Entries are built once; apps rebuilt by the enrichment snapshot (status
+    propagation, exclusion edits) have their status refreshed in place."""
     global _enriched_cache
-    if _enriched_cache is not None:
-        return _enriched_cache
+    with _snapshot_lock:
+        _refresh_enriched_snapshot()
+        if _enriched_cache is not None:
+            return _enriched_cache
+
+        dashboard_apps = []
+        for slug, app in _APPS_BY_SLUG.items():
+            entry = {
+                "seal": app["seal"],
+                "name": app["name"],
+                "lob": app["lob"],
+                "subLob": app.get("subLob", ""),
+                "cto": app.get("cto", ""),
+                "cbt": app.get("cbt", ""),
+                "region": app.get("region", "NA"),
+                "status": _dashboard_status(_enriched_snapshot.get(slug)),
+                "incidents_30d": app.get("incidents", 0),
+                "incidents_today": app.get("incidents_today", 0),
+                "recurring_30d": app.get("recurring_30d", 0),
+                "p1_30d": app.get("p1_30d", 0),
+                "p2_30d": app.get("p2_30d", 0),
+                "recent_issues": app.get("recent_issues", []),
+            }
+            _enriched_cache_by_slug[slug] = entry
+            dashboard_apps.append(entry)
 
-    # Import here to avoid circular import at module load time
-    from apps_registry import APPS_REGISTRY
+        _enriched_cache = dashboard_apps
+        return _enriched_cache
 
-    _status_rank = {"critical": 0, "warning": 1, "healthy": 2, "no_data": 3}
-    _rank_to_status = {0: "critical", 1: "warning", 2: "healthy", 3: "no_data"}
 
-    enriched = get_enriched_applications()
-    # Build a lookup by seal for the enriched data (which has computed deployments)
-    enriched_by_seal = {a["seal"]: a for a in enriched}
+def _dashboard_status(e: dict | None) -> str:
+    """Derive status from deployments (worst of deployment statuses)."""
+    if e and e.get("deployments"):
+        return _derive_app_status(e["deployments"])
+    return "healthy"
 
-    dashboard_apps = []
-    for app in APPS_REGISTRY:
-        e = enriched_by_seal.get(app["seal"])
-        # Derive status from deployments (worst of deployment statuses)
-        if e and e.get("deployments"):
-            worst_rank = 3  # no_data
-            for d in e["deployments"]:
-                r = _status_rank.get(d.get("status", "no_data"), 3)
-                if r < worst_rank:
-                    worst_rank = r
-            computed_status = _rank_to_status[worst_rank]
-        else:
-            computed_status = "healthy"
-
-        dashboard_apps.append({
-            "seal": app["seal"],
-            "name": app["name"],
-            "lob": app["lob"],
-            "subLob": app.get("subLob", ""),
-            "cto": app.get("cto", ""),
-            "cbt": app.get("cbt", ""),
-            "region": app.get("region", "NA"),
-            "status": computed_status,
-            "incidents_30d": app.get("incidents", 0),
-            "incidents_today": app.get("incidents_today", 0),
-            "recurring_30d": app.get("recurring_30d", 0),
-            "p1_30d": app.get("p1_30d", 0),
-            "p2_30d": app.get("p2_30d", 0),
-            "recent_issues": app.get("recent_issues", []),
-        })
 
-    _enriched_cache = dashboard_apps
-    return _enriched_cache
+def _sync_dashboard_status(slugs: set[str]):
+    for slug in slugs:
+        entry = _enriched_cache_by_slug.get(slug)
+        if entry is not None:
+            entry["status"] = _dashboard_status(_enriched_snapshot[slug])
 
 
 def _filter_dashboard_apps(
@@ -1132,6 +1914,279 @@ def bfs(start_id: str, adj: dict[str, list[str]]) -> list[str]:
     return result
 
 
+# ── Effective status propagation ─────────────────────────────────────────────
+# A component's effective status is the worst raw status among itself and every
+# component it transitively depends on (components without indicators don't count).
+# Cycles are collapsed into strongly connected components (SCCs) so the graph is a
+# DAG, and each SCC stores the worst rank reachable from it. A status change then
+# re-evaluates SCCs upstream of the change only while that rank keeps changing.
+
+_STATUS_RANK = {"critical": 0, "warning": 1, "healthy": 2, "no_data": 3}
+_RANK_TO_STATUS = {0: "critical", 1: "warning", 2: "healthy", 3: "no_data"}
+
+
+def _condense(node_ids, adj: dict[str, list[str]]) -> tuple[dict[str, int], list[list[str]]]:
+    """Tarjan's SCC algorithm (iterative — safe on deep graphs).
+    Returns (scc_of, members). SCC ids come out in reverse topological order:
+    every SCC's dependencies have a lower id than the SCC itself."""
+    index: dict[str, int] = {}
+    low: dict[str, int] = {}
+    stack: list[str] = []
+    on_stack: set[str] = set()
+    scc_of: dict[str, int] = {}
+    members: list[list[str]] = []
+    for root in node_ids:
+        if root in index:
+            continue
+        index[root] = low[root] = len(index)
+        stack.append(root)
+        on_stack.add(root)
+        work = [(root, iter(adj.get(root, [])))]
+        while work:
+            v, neighbors = work[-1]
+            descended = False
+            for w in neighbors:
+                if w not in index:
+                    index[w] = low[w] = len(index)
+                    stack.append(w)
+                    on_stack.add(w)
+                    work.append((w, iter(adj.get(w, []))))
+                    descended = True
+                    break
+                if w in on_stack and index[w] < low[v]:
+                    low[v] = index[w]
+            if descended:
+                continue
+            work.pop()
+            if work and low[v] < low[work[-1][0]]:
+                low[work[-1][0]] = low[v]
+            if low[v] == index[v]:
+                sid = len(members)
+                group = []
+                while True:
+                    w = stack.pop()
+                    on_stack.discard(w)
+                    scc_of[w] = sid
+                    group.append(w)
+                    if w == v:
+                        break
+                members.append(group)
+    return scc_of, members
+
+
+_scc_of: dict[str, int] = {}
+_scc_members: list[list[str]] = []
+_scc_succs: list[set[int]] = []
+_scc_preds: list[set[int]] = []
+_scc_reach: dict[int, int] = {}   # SCC id → worst status rank reachable from it
+
+
+def _scc_rank(sid: int, reach, own=None) -> int:
+    """Worst rank of an SCC's own members and its (already evaluated) dependencies.
+    `own` optionally overrides raw component statuses (what-if overlays)."""
+    rank = 3
+    for cid in _scc_members[sid]:
+        if cid in COMPONENTS_WITH_INDICATORS:
+            status = own[cid] if own and cid in own else NODE_MAP[cid]["status"]
+            rank = min(rank, _STATUS_RANK.get(status, 3))
+    for dep in _scc_succs[sid]:
+        rank = min(rank, reach[dep])
+    return rank
+
+
+def _index_status_propagation():
+    """(Re)build the SCC condensation and every SCC's worst reachable rank."""
+    scc_of, members = _condense(forward_adj, forward_adj)
+    succs: list[set[int]] = [set() for _ in members]
+    preds: list[set[int]] = [set() for _ in members]
+    for src, dsts in forward_adj.items():
+        a = scc_of[src]
+        for dst in dsts:
+            b = scc_of[dst]
+            if a != b:
+                succs[a].add(b)
+                preds[b].add(a)
+    _scc_of.clear()
+    _scc_of.update(scc_of)
+    _scc_members[:] = members
+    _scc_succs[:] = succs
+    _scc_preds[:] = preds
+    _scc_reach.clear()
+    for sid in range(len(members)):   # dependencies first
+        _scc_reach[sid] = _scc_rank(sid, _scc_reach)
+
+
+_index_status_propagation()
+
+
+def _effective_status(cid: str, reach=None) -> str:
+    """Effective status of a component from the propagated SCC ranks."""
+    if cid not in NODE_MAP or cid not in COMPONENTS_WITH_INDICATORS:
+        return "no_data"
+    return _RANK_TO_STATUS[(_scc_reach if reach is None else reach)[_scc_of[cid]]]
+
+
+def _propagate_status(changed, reach=None, own=None) -> set[str]:
+    """Re-evaluate the SCCs of the changed components, then walk reverse_adj
+    (via the condensed DAG) only as far as an SCC's rank actually changes.
+    Pass a copy-on-write `reach` (e.g. ChainMap({}, _scc_reach)) and an `own`
+    overlay to simulate without touching the live state.
+    Returns the component ids whose effective status changed."""
+    reach = _scc_reach if reach is None else reach
+    # Min-heap on SCC id: dependencies are always evaluated before dependents
+    heap = sorted({_scc_of[cid] for cid in changed if cid in _scc_of})
+    queued = set(heap)
+    moved: set[str] = set()
+    while heap:
+        sid = heapq.heappop(heap)
+        rank = _scc_rank(sid, reach, own)
+        if rank == reach[sid]:
+            continue
+        reach[sid] = rank
+        moved.update(cid for cid in _scc_members[sid] if cid in COMPONENTS_WITH_INDICATORS)
+        for pred in _scc_preds[sid]:
+            if pred not in queued:
+                queued.add(pred)
+                heapq.heappush(heap, pred)
+    return moved
+
+
+_health_version = 0   # bumped on every raw status change and topology rebuild
+
+
+# ── Root-cause ranking ───────────────────────────────────────────────────────
+# Scores each unhealthy component (raw critical/warning, with indicators) by
+# how many other unhealthy components depend on it — i.e. sit in its reverse_adj
+# closure and could be failing because of it. Closures are bitsets over the
+# unhealthy set, built in one pass over the condensed DAG and cached per
+# _health_version.
+
+_root_cause_cache: dict | None = None
+
+
+def _root_cause_index() -> dict:
+    global _root_cause_cache
+    with _snapshot_lock:
+        if _root_cause_cache is not None and _root_cause_cache["health_version"] == _health_version:
+            return _root_cause_cache
+        unhealthy = [
+            cid for cid in COMPONENTS_WITH_INDICATORS
+            if cid in NODE_MAP and NODE_MAP[cid]["status"] in ("critical", "warning")
+        ]
+        unhealthy.sort(key=lambda cid: _node_order.get(cid, 0))
+        bit = {cid: 1 << i for i, cid in enumerate(unhealthy)}
+        critical_mask = 0
+        for cid in unhealthy:
+            if NODE_MAP[cid]["status"] == "critical":
+                critical_mask |= bit[cid]
+        upstream = [0] * len(_scc_members)
+        chain = [0] * len(_scc_members)   # longest run of unhealthy SCCs from a dependent down to here
+        for sid in range(len(_scc_members) - 1, -1, -1):   # dependents first
+            mask = 0
+            for cid in _scc_members[sid]:
+                mask |= bit.get(cid, 0)
+            longest = 0
+            for pred in _scc_preds[sid]:
+                mask |= upstream[pred]
+                longest = max(longest, chain[pred])
+            upstream[sid] = mask
+            chain[sid] = longest + (1 if any(cid in bit for cid in _scc_members[sid]) else 0)
+        _root_cause_cache = {
+            "health_version": _health_version,
+            "unhealthy": unhealthy,
+            "bit": bit,
+            "critical_mask": critical_mask,
+            "upstream": upstream,
+            "chain": chain,
+        }
+        return _root_cause_cache
+
+
+def _bit_members(mask: int, ids: list[str]):
+    while mask:
+        low = mask & -mask
+        yield ids[low.bit_length() - 1]
+        mask ^= low
+
+
+def _rank_root_causes(seals=None, limit: int = 10) -> dict:
+    """Unhealthy components ranked by the unhealthy components (in `seals`, if
+    given) they explain; critical ones count double."""
+    idx = _root_cause_index()
+    unhealthy, bit, upstream, chain = idx["unhealthy"], idx["bit"], idx["upstream"], idx["chain"]
+    scope = 0
+    for cid in unhealthy:
+        if seals is None or COMP_TO_SEAL.get(cid) in seals:
+            scope |= bit[cid]
+    in_scope = scope.bit_count()
+
+    scored = []
+    for cid in unhealthy:
+        explained = upstream[_scc_of[cid]] & scope & ~bit[cid]
+        # Ranked by blast radius, then depth, then own status; each only breaks ties in the one before.
+        blast_radius = explained.bit_count() + (explained & idx["critical_mask"]).bit_count()  # critical ×2
+        depth = chain[_scc_of[cid]] - 1   # unhealthy layers stacked on it: deeper is likelier the origin
+        own_status = _STATUS_RANK[NODE_MAP[cid]["status"]]   # critical before warning
+        scored.append(((-blast_radius, -depth, own_status), cid, explained, depth))
+    scored.sort(key=lambda t: t[0])
+
+    results = []
+    for (neg_score, _, _), cid, explained, depth in scored[:limit]:
+        sid = _scc_of[cid]
+        node = NODE_MAP[cid]
+        seal = COMP_TO_SEAL.get(cid)
+        explained_seals = {COMP_TO_SEAL.get(u) for u in _bit_members(explained, unhealthy)} - {None}
+        results.append({
+            "id": cid,
+            "label": node["label"],
+            "status": node["status"],
+            "seal": seal,
+            "app": SEAL_LABELS.get(seal, seal) if seal else None,
+            "score": -neg_score,
+            "explains": explained.bit_count(),
+            "explains_critical": (explained & idx["critical_mask"]).bit_count(),
+            "coverage": round(explained.bit_count() / max(1, in_scope - (1 if scope & bit[cid] else 0)), 3),
+            "depth": depth,
+            # No unhealthy dependency outside its own cycle — a likely origin
+            "root": not any(upstream[_scc_of[u]] & bit[cid] for u in unhealthy if _scc_of[u] != sid),
+            "explained_seals": sorted(explained_seals),
+        })
+    return {
+        "health_version": idx["health_version"],
+        "unhealthy_count": in_scope,
+        "root_causes": results,
+    }
+
+
+def _root_causes_by_seal() -> dict[str, list[str]]:
+    """SEAL → root-cause components behind its unhealthy components, the ones
+    explaining the most unhealthy components first. A root cause is an unhealthy
+    component with no unhealthy dependency outside its own cycle; it explains
+    everything unhealthy in its reverse_adj closure. Built once per
+    _health_version on top of the root-cause index."""
+    idx = _root_cause_index()
+    with _snapshot_lock:
+        cached = idx.get("roots_by_seal")
+        if cached is not None:
+            return cached
+        unhealthy, bit, upstream = idx["unhealthy"], idx["bit"], idx["upstream"]
+        scc_mask: dict[int, int] = {}
+        for cid in unhealthy:
+            scc_mask[_scc_of[cid]] = scc_mask.get(_scc_of[cid], 0) | bit[cid]
+        # Anything depending on an unhealthy component in another cycle is downstream, not a root
+        downstream = 0
+        for sid, mask in scc_mask.items():
+            downstream |= upstream[sid] & ~mask
+        roots = [cid for cid in unhealthy if not downstream & bit[cid]]
+        roots.sort(key=lambda cid: -upstream[_scc_of[cid]].bit_count())
+        by_seal: dict[str, list[str]] = {}
+        for root in roots:
+            for seal in {COMP_TO_SEAL.get(u) for u in _bit_members(upstream[_scc_of[root]], unhealthy)} - {None}:
+                by_seal.setdefault(seal, []).append(root)
+        idx["roots_by_seal"] = by_seal
+        return by_seal
+
+
 # ── Endpoints ─────────────────────────────────────────────────────────────────
 
 @app.get("/api/health-summary")
@@ -1189,6 +2244,22 @@ def get_ai_analysis(
         alert = f"All {len(apps)} applications in {scope_label} are operating normally. No active issues detected."
     trend_msg = f"{total_inc} incidents recorded across {len(apps)} applications in the last 30 days." if total_inc > 0 else f"No incidents across {len(apps)} applications in the last 30 days."
     recs = []
+    # Root causes for the unhealthy components of the in-scope apps (may sit outside the scope)
+    ranking = _rank_root_causes({a["seal"] for a in apps}, limit=5) if crits or warns else None
+    causes = [rc for rc in (ranking or {}).get("root_causes", []) if rc["explains"] > 0]
+    causes = sorted(causes, key=lambda rc: not rc["root"])[:2]   # origins before their dependents
+    if causes:
+        top = causes[0]
+        alert += (
+            f" Likely root cause: {top['label']} ({top['app'] or 'unmapped'}) — {top['explains']} of "
+            f"{ranking['unhealthy_count']} unhealthy components in scope depend on it."
+        )
+        for rc in causes:
+            apps_hit = len(rc["explained_seals"])
+            recs.append(
+                f"Start with {rc['label']} ({rc['status']}) — upstream of {rc['explains']} unhealthy "
+                f"component{'s' if rc['explains'] != 1 else ''} across {apps_hit} app{'s' if apps_hit != 1 else ''}"
+            )
     for a in crits[:2]:
         issues = a.get("recent_issues", [])
         desc = issues[0]["description"] if issues else "active critical issue"
@@ -1405,12 +2476,448 @@ def get_recent_activities(
         *_GLOBAL_ACTIVITY_CATEGORIES,
     ]
 
+# ── Node search index ────────────────────────────────────────────────────────
+# Prebuilt lookups behind /api/graph/nodes: a sorted (term, id) list for prefix
+# search via bisect, a trigram → ids map for substring search, id sets per
+# SEAL, raw status and indicator type, and the projectable field names.
+# Terms are lowercased ids and labels.
+# Rebuilt by _reindex_graph(); the status sets follow _set_component_status().
+
+_node_order: dict[str, int] = {}
+_node_terms: list[tuple[str, str]] = []
+_node_trigrams: dict[str, set[str]] = {}
+_nodes_by_status: dict[str, set[str]] = {}
+_nodes_by_indicator_type: dict[str, set[str]] = {}
+_NODE_COMPUTED_FIELDS = {"seal"}
+_node_fields: set[str] = set()   # keys present on any node, plus the computed ones
+
+
+def _trigrams(term: str) -> set[str]:
+    return {term[i:i + 3] for i in range(len(term) - 2)}
+
+
+def _index_nodes():
+    _node_order.clear()
+    _node_trigrams.clear()
+    _nodes_by_status.clear()
+    _nodes_by_indicator_type.clear()
+    _node_fields.clear()
+    _node_fields.update(_NODE_COMPUTED_FIELDS)
+    terms = []
+    for i, n in enumerate(NODES):
+        cid = n["id"]
+        _node_order[cid] = i
+        _node_fields.update(n)
+        for term in {cid.lower(), n["label"].lower()}:
+            terms.append((term, cid))
+            for tri in _trigrams(term):
+                _node_trigrams.setdefault(tri, set()).add(cid)
+        _nodes_by_status.setdefault(n["status"], set()).add(cid)
+    for ind in INDICATOR_NODES:
+        _nodes_by_indicator_type.setdefault(ind["indicator_type"], set()).add(ind["component"])
+    terms.sort()
+    _node_terms[:] = terms
+
+
+def _reindex_node_status(cid: str, old: str, new: str):
+    _nodes_by_status.get(old, set()).discard(cid)
+    _nodes_by_status.setdefault(new, set()).add(cid)
+
+
+def _search_node_ids(q: str, match: str) -> list[str]:
+    """Ids whose id or label matches q; prefix hits first, then NODES order."""
+    q = q.lower()
+    prefix: set[str] = set()
+    i = bisect.bisect_left(_node_terms, (q,))
+    while i < len(_node_terms) and _node_terms[i][0].startswith(q):
+        prefix.add(_node_terms[i][1])
+        i += 1
+    hits = set(prefix)
+    if match == "substring":
+        if len(q) >= 3:
+            postings = sorted((_node_trigrams.get(t, set()) for t in _trigrams(q)), key=len)
+            candidates = set.intersection(*postings) if postings[0] else set()
+            # Trigrams can match out of sequence — confirm against the terms
+            hits |= {
+                cid for cid in candidates
+                if q in cid.lower() or q in NODE_MAP[cid]["label"].lower()
+            }
+        else:
+            hits |= {cid for term, cid in _node_terms if q in term}
+    return sorted(hits, key=lambda cid: (cid not in prefix, _node_order[cid]))
+
+
+_index_nodes()
+
+
 @app.get("/api/graph/nodes")
-def get_all_nodes():
-    return NODES
+def get_all_nodes(
+    response: Response,
+    q: Optional[str] = Query(None, description="Search text over node ids and labels"),
+    match: str = Query("substring", description="prefix or substring"),
+    seal: Optional[str] = Query(None, description="Only components of this SEAL"),
+    status: Optional[str] = Query(None, description="Comma-separated raw statuses"),
+    indicator_type: Optional[str] = Query(None, description="Only components with an indicator of this type"),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return (e.g. id,label,status,seal)"),
+    limit: Optional[int] = Query(None, ge=1, le=1000, description="Page size (default: all)"),
+    offset: int = Query(0, ge=0),
+):
+    """Graph nodes, optionally searched, filtered, projected and paginated.
+    With no parameters this is the full NODES list. X-Total-Count carries the
+    number of matches before pagination."""
+    if match not in ("prefix", "substring"):
+        raise HTTPException(status_code=400, detail=f"Invalid match '{match}' (prefix or substring)")
+    if seal is not None and seal not in SEAL_COMPONENTS:
+        raise HTTPException(status_code=404, detail=f"SEAL '{seal}' not found")
+    field_list = [f.strip() for f in fields.split(",") if f.strip()] if fields else None
+    if field_list:
+        unknown = [f for f in field_list if f not in _node_fields]
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(unknown)}")
+
+    with _snapshot_lock:
+        filters: list[set[str]] = []
+        if seal is not None:
+            filters.append(set(SEAL_COMPONENTS[seal]))
+        if status:
+            filters.append(set().union(*(_nodes_by_status.get(s.strip(), set()) for s in status.split(","))))
+        if indicator_type:
+            filters.append(set(_nodes_by_indicator_type.get(indicator_type, set())))
+        if filters:
+            allowed = set.intersection(*filters)
+        if q:
+            ids = _search_node_ids(q, match)
+            if filters:
+                ids = [cid for cid in ids if cid in allowed]
+        elif filters:
+            ids = sorted(allowed, key=_node_order.__getitem__)
+        else:
+            ids = None
+
+    if ids is None:
+        nodes = NODES
+    else:
+        nodes = [NODE_MAP[cid] for cid in ids]
+    response.headers["X-Total-Count"] = str(len(nodes))
+    page = nodes[offset:offset + limit] if limit is not None else nodes[offset:]
+    if field_list:
+        page = [
+            {f: (COMP_TO_SEAL.get(n["id"]) if f == "seal" else n.get(f)) for f in field_list}
+            for n in page
+        ]
+    return page
+
+
+class ComponentStatusUpdate(BaseModel):
+    status: str  # critical, warning, healthy
+
+
+@app.put("/api/graph/nodes/{service_id}/status")
+def set_component_status(service_id: str, payload: ComponentStatusUpdate):
+    """Ingest a component health change (e.g. from a monitoring feed).
+    Only the upstream components whose effective status moves are re-evaluated,
+    and only the apps/deployments containing them are rebuilt on the next read."""
+    if service_id not in NODE_MAP:
+        raise HTTPException(status_code=404, detail=f"Service '{service_id}' not found")
+    if payload.status not in ("critical", "warning", "healthy"):
+        raise HTTPException(status_code=400, detail=f"Invalid status '{payload.status}'")
+    with _state_sync_lock:
+        moved = _set_component_status(service_id, payload.status)
+        _publish_state_event("node_status", service_id, {"status": payload.status})
+    return {
+        "node": NODE_MAP[service_id],
+        "effective_status_changed": sorted(moved),
+    }
+
+
+@_state_event_handler("node_status")
+def _apply_node_status_event(service_id: str, payload: dict):
+    if service_id in NODE_MAP:
+        _set_component_status(service_id, payload["status"])
+
+# ── Server-side layered layout ───────────────────────────────────────────────
+# Sugiyama-style layout so the graph views only render: back edges reversed
+# (DFS), longest-path ranking, dummy nodes on long edges, barycenter sweeps for
+# crossing reduction, then median alignment within each rank. Ranks flow left
+# to right (x); node sizes and spacings mirror the frontend components.
+# Layouts depend on topology only and are cached per _topology_version.
+
+_topology_version = 0      # bumped by _reindex_graph()
+
+LAYERS_LAYOUT = {          # LayeredDependencyFlow.jsx: NODE_DIMS.service + PAD_X/PAD_Y
+    "size": (240, 80), "ranksep": 90, "nodesep": 25, "margin": (30, 20),
+}
+DEPENDENCY_LAYOUT = {      # DependencyFlow.jsx: SVC_W/SVC_H, ROOT_W/ROOT_H + NODE_PAD_X/Y
+    "size": (206, 60), "root_size": (226, 72), "ranksep": 220, "nodesep": 60, "margin": (60, 40),
+}
+_LAYOUT_CACHE_MAX = 512
+_LAYOUT_DUMMY_FACTOR = 2   # dummy-node budget per node + edge
+
+_layout_cache: "OrderedDict[tuple, dict]" = OrderedDict()
+_layout_lock = threading.Lock()
+
+
+def _count_crossings(upper: list[int], lower_size: int, pos: list[int], down: list[list[int]]) -> int:
+    """Edge crossings between a rank (in order) and the next one, counted as
+    inversions of target positions with a Fenwick tree."""
+    tree = [0] * (lower_size + 1)
+    crossings = seen = 0
+    for v in upper:
+        for t in sorted(pos[w] + 1 for w in down[v]):
+            j = t
+            le = 0
+            while j > 0:
+                le += tree[j]
+                j -= j & -j
+            crossings += seen - le
+            seen += 1
+            while t <= lower_size:
+                tree[t] += 1
+                t += t & -t
+    return crossings
+
+
+def _layered_layout(
+    node_ids: list[str],
+    edges: list[tuple[str, str]],
+    size: tuple[float, float],
+    ranksep: float,
+    nodesep: float,
+    margin: tuple[float, float] = (0, 0),
+    sizes: dict[str, tuple[float, float]] | None = None,
+    sweeps: int = 4,
+) -> dict[str, dict]:
+    """Return node centre coordinates {id: {"x", "y"}}; edges are (source, target)."""
+    n = len(node_ids)
+    if n == 0:
+        return {}
+    idx = {nid: i for i, nid in enumerate(node_ids)}
+    succ: list[set[int]] = [set() for _ in range(n)]
+    pred: list[set[int]] = [set() for _ in range(n)]
+    for src, dst in edges:
+        a, b = idx.get(src), idx.get(dst)
+        if a is not None and b is not None and a != b:
+            succ[a].add(b)
+            pred[b].add(a)
+
+    # 1. Cycle removal — Eades–Lin–Smyth greedy order (sinks to the right,
+    #    sources to the left, otherwise max outdeg−indeg); edges running
+    #    backwards in that order are reversed
+    outdeg = [len(s) for s in succ]
+    indeg = [len(p) for p in pred]
+    removed = [False] * n
+    sinks = [v for v in range(n) if outdeg[v] == 0]
+    sources = [v for v in range(n) if indeg[v] == 0 and outdeg[v]]
+    heap = [(indeg[v] - outdeg[v], v) for v in range(n)]
+    heapq.heapify(heap)
+    left: list[int] = []
+    right: list[int] = []
+    while len(left) + len(right) < n:
+        if sinks:
+            v = sinks.pop()
+            if removed[v]:
+                continue
+            right.append(v)
+        elif sources:
+            v = sources.pop()
+            if removed[v]:
+                continue
+            left.append(v)
+        else:
+            delta, v = heapq.heappop(heap)
+            if removed[v] or delta != indeg[v] - outdeg[v]:
+                continue
+            left.append(v)
+        removed[v] = True
+        for w in succ[v]:
+            if not removed[w]:
+                indeg[w] -= 1
+                if indeg[w] == 0:
+                    sources.append(w)
+                heapq.heappush(heap, (indeg[w] - outdeg[w], w))
+        for u in pred[v]:
+            if not removed[u]:
+                outdeg[u] -= 1
+                if outdeg[u] == 0:
+                    sinks.append(u)
+                heapq.heappush(heap, (indeg[u] - outdeg[u], u))
+    topo = left + right[::-1]
+    order_pos = [0] * n
+    for i, v in enumerate(topo):
+        order_pos[v] = i
+    dag: list[set[int]] = [set() for _ in range(n)]
+    dag_pred: list[set[int]] = [set() for _ in range(n)]
+    for v in range(n):
+        for w in succ[v]:
+            a, b = (v, w) if order_pos[v] < order_pos[w] else (w, v)
+            dag[a].add(b)
+            dag_pred[b].add(a)
+
+    # 2. Ranking — longest path from sources, then pull sources next to their successors
+    rank = [0] * n
+    for v in topo:
+        for w in dag[v]:
+            if rank[w] < rank[v] + 1:
+                rank[w] = rank[v] + 1
+    for v in reversed(topo):
+        if not dag_pred[v] and dag[v]:
+            rank[v] = min(rank[w] for w in dag[v]) - 1
+
+    # 3. Proper layering — dummy nodes on edges spanning several ranks, shortest
+    #    spans first; past the budget the longest edges skip crossing reduction
+    rank_of = list(rank)
+    up: list[list[int]] = [[] for _ in range(n)]
+    down: list[list[int]] = [[] for _ in range(n)]
+    budget = _LAYOUT_DUMMY_FACTOR * (n + sum(map(len, dag)))
+    for span, v, w in sorted((rank[w] - rank[v], v, w) for v in topo for w in dag[v]):
+        if span > 1:
+            if budget < span - 1:
+                break
+            budget -= span - 1
+        prev = v
+        for r in range(rank[v] + 1, rank[w]):
+            d = len(rank_of)
+            rank_of.append(r)
+            up.append([prev])
+            down.append([])
+            down[prev].append(d)
+            prev = d
+        down[prev].append(w)
+        up[w].append(prev)
+    total = len(rank_of)
+    lo = min(rank_of)
+    layers: list[list[int]] = [[] for _ in range(max(rank_of) - lo + 1)]
+    for v in topo:
+        layers[rank_of[v] - lo].append(v)
+    for d in range(n, total):
+        layers[rank_of[d] - lo].append(d)
+
+    # 4. Crossing reduction — barycenter sweeps down then up; keep the best
+    #    ordering seen after each down/up round
+    pos = [0] * total
+    for layer in layers:
+        for i, v in enumerate(layer):
+            pos[v] = i
+
+    def crossings() -> int:
+        return sum(_count_crossings(layers[r], len(layers[r + 1]), pos, down) for r in range(len(layers) - 1))
+
+    best = crossings()
+    best_layers = [list(layer) for layer in layers]
+    for sweep in range(sweeps):
+        downward = sweep % 2 == 0
+        span = range(1, len(layers)) if downward else range(len(layers) - 2, -1, -1)
+        for r in span:
+            layer = layers[r]
+            nbrs = up if downward else down
+            layer.sort(key=lambda v: sum(pos[u] for u in nbrs[v]) / len(nbrs[v]) if nbrs[v] else pos[v])
+            for i, v in enumerate(layer):
+                pos[v] = i
+        if best == 0:
+            break
+        if downward and sweep < sweeps - 1:
+            continue
+        c = crossings()
+        if c < best:
+            best = c
+            best_layers = [list(layer) for layer in layers]
+    layers = best_layers
+
+    # 5. Coordinates — cross-axis packing, then median alignment with neighbours
+    sizes = sizes or {}
+    dims = [sizes.get(node_ids[v], size) if v < n else (0, 0) for v in range(total)]
+
+    half_h = [d[1] / 2 for d in dims]
+
+    def gap(a: int, b: int) -> float:
+        return half_h[a] + half_h[b] + (nodesep if a < n and b < n else nodesep / 2)
+
+    y = [0.0] * total
+    for layer in layers:
+        offset = 0.0
+        for i, v in enumerate(layer):
+            if i:
+                offset += gap(layer[i - 1], v)
+            y[v] = offset
+        shift = offset / 2
+        for v in layer:
+            y[v] -= shift
+
+    def median(vals: list[float]) -> float:
+        vals = sorted(vals)
+        m = len(vals) // 2
+        return vals[m] if len(vals) % 2 else (vals[m - 1] + vals[m]) / 2
+
+    for sweep in range(sweeps):
+        downward = sweep % 2 == 0
+        nbrs = up if downward else down
+        for layer in (layers if downward else reversed(layers)):
+            want = [median([y[u] for u in nbrs[v]]) if nbrs[v] else y[v] for v in layer]
+            # Feasible from the left and from the right, then split the difference
+            left = list(want)
+            for i in range(1, len(layer)):
+                left[i] = max(left[i], left[i - 1] + gap(layer[i - 1], layer[i]))
+            right = list(want)
+            for i in range(len(layer) - 2, -1, -1):
+                right[i] = min(right[i], right[i + 1] - gap(layer[i], layer[i + 1]))
+            placed = [(a + b) / 2 for a, b in zip(left, right)]
+            for i in range(1, len(layer)):
+                placed[i] = max(placed[i], placed[i - 1] + gap(layer[i - 1], layer[i]))
+            for v, yv in zip(layer, placed):
+                y[v] = yv
+
+    # Rank axis — each rank as wide as its widest node
+    x_of_layer = []
+    x = 0.0
+    prev_w = None
+    for layer in layers:
+        w = max((dims[v][0] for v in layer), default=0)
+        if prev_w is not None:
+            x += prev_w / 2 + ranksep + w / 2
+        x_of_layer.append(x)
+        prev_w = w
+
+    min_x = min(x_of_layer[rank_of[v] - lo] - dims[v][0] / 2 for v in range(n))
+    min_y = min(y[v] - dims[v][1] / 2 for v in range(n))
+    return {
+        node_ids[v]: {
+            "x": round(x_of_layer[rank_of[v] - lo] - min_x + margin[0], 1),
+            "y": round(y[v] - min_y + margin[1], 1),
+        }
+        for v in range(n)
+    }
+
+
+def _cached_layout(key: tuple, build) -> dict:
+    """LRU-cached layout for the current topology; build() computes it on a miss."""
+    cache_key = (_topology_version, *key)
+    with _layout_lock:
+        hit = _layout_cache.get(cache_key)
+        if hit is not None:
+            _layout_cache.move_to_end(cache_key)
+            return hit
+    layout = {"topology_version": cache_key[0], "rankdir": "LR", **build()}
+    with _layout_lock:
+        _layout_cache[cache_key] = layout
+        while len(_layout_cache) > _LAYOUT_CACHE_MAX:
+            _layout_cache.popitem(last=False)
+    return layout
+
+
+def _subgraph_layout(kind: str, root_id: str, node_ids: list[str], edges: list[dict]) -> dict:
+    cfg = DEPENDENCY_LAYOUT
+    return _cached_layout((kind, root_id), lambda: {"positions": _layered_layout(
+        node_ids, [(e["source"], e["target"]) for e in edges],
+        cfg["size"], cfg["ranksep"], cfg["nodesep"], cfg["margin"],
+        sizes={root_id: cfg["root_size"]},
+    )})
+
 
 @app.get("/api/graph/dependencies/{service_id}")
-def get_dependencies(service_id: str):
+def get_dependencies(
+    service_id: str,
+    layout: bool = Query(True, description="Include precomputed node coordinates"),
+):
     if service_id not in NODE_MAP:
         raise HTTPException(status_code=404, detail=f"Service '{service_id}' not found")
     dep_ids = bfs(service_id, forward_adj)
@@ -1424,10 +2931,17 @@ def get_dependencies(service_id: str):
         if src in subgraph_ids and dst in subgraph_ids:
             edges.append({"source": src, "target": dst})
 
-    return {"root": root, "dependencies": dependencies, "edges": edges}
+    result = {"root": root, "dependencies": dependencies, "edges": edges, "versions": _graph_versions()}
+    if layout:
+        result["layout"] = _subgraph_layout("dependencies", service_id, [service_id, *dep_ids], edges)
+    return result
 
 @app.get("/api/graph/blast-radius/{service_id}")
-def get_blast_radius(service_id: str):
+def get_blast_radius(
+    service_id: str,
+    rollup: bool = Query(False, description="Include impacted apps, deployments, platforms and data centers"),
+    layout: bool = Query(True, description="Include precomputed node coordinates"),
+):
     if service_id not in NODE_MAP:
         raise HTTPException(status_code=404, detail=f"Service '{service_id}' not found")
     impacted_ids = bfs(service_id, reverse_adj)
@@ -1441,7 +2955,388 @@ def get_blast_radius(service_id: str):
         if src in subgraph_ids and dst in subgraph_ids:
             edges.append({"source": src, "target": dst})
 
-    return {"root": root, "impacted": impacted, "edges": edges}
+    result = {"root": root, "impacted": impacted, "edges": edges, "versions": _graph_versions()}
+    if layout:
+        result["layout"] = _subgraph_layout("blast-radius", service_id, [service_id, *impacted_ids], edges)
+    if rollup:
+        # The failing service itself is part of what breaks
+        result["rollup"] = _rollup_impact(subgraph_ids)
+    return result
+
+def _shortest_path(src: str, dst: str) -> list[str] | None:
+    """Bidirectional BFS — forward from src over forward_adj, backward from dst
+    over reverse_adj, always expanding the smaller frontier one full level."""
+    if src == dst:
+        return [src]
+    parent_f: dict[str, str | None] = {src: None}
+    parent_b: dict[str, str | None] = {dst: None}
+    dist_f = {src: 0}
+    dist_b = {dst: 0}
+    frontier_f, frontier_b = [src], [dst]
+    while frontier_f and frontier_b:
+        forward = len(frontier_f) <= len(frontier_b)
+        frontier, adj = (frontier_f, forward_adj) if forward else (frontier_b, reverse_adj)
+        parent, dist, other = (parent_f, dist_f, dist_b) if forward else (parent_b, dist_b, dist_f)
+        nxt = []
+        meet = None
+        for u in frontier:
+            for v in adj.get(u, []):
+                if v in parent:
+                    continue
+                parent[v] = u
+                dist[v] = dist[u] + 1
+                nxt.append(v)
+                # Finish the level: meetings at different depths of the other side differ in length
+                if v in other and (meet is None or other[v] < other[meet]):
+                    meet = v
+        if meet is not None:
+            path = []
+            node = meet
+            while node is not None:
+                path.append(node)
+                node = parent_f[node]
+            path.reverse()
+            node = parent_b[meet]
+            while node is not None:
+                path.append(node)
+                node = parent_b[node]
+            return path
+        if forward:
+            frontier_f = nxt
+        else:
+            frontier_b = nxt
+    return None
+
+
+PATH_EXPANSION_BUDGET = 1_000_000   # edges a k_shortest / all search may examine before it gives up
+
+
+def _simple_paths(src: str, dst: str, max_length: int, limit: int, shortest: bool) -> tuple[list[list[str]], bool]:
+    """Simple paths src → dst of at most max_length edges, found in one DFS and
+    returned shortest first. Branches that can no longer reach dst within the
+    length budget are pruned using hop distances to dst (BFS over reverse_adj).
+
+    shortest=True keeps the `limit` shortest paths: once that many are held,
+    branches that cannot beat the longest of them are cut (branch and bound).
+    Otherwise the search stops at the first `limit` paths. Either way it examines
+    at most PATH_EXPANSION_BUDGET edges. `truncated` is True when the limit or
+    the budget may have hidden paths."""
+    if src == dst:
+        return [[src]], False
+    to_dst = {dst: 0}
+    queue: deque[str] = deque([dst])
+    while queue:
+        curr = queue.popleft()
+        if to_dst[curr] >= max_length:
+            continue
+        for neighbor in reverse_adj.get(curr, []):
+            if neighbor not in to_dst:
+                to_dst[neighbor] = to_dst[curr] + 1
+                queue.append(neighbor)
+    if src not in to_dst:
+        return [], False
+
+    found: list[tuple[int, int, list[str]]] = []   # max-heap on length: (-edges, -seq, path)
+    bound = max_length
+    truncated = False
+    expansions = 0
+    path = [src]
+    on_path = {src}
+    stack = [iter(forward_adj.get(src, []))]
+    while stack:
+        nxt = next(stack[-1], None)
+        if nxt is None:
+            stack.pop()
+            on_path.discard(path.pop())
+            continue
+        expansions += 1
+        if expansions > PATH_EXPANSION_BUDGET:
+            truncated = True
+            break
+        depth = len(path)  # edges used once nxt is appended
+        if nxt in on_path or nxt not in to_dst or depth + to_dst[nxt] > max_length:
+            continue
+        if depth + to_dst[nxt] > bound:
+            truncated = True   # only paths no shorter than the k held lie this way
+            continue
+        if nxt == dst:
+            if len(found) == limit:
+                truncated = True
+                if not shortest:
+                    break
+                heapq.heapreplace(found, (-depth, -expansions, path + [dst]))
+            else:
+                heapq.heappush(found, (-depth, -expansions, path + [dst]))
+            if shortest and len(found) == limit:
+                bound = -found[0][0] - 1
+            continue
+        path.append(nxt)
+        on_path.add(nxt)
+        stack.append(iter(forward_adj.get(nxt, [])))
+    return [p for _, _, p in sorted(found, key=lambda f: (-f[0], -f[1]))], truncated
+
+
+@app.get("/api/graph/path")
+def get_graph_path(
+    from_id: str = Query(..., alias="from", description="Source service id"),
+    to_id: str = Query(..., alias="to", description="Target service id (a dependency of the source)"),
+    mode: str = Query("shortest", description="shortest, k_shortest or all"),
+    k: int = Query(5, ge=1, le=50, description="Number of paths for k_shortest"),
+    max_length: int = Query(10, ge=1, le=25, description="Max edges per path (k_shortest/all)"),
+    max_paths: int = Query(100, ge=1, le=1000, description="Cap on paths returned by all"),
+):
+    """How does `from` reach `to` along dependency edges?"""
+    for sid in (from_id, to_id):
+        if sid not in NODE_MAP:
+            raise HTTPException(status_code=404, detail=f"Service '{sid}' not found")
+    if mode not in ("shortest", "k_shortest", "all"):
+        raise HTTPException(status_code=400, detail=f"Invalid mode '{mode}'")
+
+    truncated = False
+    if mode == "shortest":
+        path = _shortest_path(from_id, to_id)
+        paths = [path] if path else []
+    elif mode == "k_shortest":
+        paths, truncated = _simple_paths(from_id, to_id, max_length, k, shortest=True)
+    else:
+        paths, truncated = _simple_paths(from_id, to_id, max_length, max_paths, shortest=False)
+
+    node_ids: list[str] = []
+    seen_nodes: set[str] = set()
+    edges = []
+    seen_edges: set[tuple[str, str]] = set()
+    for path in paths:
+        for i, nid in enumerate(path):
+            if nid not in seen_nodes:
+                seen_nodes.add(nid)
+                node_ids.append(nid)
+            if i and (path[i - 1], nid) not in seen_edges:
+                seen_edges.add((path[i - 1], nid))
+                edges.append({"source": path[i - 1], "target": nid})
+
+    return {
+        "from": NODE_MAP[from_id],
+        "to": NODE_MAP[to_id],
+        "mode": mode,
+        "reachable": bool(paths),
+        "distance": len(paths[0]) - 1 if paths else None,
+        "paths": paths,
+        "truncated": truncated,
+        "nodes": [NODE_MAP[nid] for nid in node_ids],
+        "edges": edges,
+    }
+
+@app.get("/api/graph/root-causes")
+def get_root_causes(
+    seal: list[str] | None = Query(None, description="Only count unhealthy components of these SEALs"),
+    limit: int = Query(10, ge=1, le=100),
+):
+    """Unhealthy components ranked by how much of the unhealthy set depends on them."""
+    for s in seal or []:
+        if s not in SEAL_COMPONENTS:
+            raise HTTPException(status_code=404, detail=f"SEAL '{s}' not found")
+    return _rank_root_causes(set(seal) if seal else None, limit)
+
+
+# ── Graph versions & view diffs ──────────────────────────────────────────────
+# _topology_version moves when the graph is re-indexed, _health_version on every
+# raw status change. Graph views report both; /api/graph/diff turns a client's
+# versions into node/edge and status deltas for one view, using a bounded
+# status-change log, the current topology and the added/removed items of the
+# last few topology versions. Older topologies are rebuilt by undoing deltas.
+
+_STATUS_LOG_MAX = 10_000
+_TOPOLOGY_HISTORY_MAX = 4          # topology versions a client can diff back
+_TOPOLOGY_DELTA_MAX = 50_000       # larger re-indexes are not kept — clients refetch
+_TOPOLOGY_PARTS = ("node_ids", "edges", "seal_members", "platform_edges", "indicators")
+
+_status_log: deque = deque(maxlen=_STATUS_LOG_MAX)   # (health_version, component id)
+_status_log_floor = 0      # oldest health version the log can still diff from
+_topology_current: dict | None = None   # {"version", part: frozenset, ...}
+# (version before, {part: (added, removed)} or None if too large), oldest first
+_topology_deltas: deque = deque(maxlen=_TOPOLOGY_HISTORY_MAX)
+_DIFF_VIEWS = ("dependencies", "blast-radius", "layers")
+
+
+def _graph_versions() -> dict:
+    return {"topology": _topology_version, "health": _health_version}
+
+
+def _record_status_change(cid: str):
+    global _status_log_floor
+    if len(_status_log) == _status_log.maxlen:
+        _status_log_floor = _status_log[0][0]
+    _status_log.append((_health_version, cid))
+
+
+def _record_topology():
+    """Record the current topology and its delta from the previous version."""
+    global _topology_current
+    new = {
+        "version": _topology_version,
+        "node_ids": frozenset(NODE_MAP),
+        "edges": frozenset(EDGES_RAW),
+        "seal_members": frozenset((sid, cid) for sid, comps in SEAL_COMPONENTS.items() for cid in comps),
+        "platform_edges": frozenset(COMPONENT_PLATFORM_EDGES),
+        "indicators": frozenset((ind["id"], ind["component"]) for ind in INDICATOR_NODES),
+    }
+    old = _topology_current
+    if old is not None:
+        delta = {part: (new[part] - old[part], old[part] - new[part]) for part in _TOPOLOGY_PARTS}
+        size = sum(len(added) + len(removed) for added, removed in delta.values())
+        _topology_deltas.append((old["version"], delta if size <= _TOPOLOGY_DELTA_MAX else None))
+    _topology_current = new
+
+
+def _topology_at(version: int) -> dict | None:
+    """The topology as of `version`: the current one with newer deltas undone.
+    None when that version is no longer (or was never) recorded."""
+    snap = _topology_current
+    if version == snap["version"]:
+        return snap
+    parts = {part: set(snap[part]) for part in _TOPOLOGY_PARTS}
+    for before, delta in reversed(_topology_deltas):
+        if delta is None:
+            return None
+        for part, (added, removed) in delta.items():
+            parts[part] -= added
+            parts[part] |= removed
+        if before == version:
+            return {"version": version, **parts}
+    return None
+
+
+def _snapshot_index(snap: dict, name: str):
+    """Adjacency / lookup built lazily per topology snapshot."""
+    if name not in snap:
+        if name in ("forward", "reverse"):
+            adj: dict[str, list[str]] = {}
+            for src, dst in snap["edges"]:
+                a, b = (src, dst) if name == "forward" else (dst, src)
+                adj.setdefault(a, []).append(b)
+            snap[name] = adj
+        elif name == "seals":
+            seals: dict[str, set[str]] = {}
+            for sid, cid in snap["seal_members"]:
+                seals.setdefault(sid, set()).add(cid)
+            snap[name] = seals
+        elif name == "comp_to_seal":
+            snap[name] = {cid: sid for sid, cid in sorted(snap["seal_members"])}
+    return snap[name]
+
+
+def _view_subgraph(snap: dict, view: str, key: str) -> tuple[set[str], set[tuple[str, str]]]:
+    """Node ids and (source, target) edges of one graph view in a topology snapshot."""
+    ids = snap["node_ids"]
+    if view in ("dependencies", "blast-radius"):
+        if key not in ids:
+            return set(), set()
+        adj = _snapshot_index(snap, "forward" if view == "dependencies" else "reverse")
+        nodes = {key, *bfs(key, adj)}
+        return nodes, {(s, d) for s, d in snap["edges"] if s in nodes and d in nodes}
+
+    comp_to_seal = _snapshot_index(snap, "comp_to_seal")
+    comps = {cid for cid in _snapshot_index(snap, "seals").get(key, ()) if cid in ids}
+    nodes = set(comps)
+    edges: set[tuple[str, str]] = set()
+    for src, dst in snap["edges"]:
+        if src in comps or dst in comps:
+            other = dst if src in comps else src
+            if other in comps or (other in ids and comp_to_seal.get(other, key) != key):
+                nodes.add(other)
+                edges.add((src, dst))
+    for comp_id, plat_id in snap["platform_edges"]:
+        if comp_id in comps:
+            nodes.add(plat_id)
+            edges.add((comp_id, plat_id))
+            dc_id = DC_LOOKUP.get(PLATFORM_NODE_MAP.get(plat_id, {}).get("datacenter"))
+            if dc_id:
+                nodes.add(dc_id)
+                edges.add((plat_id, dc_id))
+    for ind_id, comp_id in snap["indicators"]:
+        if comp_id in comps:
+            nodes.add(ind_id)
+            edges.add((comp_id, ind_id))
+    return nodes, edges
+
+
+def _view_node(nid: str, lookups: dict) -> dict:
+    if nid in NODE_MAP:
+        return NODE_MAP[nid]
+    if nid in PLATFORM_NODE_MAP:
+        return PLATFORM_NODE_MAP[nid]
+    if not lookups:
+        lookups.update({n["id"]: n for n in DATA_CENTER_NODES})
+        lookups.update({n["id"]: n for n in INDICATOR_NODES})
+    return lookups.get(nid, {"id": nid})
+
+
+_record_topology()
+
+
+@app.get("/api/graph/diff")
+def get_graph_diff(
+    view: str = Query(..., description="dependencies, blast-radius or layers"),
+    key: str = Query(..., alias="id", description="Service id, or SEAL for layers"),
+    since_topology: int = Query(..., ge=0, description="versions.topology the client holds"),
+    since_health: int = Query(..., ge=0, description="versions.health the client holds"),
+):
+    """What changed in one graph view since the client's versions. `full_refresh`
+    means the versions are too old to diff — refetch the view."""
+    if view not in _DIFF_VIEWS:
+        raise HTTPException(status_code=400, detail=f"Invalid view '{view}'")
+    if view == "layers" and key not in SEAL_COMPONENTS:
+        raise HTTPException(status_code=404, detail=f"SEAL '{key}' not found")
+    if view != "layers" and key not in NODE_MAP:
+        raise HTTPException(status_code=404, detail=f"Service '{key}' not found")
+
+    with _snapshot_lock:
+        versions = _graph_versions()
+        if since_topology > versions["topology"] or since_health > versions["health"]:
+            raise HTTPException(status_code=400, detail="Versions are ahead of the server")
+        result = {
+            "view": view,
+            "id": key,
+            "from": {"topology": since_topology, "health": since_health},
+            "to": versions,
+            "full_refresh": False,
+            "nodes": {"added": [], "removed": []},
+            "edges": {"added": [], "removed": []},
+            "status_changes": [],
+        }
+        old = _topology_at(since_topology)
+        if old is None or since_health < _status_log_floor:
+            result["full_refresh"] = True
+            return result
+
+        current = _topology_current
+        nodes, edges = _view_subgraph(current, view, key)
+        if old is current:
+            changed = set()
+            for version, cid in reversed(_status_log):
+                if version <= since_health:
+                    break
+                changed.add(cid)
+            changed &= nodes
+        else:
+            old_nodes, old_edges = _view_subgraph(old, view, key)
+            lookups: dict = {}
+            result["nodes"] = {
+                "added": [_view_node(nid, lookups) for nid in sorted(nodes - old_nodes)],
+                "removed": sorted(old_nodes - nodes),
+            }
+            result["edges"] = {
+                "added": [{"source": s, "target": d} for s, d in sorted(edges - old_edges)],
+                "removed": [{"source": s, "target": d} for s, d in sorted(old_edges - edges)],
+            }
+            # The node list itself was replaced — report every surviving component
+            changed = nodes & old_nodes
+        result["status_changes"] = [
+            {"id": cid, "status": NODE_MAP[cid]["status"]}
+            for cid in sorted(changed, key=lambda c: _node_order.get(c, 0)) if cid in NODE_MAP
+        ]
+        return result
+
 
 @app.get("/api/graph/layer-seals")
 def get_layer_seals():
@@ -1503,6 +3398,23 @@ BIDIRECTIONAL_PAIRS = {
 }
 
 
+def _seal_layers_layout(seal_id: str, component_ids: list[str], external_ids: list[str], component_edges: list[dict]) -> dict:
+    """Component-layer coordinates with and without the cross-app (external) nodes —
+    the client picks one depending on its cross-app toggle."""
+    cfg = LAYERS_LAYOUT
+
+    def build():
+        internal_edges = [(e["source"], e["target"]) for e in component_edges if "cross_seal" not in e]
+        all_edges = [(e["source"], e["target"]) for e in component_edges]
+        args = (cfg["size"], cfg["ranksep"], cfg["nodesep"], cfg["margin"])
+        return {
+            "positions": _layered_layout([*component_ids, *external_ids], all_edges, *args),
+            "internal_positions": _layered_layout(component_ids, internal_edges, *args),
+        }
+
+    return _cached_layout(("layers", seal_id), build)
+
+
 @app.get("/api/graph/layers/{seal_id}")
 def get_graph_layers(seal_id: str):
     if seal_id not in SEAL_COMPONENTS:
@@ -1569,13 +3481,108 @@ def get_graph_layers(seal_id: str):
 
     return {
         "seal": seal_id,
-        "components": {"nodes": component_nodes, "edges": component_edges, "external_nodes": external_nodes},
+        "versions": _graph_versions(),
+        "components": {
+            "nodes": component_nodes,
+            "edges": component_edges,
+            "external_nodes": external_nodes,
+            "layout": _seal_layers_layout(
+                seal_id,
+                [n["id"] for n in component_nodes],
+                sorted(n["id"] for n in external_nodes),
+                component_edges,
+            ),
+        },
         "platform":   {"nodes": platform_nodes,   "edges": platform_edge_list},
         "datacenter": {"nodes": dc_nodes,          "edges": dc_edge_list},
         "indicators": {"nodes": indicator_nodes,   "edges": indicator_edges},
     }
 
 
+# ── SEAL-level condensed dependency graph ────────────────────────────────────
+# Component edges collapsed to app (SEAL) edges: (source, target) means an app
+# depends on another app through at least one component edge. Topology only —
+# node statuses are overlaid per request from the enrichment snapshot.
+
+_seal_graph_cache: dict | None = None
+
+
+def _get_seal_graph() -> dict:
+    """Build (once) the SEAL×SEAL dependency graph from COMP_TO_SEAL and EDGES_RAW."""
+    global _seal_graph_cache
+    if _seal_graph_cache is not None:
+        return _seal_graph_cache
+
+    pair_counts: dict[tuple[str, str], int] = {}
+    bi_pairs: set[tuple[str, str]] = set()
+    for src, dst in EDGES_RAW:
+        a, b = COMP_TO_SEAL.get(src), COMP_TO_SEAL.get(dst)
+        if not a or not b or a == b:
+            continue
+        pair_counts[(a, b)] = pair_counts.get((a, b), 0) + 1
+        if (src, dst) in BIDIRECTIONAL_PAIRS or (dst, src) in BIDIRECTIONAL_PAIRS:
+            bi_pairs.add((a, b))
+
+    forward: dict[str, list[str]] = {s: [] for s in SEAL_COMPONENTS}
+    reverse: dict[str, list[str]] = {s: [] for s in SEAL_COMPONENTS}
+    edges = []
+    for (a, b), count in sorted(pair_counts.items()):
+        forward[a].append(b)
+        reverse[b].append(a)
+        bidirectional = (b, a) in pair_counts or (a, b) in bi_pairs
+        edges.append({"source": a, "target": b, "count": count, "direction": "bi" if bidirectional else "uni"})
+
+    nodes = [
+        {"seal": s, "label": SEAL_LABELS.get(s, s), "component_count": len(comps)}
+        for s, comps in SEAL_COMPONENTS.items()
+    ]
+    _seal_graph_cache = {
+        "nodes": nodes,
+        "node_map": {n["seal"]: n for n in nodes},
+        "edges": edges,
+        "forward": forward,
+        "reverse": reverse,
+    }
+    return _seal_graph_cache
+
+
+def _with_app_status(seal_nodes: list[dict]) -> list[dict]:
+    status_by_seal = {a["seal"]: a["status"] for a in _get_enriched_apps()}
+    return [{**n, "status": status_by_seal.get(n["seal"], "no_data")} for n in seal_nodes]
+
+
+@app.get("/api/graph/seal-graph")
+def get_seal_graph():
+    """App-to-app dependency graph with per-edge component edge counts."""
+    graph = _get_seal_graph()
+    return {"nodes": _with_app_status(graph["nodes"]), "edges": graph["edges"]}
+
+
+@app.get("/api/graph/seal-graph/{seal_id}")
+def get_seal_graph_traversal(
+    seal_id: str,
+    direction: str = Query("downstream", description="downstream (apps this app depends on), upstream (apps depending on it) or both"),
+):
+    """App-level dependency (downstream) or blast-radius (upstream) traversal."""
+    graph = _get_seal_graph()
+    if seal_id not in graph["node_map"]:
+        raise HTTPException(status_code=404, detail=f"SEAL '{seal_id}' not found")
+    if direction not in ("downstream", "upstream", "both"):
+        raise HTTPException(status_code=400, detail=f"Invalid direction '{direction}'")
+
+    downstream = bfs(seal_id, graph["forward"]) if direction in ("downstream", "both") else []
+    upstream = bfs(seal_id, graph["reverse"]) if direction in ("upstream", "both") else []
+    subgraph_ids = {seal_id} | set(downstream) | set(upstream)
+    edges = [e for e in graph["edges"] if e["source"] in subgraph_ids and e["target"] in subgraph_ids]
+    return {
+        "root": _with_app_status([graph["node_map"][seal_id]])[0],
+        "direction": direction,
+        "downstream": _with_app_status([graph["node_map"][s] for s in downstream]),
+        "upstream": _with_app_status([graph["node_map"][s] for s in upstream]),
+        "edges": edges,
+    }
+
+
 # ── Enriched Applications ────────────────────────────────────────────────────
 
 PRODUCT_MAPPING = {}  # No longer needed — product info is embedded in app data
@@ -1686,243 +3693,559 @@ for _comp_id, _plat_id in COMPONENT_PLATFORM_EDGES:
     _comp_platform_map.setdefault(_comp_id, []).append(_plat_id)
 
 
-@app.get("/api/applications/enriched")
-def get_enriched_applications():
-    """Return all apps enriched with components, deployments, SLO, and completeness."""
-    from collections import OrderedDict
-    from apps_registry import APPS_REGISTRY
+def _comp_slo(node, eff_status):
+    """Compute deterministic component SLO from SLA target and effective status."""
+    if eff_status == "no_data":
+        return None
+    try:
+        target = float(node["sla"].replace("%", ""))
+    except (ValueError, KeyError):
+        target = 99.0
+    if eff_status == "critical":
+        return round(target - 1.5 - (node.get("incidents_30d", 0) * 0.08), 2)
+    elif eff_status == "warning":
+        return round(target - 0.4 - (node.get("incidents_30d", 0) * 0.05), 2)
+    else:
+        return round(target - 0.05, 2)
 
-    APPS_BACKEND = APPS_REGISTRY
 
-    results = []
-    for app in APPS_BACKEND:
-        slug = _app_slug(app["name"])
+def _build_comp_dict(cid, reach=None):
+    node = NODE_MAP.get(cid)
+    if not node:
+        return None
+    eff = _effective_status(cid, reach)
+    return {
+        "id": cid,
+        "label": node["label"],
+        "status": eff,
+        "incidents_30d": node["incidents_30d"],
+        "indicator_type": COMPONENT_INDICATOR_MAP.get(cid, "Service"),
+        "slo": _comp_slo(node, eff),
+    }
 
-        # ── Dependency-propagated effective status ──
-        # Each component's effective status = worst of (own status, all transitive dependency statuses)
-        _status_rank = {"critical": 0, "warning": 1, "healthy": 2, "no_data": 3}
-
-        def _effective_status(cid):
-            node = NODE_MAP.get(cid)
-            if not node:
-                return "no_data"
-            # Components without health indicators → no_data
-            if cid not in COMPONENTS_WITH_INDICATORS:
-                return "no_data"
-            own = node["status"]
-            dep_ids = bfs(cid, forward_adj)
-            worst = own
-            for did in dep_ids:
-                dn = NODE_MAP.get(did)
-                if not dn:
-                    continue
-                dep_status = dn["status"] if did in COMPONENTS_WITH_INDICATORS else "no_data"
-                if dep_status == "no_data":
-                    continue
-                if _status_rank.get(dep_status, 9) < _status_rank.get(worst, 9):
-                    worst = dep_status
-            return worst
-
-        def _comp_slo(node, eff_status):
-            """Compute deterministic component SLO from SLA target and effective status."""
-            if eff_status == "no_data":
-                return None
-            try:
-                target = float(node["sla"].replace("%", ""))
-            except (ValueError, KeyError):
-                target = 99.0
-            if eff_status == "critical":
-                return round(target - 1.5 - (node.get("incidents_30d", 0) * 0.08), 2)
-            elif eff_status == "warning":
-                return round(target - 0.4 - (node.get("incidents_30d", 0) * 0.05), 2)
-            else:
-                return round(target - 0.05, 2)
-
-        def _build_comp_dict(cid):
-            node = NODE_MAP.get(cid)
-            if not node:
-                return None
-            eff = _effective_status(cid)
-            return {
-                "id": cid,
-                "label": node["label"],
-                "status": eff,
-                "incidents_30d": node["incidents_30d"],
-                "indicator_type": COMPONENT_INDICATOR_MAP.get(cid, "Service"),
-                "slo": _comp_slo(node, eff),
+
+def _deployment_specs(app) -> list[tuple[dict, list[str]]]:
+    """(base deployment fields, component ids) for each deployment of an app.
+    DEPLOYMENT_OVERRIDES win; otherwise components are nested under their platform."""
+    slug = _app_slug(app["name"])
+    if slug in DEPLOYMENT_OVERRIDES:
+        specs = []
+        for ovr in DEPLOYMENT_OVERRIDES[slug]:
+            base = dict(ovr)
+            specs.append((base, base.pop("component_ids", [])))
+        return specs
+    plat_comps: dict[str, list[str]] = {}  # plat_id → component ids, in discovery order
+    for cid in SEAL_COMPONENTS.get(app["seal"], []):
+        if cid not in NODE_MAP:
+            continue
+        for plat_id in _comp_platform_map.get(cid, []):
+            plat_comps.setdefault(plat_id, []).append(cid)
+    specs = []
+    for plat_id, cids in plat_comps.items():
+        pn = PLATFORM_NODE_MAP.get(plat_id)
+        if not pn:
+            continue
+        specs.append(({"id": plat_id, "label": pn["label"], "type": pn["type"], "datacenter": pn["datacenter"]}, cids))
+    return specs
+
+
+def _build_deployment(slug, base, comp_ids, reach=None):
+    """Resolve a deployment spec to its enriched form (status, components, SLO)."""
+    d = dict(base)
+    dep_comps = [cd for cd in (_build_comp_dict(cid, reach) for cid in comp_ids) if cd]
+    dep_comps.sort(key=lambda c: _STATUS_RANK.get(c["status"], 9))
+    dep_id = d.get("id", "")
+    # Deployment exclusions = app-level + deployment-level
+    dep_excl = set(APP_EXCLUDED_INDICATORS.get(slug, [])) | set(DEPLOYMENT_EXCLUDED_INDICATORS.get(f"{slug}:{dep_id}", []))
+    active = [c for c in dep_comps if c["indicator_type"] not in dep_excl]
+    # Status = worst of active RAG statuses
+    # Empty deployments (no components, e.g. DEV/UAT) → healthy
+    # Deployments with components but no indicators → no_data
+    rag_active = [c for c in active if c["status"] != "no_data"]
+    if not dep_comps:
+        worst = "healthy"
+    elif not rag_active:
+        worst = "no_data"
+    else:
+        worst = "healthy"
+        for c in rag_active:
+            if _STATUS_RANK.get(c["status"], 9) < _STATUS_RANK.get(worst, 9):
+                worst = c["status"]
+    d["status"] = worst
+    d["components"] = dep_comps
+    # SLO = min of active component SLOs
+    active_slos = [c["slo"] for c in active if c.get("slo") is not None]
+    d["slo"] = min(active_slos) if active_slos else None
+    d["excluded_indicators"] = list(DEPLOYMENT_EXCLUDED_INDICATORS.get(f"{slug}:{dep_id}", []))
+    return d
+
+
+def _derive_app_slo(slug, deployments):
+    """SLO data — derive from deployment SLOs (bottom-up)."""
+    dep_slos = [d["slo"] for d in deployments if d.get("slo") is not None]
+    app_slo_current = min(dep_slos) if dep_slos else None
+    base_slo = APP_SLO_DATA.get(slug, {
+        "target": 99.0, "current": 99.5, "error_budget": 80,
+        "trend": "stable", "burn_rate": "0.2x", "breach_eta": None, "status": "healthy",
+    })
+    slo = dict(base_slo)
+    if app_slo_current is not None:
+        slo["current"] = app_slo_current
+        # Derive SLO status from current vs target
+        target = slo.get("target", 99.0)
+        if app_slo_current < target - 0.5:
+            slo["status"] = "critical"
+        elif app_slo_current < target:
+            slo["status"] = "warning"
+        else:
+            slo["status"] = "healthy"
+    return slo
+
+
+def _derive_app_status(deployments):
+    """App-level status = worst of deployment statuses (bottom-up)."""
+    if not deployments:
+        return "healthy"
+    worst_app_rank = 3  # no_data
+    for d in deployments:
+        r = _STATUS_RANK.get(d.get("status", "no_data"), 3)
+        if r < worst_app_rank:
+            worst_app_rank = r
+    return _RANK_TO_STATUS[worst_app_rank]
+
+
+def _build_enriched_app(app):
+    slug = _app_slug(app["name"])
+
+    # Components from knowledge graph — SEAL_COMPONENTS is the single source of truth
+    comp_ids = SEAL_COMPONENTS.get(app["seal"], [])
+    components = [cd for cd in (_build_comp_dict(cid) for cid in comp_ids) if cd]
+
+    deployments = [_build_deployment(slug, base, cids) for base, cids in _APP_DEPLOYMENT_SPECS[slug]]
+    deployments.sort(key=lambda d: _STATUS_RANK.get(d["status"], 9))
+
+    # Completeness score
+    has_owner = bool(app.get("appOwner"))
+    has_sla = bool(app.get("sla"))
+    has_slo = slug in APP_SLO_DATA
+    has_rto = app.get("rto", "") not in ("", "NRR")
+    has_cpof = app.get("cpof") == "Yes"
+    has_blast_radius = len(comp_ids) > 0
+    checks = [has_owner, has_sla, has_slo, has_rto, has_cpof, has_blast_radius]
+    score = round(sum(checks) / len(checks) * 100)
+
+    completeness = {
+        "has_owner": has_owner,
+        "has_sla": has_sla,
+        "has_slo": has_slo,
+        "has_rto": has_rto,
+        "has_cpof": has_cpof,
+        "has_blast_radius": has_blast_radius,
+        "score": score,
+    }
+
+    # Resolve team references (multi-team)
+    if slug not in APP_TEAM_ASSIGNMENTS:
+        # Seed from team name string on first access
+        team_name = app.get("team", "")
+        matched_team = next((t for t in TEAMS if t["name"] == team_name), None)
+        if matched_team:
+            APP_TEAM_ASSIGNMENTS[slug] = [matched_team["id"]]
+    assigned_ids = APP_TEAM_ASSIGNMENTS.get(slug, [])
+
+    return {
+        **app,
+        "id": slug,
+        "status": _derive_app_status(deployments),
+        "incidents_30d": app["incidents"],
+        "components": components,
+        "deployments": deployments,
+        "slo": _derive_app_slo(slug, deployments),
+        "completeness": completeness,
+        "team_ids": assigned_ids,
+        "excluded_indicators": list(APP_EXCLUDED_INDICATORS.get(slug, [])),
+    }
+
+
+def _refresh_enriched_deployments(slug, dep_ids):
+    """Rebuild only the given deployments of a cached app, then re-derive the
+    app-level components, status and SLO from them."""
+    e = _enriched_snapshot[slug]
+    cached = {d.get("id", ""): d for d in e["deployments"]}
+    # Walk specs (not the sorted cache) so status ties keep their original order
+    deployments = [
+        _build_deployment(slug, base, cids) if base.get("id", "") in dep_ids else cached[base.get("id", "")]
+        for base, cids in _APP_DEPLOYMENT_SPECS[slug]
+    ]
+    deployments.sort(key=lambda d: _STATUS_RANK.get(d["status"], 9))
+    e["components"] = [cd for cd in (_build_comp_dict(cid) for cid in SEAL_COMPONENTS.get(e["seal"], [])) if cd]
+    e["deployments"] = deployments
+    e["status"] = _derive_app_status(deployments)
+    e["slo"] = _derive_app_slo(slug, deployments)
+
+
+# ── Enrichment snapshot & dirty tracking ──
+# Enriched apps are cached per slug. A component status change marks only the apps
+# and deployments that contain a component whose effective status moved; exclusion
+# and team edits mark their app. The next read rebuilds just the dirty entries.
+
+_APPS_BY_SLUG: dict[str, dict] = {}
+_APP_DEPLOYMENT_SPECS: dict[str, list[tuple[dict, list[str]]]] = {}
+_COMP_APPS: dict[str, set[str]] = {}               # component id → app slugs listing it
+_COMP_DEPLOYMENTS: dict[str, set[tuple[str, str]]] = {}  # component id → (slug, dep_id)
+_DEPLOYMENT_META: dict[tuple[str, str], dict] = {}       # (slug, dep_id) → rollup fields
+_SEAL_SLUG: dict[str, str] = {}                          # seal → first app slug registered with it
+_SLO_BY_SEAL: dict[str, dict] = {}                       # seal → app SLO, kept in step with the snapshot
+
+_enriched_snapshot: dict[str, dict] = {}
+_dirty_apps: set[str] = set()
+_dirty_deployments: dict[str, set[str]] = {}
+_snapshot_lock = threading.RLock()
+# Callbacks invoked (under the lock) with the slugs rebuilt by each refresh
+_snapshot_listeners: list = []
+
+
+def _index_app_components():
+    """Build the app/deployment reverse indexes over components."""
+    from apps_registry import APPS_REGISTRY
+
+    _APPS_BY_SLUG.clear()
+    _APP_DEPLOYMENT_SPECS.clear()
+    _COMP_APPS.clear()
+    _COMP_DEPLOYMENTS.clear()
+    _DEPLOYMENT_META.clear()
+    _SEAL_SLUG.clear()
+    _SLO_BY_SEAL.clear()
+    for app in APPS_REGISTRY:
+        slug = _app_slug(app["name"])
+        _APPS_BY_SLUG[slug] = app
+        _SEAL_SLUG.setdefault(app["seal"], slug)
+        _APP_DEPLOYMENT_SPECS[slug] = _deployment_specs(app)
+        for cid in SEAL_COMPONENTS.get(app["seal"], []):
+            _COMP_APPS.setdefault(cid, set()).add(slug)
+        for base, cids in _APP_DEPLOYMENT_SPECS[slug]:
+            dep_id = base.get("id", "")
+            for cid in cids:
+                _COMP_DEPLOYMENTS.setdefault(cid, set()).add((slug, dep_id))
+            # Platform-derived deployments carry no CPOF/RTO — inherit the app's
+            rto = base.get("rto", app.get("rto"))
+            _DEPLOYMENT_META[(slug, dep_id)] = {
+                "app": slug,
+                "seal": app["seal"],
+                "id": dep_id,
+                "label": base.get("label", dep_id),
+                "cpof": base["cpof"] if "cpof" in base else app.get("cpof") == "Yes",
+                "rto": int(rto) if str(rto).isdigit() else None,
             }
+    _enriched_snapshot.clear()
+    _dirty_apps.clear()
+    _dirty_apps.update(_APPS_BY_SLUG)
+    _dirty_deployments.clear()
+
+
+def _ensure_app_indexes():
+    with _snapshot_lock:
+        if not _APPS_BY_SLUG:
+            _index_app_components()
+
+
+def _rollup_impact(cids) -> dict:
+    """Aggregate impacted components into apps, deployments (by CPOF/RTO),
+    platforms and data centers using the precomputed reverse indexes."""
+    _ensure_app_indexes()
+    slugs: set[str] = set()
+    dep_keys: set[tuple[str, str]] = set()
+    plat_ids: set[str] = set()
+    for cid in cids:
+        slugs.update(_COMP_APPS.get(cid, ()))
+        dep_keys.update(_COMP_DEPLOYMENTS.get(cid, ()))
+        plat_ids.update(_comp_platform_map.get(cid, ()))
+    dc_ids = {DC_LOOKUP[PLATFORM_NODE_MAP[p]["datacenter"]] for p in plat_ids
+              if p in PLATFORM_NODE_MAP and PLATFORM_NODE_MAP[p]["datacenter"] in DC_LOOKUP}
+
+    status_by_seal = {a["seal"]: a["status"] for a in _get_enriched_apps()}
+    apps = sorted(
+        ({"id": slug, "seal": _APPS_BY_SLUG[slug]["seal"], "name": _APPS_BY_SLUG[slug]["name"],
+          "status": status_by_seal.get(_APPS_BY_SLUG[slug]["seal"], "no_data")} for slug in slugs),
+        key=lambda a: (_STATUS_RANK.get(a["status"], 9), a["name"]),
+    )
+    deployments = sorted((_DEPLOYMENT_META[k] for k in dep_keys), key=lambda d: (not d["cpof"], d["rto"] or 999, d["app"], d["id"]))
+    by_cpof = {"cpof": 0, "non_cpof": 0}
+    by_rto: dict[str, int] = {}
+    for d in deployments:
+        by_cpof["cpof" if d["cpof"] else "non_cpof"] += 1
+        rto_key = str(d["rto"]) if d["rto"] is not None else "unknown"
+        by_rto[rto_key] = by_rto.get(rto_key, 0) + 1
+    return {
+        "apps": {"count": len(apps), "items": apps},
+        "deployments": {"count": len(deployments), "by_cpof": by_cpof, "by_rto": by_rto, "items": deployments},
+        "platforms": {"count": len(plat_ids), "items": [pn for pn in PLATFORM_NODES if pn["id"] in plat_ids]},
+        "datacenters": {"count": len(dc_ids), "items": [dc for dc in DATA_CENTER_NODES if dc["id"] in dc_ids]},
+    }
 
-        # ── Exclusions for this app ──
-        app_excl = set(APP_EXCLUDED_INDICATORS.get(slug, []))
-
-        # Components from knowledge graph — SEAL_COMPONENTS is the single source of truth
-        comp_ids = SEAL_COMPONENTS.get(app["seal"], [])
-        components = []
-        for cid in comp_ids:
-            cd = _build_comp_dict(cid)
-            if cd:
-                components.append(cd)
-
-        # Deployments: nest components under their platform
-        plat_comp_map = {}  # plat_id → [component dicts]
-        plat_order = []     # preserve discovery order
-        for cid in comp_ids:
-            node = NODE_MAP.get(cid)
-            if not node:
-                continue
-            for plat_id in _comp_platform_map.get(cid, []):
-                if plat_id not in plat_comp_map:
-                    plat_comp_map[plat_id] = []
-                    plat_order.append(plat_id)
-                cd = _build_comp_dict(cid)
-                if cd:
-                    plat_comp_map[plat_id].append(cd)
+
+def _mark_components_dirty(cids):
+    """Flag the apps and deployments containing any of the given components."""
+    with _snapshot_lock:
+        for cid in cids:
+            for slug, dep_id in _COMP_DEPLOYMENTS.get(cid, ()):
+                _dirty_deployments.setdefault(slug, set()).add(dep_id)
+            for slug in _COMP_APPS.get(cid, ()):
+                _dirty_deployments.setdefault(slug, set())
+    _vc_wake()
+
+
+def _mark_app_dirty(slug, dep_id=None):
+    with _snapshot_lock:
+        if dep_id is None:
+            _dirty_apps.add(slug)
+        else:
+            _dirty_deployments.setdefault(slug, set()).add(dep_id)
+    _vc_wake()
+
+
+def _refresh_enriched_snapshot() -> set[str]:
+    """Bring the snapshot up to date. Returns the slugs that were rebuilt."""
+    with _snapshot_lock:
+        if not _APPS_BY_SLUG:
+            _index_app_components()
+        rebuilt = set(_dirty_apps) | set(_dirty_deployments)
+        for slug in _dirty_apps:
+            if slug in _APPS_BY_SLUG:
+                _enriched_snapshot[slug] = _build_enriched_app(_APPS_BY_SLUG[slug])
+        for slug, dep_ids in _dirty_deployments.items():
+            if slug in _enriched_snapshot and slug not in _dirty_apps:
+                _refresh_enriched_deployments(slug, dep_ids)
+        _dirty_apps.clear()
+        _dirty_deployments.clear()
+        rebuilt &= set(_APPS_BY_SLUG)
+        if rebuilt:
+            for listener in _snapshot_listeners:
+                listener(rebuilt)
+        return rebuilt
+
+
+def _set_component_status(cid: str, status: str) -> set[str]:
+    """Apply a raw status change to one component and propagate it incrementally.
+    Returns the component ids whose effective status changed."""
+    global _health_version
+    with _snapshot_lock:
+        node = NODE_MAP[cid]
+        if node["status"] == status:
+            return set()
+        _health_version += 1
+        _reindex_node_status(cid, node["status"], status)
+        node["status"] = status
+        _record_status_change(cid)
+        moved = _propagate_status([cid])
+        _mark_components_dirty(moved)
+        return moved
+
+
+def _sync_slo_table(slugs: set[str]):
+    for slug in slugs:
+        seal = _APPS_BY_SLUG[slug]["seal"]
+        if _SEAL_SLUG.get(seal) == slug:
+            _SLO_BY_SEAL[seal] = _enriched_snapshot[slug]["slo"]
+
+
+def _get_slo_table() -> dict[str, dict]:
+    """Seal → app SLO ({current, target, status, ...}) for the whole catalog,
+    refreshed with the enrichment snapshot so lookups never re-enrich."""
+    with _snapshot_lock:
+        _refresh_enriched_snapshot()
+        return _SLO_BY_SEAL
+
+
+_snapshot_listeners.append(_sync_dashboard_status)
+_snapshot_listeners.append(_sync_slo_table)
+
+
+# ── Failure what-if simulation ───────────────────────────────────────────────
+# Marks every component hosted on the failed platforms (or on platforms in the
+# failed data centers) with the given status, then runs the same incremental
+# propagation as live updates over a copy-on-write overlay of the SCC ranks.
+# Only deployments containing a moved component are re-derived; live state is
+# never touched, so scenarios are independent and can be swept in one request.
+
+_platform_components: dict[str, list[str]] = {}
+for _comp_id, _plat_id in COMPONENT_PLATFORM_EDGES:
+    _platform_components.setdefault(_plat_id, []).append(_comp_id)
+
+
+class WhatIfScenario(BaseModel):
+    failed_platforms: list[str] = []
+    failed_datacenters: list[str] = []   # data center ids or labels
+    status: str = "critical"             # status assumed for hosted components
+
+
+class WhatIfBatchRequest(BaseModel):
+    scenarios: list[WhatIfScenario] = []
+    sweep: Optional[str] = None          # "datacenters" or "platforms" — one scenario each
+    status: str = "critical"             # status for sweep scenarios
+
+
+def _resolve_failed_platforms(scenario: WhatIfScenario) -> tuple[list[str], list[str]]:
+    dc_by_label = {dc["label"]: dc["id"] for dc in DATA_CENTER_NODES}
+    dc_ids = []
+    for dc in scenario.failed_datacenters:
+        dc_id = dc if any(d["id"] == dc for d in DATA_CENTER_NODES) else dc_by_label.get(dc)
+        if not dc_id:
+            raise HTTPException(status_code=404, detail=f"Data center '{dc}' not found")
+        dc_ids.append(dc_id)
+    for plat_id in scenario.failed_platforms:
+        if plat_id not in PLATFORM_NODE_MAP:
+            raise HTTPException(status_code=404, detail=f"Platform '{plat_id}' not found")
+    plat_ids = list(dict.fromkeys(
+        scenario.failed_platforms
+        + [pn["id"] for pn in PLATFORM_NODES if DC_LOOKUP.get(pn["datacenter"]) in dc_ids]
+    ))
+    return plat_ids, dc_ids
+
+
+def _simulate_failure(plat_ids: list[str], status: str) -> dict:
+    """Status/SLO deltas if the given platforms fail. Caller holds _snapshot_lock
+    with a fresh snapshot."""
+    status_rank = _STATUS_RANK[status]
+    own = {}
+    for plat_id in plat_ids:
+        for cid in _platform_components.get(plat_id, []):
+            # A failure can only make a component worse
+            if cid in NODE_MAP and status_rank < _STATUS_RANK.get(NODE_MAP[cid]["status"], 3):
+                own[cid] = status
+    reach = ChainMap({}, _scc_reach)
+    moved = _propagate_status(own, reach, own)
+
+    dep_keys: dict[str, set[str]] = {}
+    for cid in moved:
+        for slug, dep_id in _COMP_DEPLOYMENTS.get(cid, ()):
+            dep_keys.setdefault(slug, set()).add(dep_id)
+
+    app_deltas = []
+    dep_deltas = []
+    for slug, dep_ids in dep_keys.items():
+        before = _enriched_snapshot[slug]
+        before_deps = {d.get("id", ""): d for d in before["deployments"]}
         deployments = []
-        for plat_id in plat_order:
-            pn = PLATFORM_NODE_MAP.get(plat_id)
-            if not pn:
+        for base, cids in _APP_DEPLOYMENT_SPECS[slug]:
+            old = before_deps[base.get("id", "")]
+            if base.get("id", "") not in dep_ids:
+                deployments.append(old)
                 continue
-            dep_comps = plat_comp_map[plat_id]
-            dep_comps.sort(key=lambda c: _status_rank.get(c["status"], 9))
-            # Deployment exclusions = app-level + deployment-level
-            dep_excl = app_excl | set(DEPLOYMENT_EXCLUDED_INDICATORS.get(f"{slug}:{plat_id}", []))
-            active = [c for c in dep_comps if c["indicator_type"] not in dep_excl]
-            # Status = worst of active RAG statuses
-            # Empty deployments (no components) → healthy; components with no indicators → no_data
-            rag_active = [c for c in active if c["status"] != "no_data"]
-            if not dep_comps:
-                worst = "healthy"
-            elif not rag_active:
-                worst = "no_data"
-            else:
-                worst = "healthy"
-                for c in rag_active:
-                    if _status_rank.get(c["status"], 9) < _status_rank.get(worst, 9):
-                        worst = c["status"]
-            # SLO = min of active component SLOs
-            active_slos = [c["slo"] for c in active if c.get("slo") is not None]
-            dep_slo = min(active_slos) if active_slos else None
-            deployments.append({
-                "id": plat_id,
-                "label": pn["label"],
-                "type": pn["type"],
-                "datacenter": pn["datacenter"],
-                "status": worst,
-                "components": dep_comps,
-                "slo": dep_slo,
-                "excluded_indicators": list(DEPLOYMENT_EXCLUDED_INDICATORS.get(f"{slug}:{plat_id}", [])),
+            new = _build_deployment(slug, base, cids, reach)
+            deployments.append(new)
+            if new["status"] != old["status"] or new["slo"] != old["slo"]:
+                dep_deltas.append({
+                    "app": slug, "id": new.get("id", ""), "label": new.get("label", ""),
+                    "status_before": old["status"], "status_after": new["status"],
+                    "slo_before": old["slo"], "slo_after": new["slo"],
+                })
+        app_status = _derive_app_status(deployments)
+        slo = _derive_app_slo(slug, deployments)
+        if app_status != before["status"] or slo != before["slo"]:
+            app_deltas.append({
+                "id": slug, "seal": before["seal"], "name": before["name"],
+                "status_before": before["status"], "status_after": app_status,
+                "slo_before": before["slo"]["current"], "slo_after": slo["current"],
+                "slo_status_before": before["slo"]["status"], "slo_status_after": slo["status"],
             })
-        deployments.sort(key=lambda d: _status_rank.get(d["status"], 9))
-
-        # Use deployment overrides if available — resolve component_ids to full data
-        if slug in DEPLOYMENT_OVERRIDES:
-            deployments = []
-            for ovr in DEPLOYMENT_OVERRIDES[slug]:
-                d = dict(ovr)
-                comp_ids_list = d.pop("component_ids", [])
-                dep_comps = []
-                for cid in comp_ids_list:
-                    cd = _build_comp_dict(cid)
-                    if cd:
-                        dep_comps.append(cd)
-                dep_comps.sort(key=lambda c: _status_rank.get(c["status"], 9))
-                dep_id = d.get("id", "")
-                dep_excl = app_excl | set(DEPLOYMENT_EXCLUDED_INDICATORS.get(f"{slug}:{dep_id}", []))
-                active = [c for c in dep_comps if c["indicator_type"] not in dep_excl]
-                # Status = worst of active RAG statuses
-                # Empty deployments (no components, e.g. DEV/UAT) → healthy
-                # Deployments with components but no indicators → no_data
-                rag_active = [c for c in active if c["status"] != "no_data"]
-                if not dep_comps:
-                    worst = "healthy"
-                elif not rag_active:
-                    worst = "no_data"
-                else:
-                    worst = "healthy"
-                    for c in rag_active:
-                        if _status_rank.get(c["status"], 9) < _status_rank.get(worst, 9):
-                            worst = c["status"]
-                d["status"] = worst
-                d["components"] = dep_comps
-                active_slos = [c["slo"] for c in active if c.get("slo") is not None]
-                d["slo"] = min(active_slos) if active_slos else None
-                d["excluded_indicators"] = list(DEPLOYMENT_EXCLUDED_INDICATORS.get(f"{slug}:{dep_id}", []))
-                deployments.append(d)
-            deployments.sort(key=lambda d: _status_rank.get(d["status"], 9))
-
-        # SLO data — derive from deployment SLOs (bottom-up)
-        dep_slos = [d["slo"] for d in deployments if d.get("slo") is not None]
-        app_slo_current = min(dep_slos) if dep_slos else None
-        base_slo = APP_SLO_DATA.get(slug, {
-            "target": 99.0, "current": 99.5, "error_budget": 80,
-            "trend": "stable", "burn_rate": "0.2x", "breach_eta": None, "status": "healthy",
-        })
-        slo = dict(base_slo)
-        if app_slo_current is not None:
-            slo["current"] = app_slo_current
-            # Derive SLO status from current vs target
-            target = slo.get("target", 99.0)
-            if app_slo_current < target - 0.5:
-                slo["status"] = "critical"
-            elif app_slo_current < target:
-                slo["status"] = "warning"
-            else:
-                slo["status"] = "healthy"
-
-        # Completeness score
-        has_owner = bool(app.get("appOwner"))
-        has_sla = bool(app.get("sla"))
-        has_slo = slug in APP_SLO_DATA
-        has_rto = app.get("rto", "") not in ("", "NRR")
-        has_cpof = app.get("cpof") == "Yes"
-        has_blast_radius = len(comp_ids) > 0
-        checks = [has_owner, has_sla, has_slo, has_rto, has_cpof, has_blast_radius]
-        score = round(sum(checks) / len(checks) * 100)
-
-        completeness = {
-            "has_owner": has_owner,
-            "has_sla": has_sla,
-            "has_slo": has_slo,
-            "has_rto": has_rto,
-            "has_cpof": has_cpof,
-            "has_blast_radius": has_blast_radius,
-            "score": score,
-        }
 
-        # Resolve team references (multi-team)
-        if slug not in APP_TEAM_ASSIGNMENTS:
-            # Seed from team name string on first access
-            team_name = app.get("team", "")
-            matched_team = next((t for t in TEAMS if t["name"] == team_name), None)
-            if matched_team:
-                APP_TEAM_ASSIGNMENTS[slug] = [matched_team["id"]]
-        assigned_ids = APP_TEAM_ASSIGNMENTS.get(slug, [])
-
-        # Compute app-level status = worst of deployment statuses (bottom-up)
-        if deployments:
-            worst_app_rank = 3  # no_data
-            for d in deployments:
-                r = _status_rank.get(d.get("status", "no_data"), 3)
-                if r < worst_app_rank:
-                    worst_app_rank = r
-            app_status = {0: "critical", 1: "warning", 2: "healthy", 3: "no_data"}[worst_app_rank]
-        else:
-            app_status = "healthy"
+    app_deltas.sort(key=lambda a: (_STATUS_RANK.get(a["status_after"], 9), a["name"]))
+    dep_deltas.sort(key=lambda d: (_STATUS_RANK.get(d["status_after"], 9), d["app"], d["id"]))
+    return {
+        "components_failed": len(own),
+        "components_affected": len(moved),
+        "apps": app_deltas,
+        "deployments": dep_deltas,
+        "summary": {
+            "apps_changed": len(app_deltas),
+            "apps_newly_critical": sum(1 for a in app_deltas if a["status_after"] == "critical" and a["status_before"] != "critical"),
+            "deployments_changed": len(dep_deltas),
+            "slo_breaches": sum(1 for a in app_deltas if a["slo_status_after"] == "critical" and a["slo_status_before"] != "critical"),
+        },
+    }
 
-        results.append({
-            **app,
-            "id": slug,
-            "status": app_status,
-            "incidents_30d": app["incidents"],
-            "components": components,
-            "deployments": deployments,
-            "slo": slo,
-            "completeness": completeness,
-            "team_ids": assigned_ids,
-            "excluded_indicators": list(APP_EXCLUDED_INDICATORS.get(slug, [])),
-        })
 
-    return results
+def _run_what_if(scenario: WhatIfScenario) -> dict:
+    if scenario.status not in ("critical", "warning"):
+        raise HTTPException(status_code=400, detail=f"Invalid status '{scenario.status}'")
+    plat_ids, dc_ids = _resolve_failed_platforms(scenario)
+    return {"failed": {"platforms": plat_ids, "datacenters": dc_ids}, **_simulate_failure(plat_ids, scenario.status)}
+
+
+@app.post("/api/graph/what-if")
+def what_if(payload: WhatIfScenario):
+    """Which apps and deployments change status if these platforms / data centers fail?"""
+    with _snapshot_lock:
+        _refresh_enriched_snapshot()
+        return _run_what_if(payload)
+
+
+@app.post("/api/graph/what-if/batch")
+def what_if_batch(payload: WhatIfBatchRequest):
+    """Run many independent scenarios, or sweep every data center / platform."""
+    scenarios = list(payload.scenarios)
+    if payload.sweep == "datacenters":
+        scenarios += [WhatIfScenario(failed_datacenters=[dc["id"]], status=payload.status) for dc in DATA_CENTER_NODES]
+    elif payload.sweep == "platforms":
+        scenarios += [WhatIfScenario(failed_platforms=[pn["id"]], status=payload.status) for pn in PLATFORM_NODES]
+    elif payload.sweep:
+        raise HTTPException(status_code=400, detail=f"Invalid sweep '{payload.sweep}'")
+    with _snapshot_lock:
+        _refresh_enriched_snapshot()
+        return {"results": [_run_what_if(s) for s in scenarios]}
+
+
+# ── Topology re-indexing ─────────────────────────────────────────────────────
+
+def _reindex_graph():
+    """Rebuild every topology-derived index in place after NODES, EDGES_RAW,
+    SEAL_COMPONENTS, INDICATOR_NODES or COMPONENT_PLATFORM_EDGES change
+    (live graph sync, synthetic benchmark graphs)."""
+    global _seal_graph_cache, _topology_version, _health_version
+    with _snapshot_lock:
+        NODE_MAP.clear()
+        NODE_MAP.update({n["id"]: n for n in NODES})
+        COMPONENTS_WITH_INDICATORS.clear()
+        COMPONENTS_WITH_INDICATORS.update(ind["component"] for ind in INDICATOR_NODES)
+        forward_adj.clear()
+        reverse_adj.clear()
+        for n in NODES:
+            forward_adj[n["id"]] = []
+            reverse_adj[n["id"]] = []
+        for src, dst in EDGES_RAW:
+            forward_adj[src].append(dst)
+            reverse_adj[dst].append(src)
+        COMP_TO_SEAL.clear()
+        for sid, comps in SEAL_COMPONENTS.items():
+            for cid in comps:
+                COMP_TO_SEAL[cid] = sid
+        _comp_platform_map.clear()
+        _platform_components.clear()
+        for comp_id, plat_id in COMPONENT_PLATFORM_EDGES:
+            _comp_platform_map.setdefault(comp_id, []).append(plat_id)
+            _platform_components.setdefault(plat_id, []).append(comp_id)
+        _index_status_propagation()
+        _index_nodes()
+        _seal_graph_cache = None
+        _topology_version += 1
+        _health_version += 1
+        _record_topology()
+        with _layout_lock:
+            _layout_cache.clear()
+        # App/deployment indexes and the enrichment snapshot rebuild lazily
+        _APPS_BY_SLUG.clear()
+
+
+@app.get("/api/applications/enriched")
+def get_enriched_applications():
+    """Return all apps enriched with components, deployments, SLO, and completeness.
+    Each record is a shallow copy of the cached one: the snapshot reassigns its
+    top-level fields on refresh, so the copy stays consistent. Nested lists are
+    shared with the cache and must not be modified."""
+    with _snapshot_lock:
+        _refresh_enriched_snapshot()
+        return [dict(_enriched_snapshot[slug]) for slug in _APPS_BY_SLUG]
 
 
 # ── Announcements CRUD ────────────────────────────────────────────────────────
@@ -1940,7 +4263,7 @@ class AnnouncementCreate(BaseModel):
     impact_type: str = ""
     impact_description: str = ""
     header_message: str = ""
-    email_recipients: list[str] = []
+    email_recipients: list[EmailAddress] = []
     category: str = ""
     region: str = ""
     next_steps: str = ""
@@ -1973,7 +4296,7 @@ class AnnouncementUpdate(BaseModel):
     impact_type: Optional[str] = None
     impact_description: Optional[str] = None
     header_message: Optional[str] = None
-    email_recipients: Optional[list[str]] = None
+    email_recipients: Optional[list[EmailAddress]] = None
     category: Optional[str] = None
     region: Optional[str] = None
     next_steps: Optional[str] = None
@@ -1990,8 +4313,6 @@ class AnnouncementUpdate(BaseModel):
     connect_target_regions: Optional[list[str]] = None
     connect_weave_interfaces: Optional[list[int]] = None
 
-_next_announcement_id = 1
-
 WEAVE_INTERFACES = [
     {"id": 0, "ui_title": "Docusign eSign", "ui_name": "ConnectHomeEmbedDocusignWindow", "weave_function": "GWMConnectHomeView", "seal_id": "103845"},
     {"id": 1, "ui_title": "Conversations", "ui_name": "ConversationsMainWindow", "weave_function": "GWMConnectCallMemoRead", "seal_id": "90176"},
@@ -2000,7 +4321,8 @@ WEAVE_INTERFACES = [
     {"id": 4, "ui_title": "OnboardingConnectKycComp...", "ui_name": "OnboardingConnectKycComparisonManager", "weave_function": "OnboardingConnectLaunch", "seal_id": "84874"},
 ]
 
-ANNOUNCEMENTS = [
+# Indexed by id, ann_status, category, region and enabled channel (see announcement_store)
+ANNOUNCEMENTS = AnnouncementStore([
     {
         "id": 5, "title": "Advisor Connect — Degraded Performance in EMEA",
         "status": "ongoing", "severity": "major",
@@ -2141,17 +4463,18 @@ ANNOUNCEMENTS = [
         "ann_status": "closed", "author": "M. Williams",
         "date": "2026-02-20 12:00 UTC",
     },
-]
-_next_announcement_id = 6
+])
 
 
 @app.get("/api/announcements")
-def get_announcements(status: Optional[str] = None, channel: Optional[str] = None, search: Optional[str] = None):
-    results = ANNOUNCEMENTS
-    if status:
-        results = [a for a in results if a["ann_status"] == status]
-    if channel:
-        results = [a for a in results if a.get("channels", {}).get(channel, False)]
+def get_announcements(
+    status: Optional[str] = None,
+    channel: Optional[str] = None,
+    category: Optional[str] = None,
+    region: Optional[str] = None,
+    search: Optional[str] = None,
+):
+    results = ANNOUNCEMENTS.list(status=status, channel=channel, category=category, region=region)
     if search:
         q = search.lower()
         results = [a for a in results if q in a["title"].lower() or q in a.get("description", "").lower() or q in a.get("author", "").lower()]
@@ -2178,20 +4501,12 @@ def validate_connect_selection(entities: str = "", regions: str = ""):
 
 @app.get("/api/announcements/notifications")
 def get_notification_announcements():
-    return [
-        a for a in ANNOUNCEMENTS
-        if a.get("channels", {}).get("banner", False) and a.get("ann_status") == "open"
-    ]
+    return ANNOUNCEMENTS.list(status="open", channel="banner")
 
 
 @app.post("/api/announcements")
-async def create_announcement(
-    payload: AnnouncementCreate,
-    background_tasks: BackgroundTasks,
-):
-    global _next_announcement_id
-    new = {
-        "id": _next_announcement_id,
+async def create_announcement(payload: AnnouncementCreate):
+    new = ANNOUNCEMENTS.add({
         "title": payload.title,
         "status": payload.status,
         "severity": payload.severity,
@@ -2223,22 +4538,14 @@ async def create_announcement(
         "ann_status": "open",
         "author": "Current User",
         "date": datetime.utcnow().strftime("%Y-%m-%d %H:%M UTC"),
-    }
-    _next_announcement_id += 1
-    ANNOUNCEMENTS.insert(0, new)
+    })
 
     # Dispatch email in background if email channel is enabled
     if payload.channels.get("email") and payload.email_recipients:
         subject = f"[Announcement] {payload.title}"
-        html_body = payload.email_body or f"<p>{payload.description}</p>"
+        html_body = payload.email_body or _EMAIL_PARAGRAPH.render(text=payload.description)
         plain_body = payload.description or payload.title
-        background_tasks.add_task(
-            _send_email_sync,
-            payload.email_recipients,
-            subject,
-            html_body,
-            plain_body,
-        )
+        _enqueue_email(payload.email_recipients, subject, html_body, plain_body, block=False)
         logger.info(
             "Queued announcement email (id=%d) to %d recipients",
             new["id"], len(payload.email_recipients),
@@ -2249,9 +4556,7 @@ async def create_announcement(
 
 @app.put("/api/announcements/{announcement_id}")
 def update_announcement(announcement_id: int, payload: AnnouncementUpdate):
-    ann = next((a for a in ANNOUNCEMENTS if a["id"] == announcement_id), None)
-    if not ann:
-        raise HTTPException(status_code=404, detail="Announcement not found")
+    changes = {}
     for field in [
         "title", "status", "severity", "impacted_apps", "start_time", "end_time",
         "description", "latest_updates", "incident_number", "impact_type",
@@ -2263,25 +4568,26 @@ def update_announcement(announcement_id: int, payload: AnnouncementUpdate):
     ]:
         val = getattr(payload, field, None)
         if val is not None:
-            ann[field] = val
+            changes[field] = val
+    ann = ANNOUNCEMENTS.update(announcement_id, changes)
+    if not ann:
+        raise HTTPException(status_code=404, detail="Announcement not found")
     return ann
 
 
 @app.patch("/api/announcements/{announcement_id}/status")
 def toggle_announcement_status(announcement_id: int):
-    ann = next((a for a in ANNOUNCEMENTS if a["id"] == announcement_id), None)
+    ann = ANNOUNCEMENTS.get(announcement_id)
     if not ann:
         raise HTTPException(status_code=404, detail="Announcement not found")
-    ann["ann_status"] = "closed" if ann["ann_status"] == "open" else "open"
-    return ann
+    return ANNOUNCEMENTS.update(
+        announcement_id, {"ann_status": "closed" if ann["ann_status"] == "open" else "open"},
+    )
 
 
 @app.delete("/api/announcements/{announcement_id}")
 def delete_announcement(announcement_id: int):
-    global ANNOUNCEMENTS
-    before = len(ANNOUNCEMENTS)
-    ANNOUNCEMENTS = [a for a in ANNOUNCEMENTS if a["id"] != announcement_id]
-    if len(ANNOUNCEMENTS) == before:
+    if not ANNOUNCEMENTS.delete(announcement_id):
         raise HTTPException(status_code=404, detail="Announcement not found")
     return {"ok": True}
 
@@ -2393,6 +4699,7 @@ def get_app_teams(app_id: str):
 @app.put("/api/applications/{app_id}/teams")
 def set_app_teams(app_id: str, payload: AppTeamAssignment):
     APP_TEAM_ASSIGNMENTS[app_id] = payload.team_ids
+    _mark_app_dirty(app_id)
     return {"team_ids": payload.team_ids}
 
 
@@ -2413,28 +4720,46 @@ def get_indicator_types():
 
 @app.put("/api/applications/{app_id}/excluded-indicators")
 def set_app_excluded_indicators(app_id: str, payload: IndicatorExclusion):
-    APP_EXCLUDED_INDICATORS[app_id] = payload.excluded_indicators
+    with _state_sync_lock:
+        _apply_exclusion_event(app_id, {"excluded": payload.excluded_indicators})
+        _publish_state_event("excluded_indicators", app_id, {"excluded": payload.excluded_indicators})
     return {"excluded_indicators": payload.excluded_indicators}
 
 
 @app.put("/api/applications/{app_id}/deployments/{dep_id}/excluded-indicators")
 def set_dep_excluded_indicators(app_id: str, dep_id: str, payload: IndicatorExclusion):
     key = f"{app_id}:{dep_id}"
-    DEPLOYMENT_EXCLUDED_INDICATORS[key] = payload.excluded_indicators
+    with _state_sync_lock:
+        _apply_exclusion_event(key, {"excluded": payload.excluded_indicators})
+        _publish_state_event("excluded_indicators", key, {"excluded": payload.excluded_indicators})
     return {"excluded_indicators": payload.excluded_indicators}
 
 
+@_state_event_handler("excluded_indicators")
+def _apply_exclusion_event(key: str, payload: dict):
+    """key is an app id, or "app_id:dep_id" for a deployment."""
+    app_id, _, dep_id = key.partition(":")
+    if dep_id:
+        DEPLOYMENT_EXCLUDED_INDICATORS[key] = payload["excluded"]
+        _mark_app_dirty(app_id, dep_id)
+    else:
+        APP_EXCLUDED_INDICATORS[app_id] = payload["excluded"]
+        _mark_app_dirty(app_id)
+
+
 # ── View Central Notifications ────────────────────────────────────────────────
-# In-memory storage designed for future DB migration:
-#   _vc_notifications  → vc_notifications table (view_id as FK column)
-#   _vc_alert_state    → vc_alert_log table (notif_id, alert_type, app_seal, last_sent_at)
+# Rules are persisted in the local state store (vc_notifications) and mirrored
+# in _vc_notifications for evaluation. Ids come from an AUTOINCREMENT column, so
+# they survive restarts and are never reused — the persisted alert dedup
+# (vc_alert_dedup) is keyed by them. Each edit publishes a "vc_rule" state event
+# so the other workers, and the leader evaluating the rules, reread the row.
 
 class VCNotificationCreate(BaseModel):
     name: str
     alert_types: list[str] = ["critical"]
     channels: dict = {"teams": False, "email": False}
     teams_channels: list[str] = []
-    email_recipients: list[str] = []
+    email_recipients: list[EmailAddress] = []
     frequency: str = "realtime"
     days_of_week: list[str] = []
     start_time: str = "08:00"
@@ -2447,7 +4772,7 @@ class VCNotificationUpdate(BaseModel):
     alert_types: Optional[list[str]] = None
     channels: Optional[dict] = None
     teams_channels: Optional[list[str]] = None
-    email_recipients: Optional[list[str]] = None
+    email_recipients: Optional[list[EmailAddress]] = None
     frequency: Optional[str] = None
     days_of_week: Optional[list[str]] = None
     start_time: Optional[str] = None
@@ -2456,10 +4781,77 @@ class VCNotificationUpdate(BaseModel):
     view_filters: Optional[dict] = None
 
 _vc_notifications: dict[str, list[dict]] = {}
-_next_vc_notif_id = 1
-_vc_alert_state: dict[str, str] = {}
+_vc_rules_lock = threading.Lock()   # rule edits (threadpool) vs. index rebuilds
 VC_ALERT_COOLDOWN = 300   # seconds — dedup window per alert
-VC_CHECK_INTERVAL = 60    # seconds between background condition checks
+VC_CHECK_INTERVAL = 60    # seconds between reconcile sweeps; transitions are evaluated as they happen
+VC_EVENT_DEBOUNCE = 0.5   # seconds — coalesce bursts of status changes into one evaluation
+
+_VC_RULE_META = ("id", "view_id")   # stored as columns, not in the rule JSON
+
+
+@_state_store_init
+def _load_vc_notifications():
+    """Create the rules table and load every stored rule into memory."""
+    with _state_db_lock:
+        db = _state_db()
+        db.execute(
+            "CREATE TABLE IF NOT EXISTS vc_notifications ("
+            " id INTEGER PRIMARY KEY AUTOINCREMENT, view_id TEXT NOT NULL, rule TEXT NOT NULL)"
+        )
+        rows = db.execute("SELECT id, view_id, rule FROM vc_notifications ORDER BY id").fetchall()
+    loaded: dict[str, list[dict]] = {}
+    for notif_id, view_id, rule in rows:
+        loaded.setdefault(view_id, []).append({"id": notif_id, "view_id": view_id, **json.loads(rule)})
+    with _vc_rules_lock:
+        _vc_notifications.clear()
+        _vc_notifications.update(loaded)
+
+
+def _vc_rule_json(notif: dict) -> str:
+    return json.dumps({k: v for k, v in notif.items() if k not in _VC_RULE_META})
+
+
+def _insert_vc_notification(notif: dict) -> int:
+    with _state_db_lock:
+        cur = _state_db().execute(
+            "INSERT INTO vc_notifications (view_id, rule) VALUES (?, ?)",
+            (notif["view_id"], _vc_rule_json(notif)),
+        )
+        return cur.lastrowid
+
+
+def _store_vc_notification(notif: dict):
+    with _state_db_lock:
+        _state_db().execute("UPDATE vc_notifications SET rule = ? WHERE id = ?", (_vc_rule_json(notif), notif["id"]))
+
+
+def _delete_vc_notification(notif_id: int):
+    with _state_db_lock:
+        _state_db().execute("DELETE FROM vc_notifications WHERE id = ?", (notif_id,))
+
+
+@_state_event_handler("vc_rule")
+def _reload_vc_notification(key: str, payload: dict):
+    """Another worker changed a rule — reread it from the rules table."""
+    notif_id = int(key)
+    with _state_db_lock:
+        row = _state_db().execute("SELECT view_id, rule FROM vc_notifications WHERE id = ?", (notif_id,)).fetchone()
+    fresh = {"id": notif_id, "view_id": row[0], **json.loads(row[1])} if row else None
+    with _vc_rules_lock:
+        notif = next((n for ns in _vc_notifications.values() for n in ns if n["id"] == notif_id), None)
+        if notif is not None and fresh is not None:
+            notif.update(fresh)
+        elif notif is not None:
+            _vc_notifications[notif["view_id"]] = [n for n in _vc_notifications[notif["view_id"]] if n is not notif]
+        elif fresh is not None:
+            _vc_notifications.setdefault(fresh["view_id"], []).append(fresh)
+            notif = fresh
+    _index_vc_rules()
+    if fresh is None:
+        _unschedule_digest(notif_id)
+    elif notif is not None:
+        _schedule_digest(notif)
+
 
 
 @app.get("/api/vc-notifications/{view_id}")
@@ -2469,10 +4861,9 @@ def get_vc_notifications(view_id: str):
 
 @app.post("/api/vc-notifications/{view_id}")
 def create_vc_notification(view_id: str, payload: VCNotificationCreate):
-    global _next_vc_notif_id
     now = datetime.utcnow().strftime("%Y-%m-%dT%H:%M:%SZ")
     notif = {
-        "id": _next_vc_notif_id,
+        "id": None,   # assigned by the rules table
         "view_id": view_id,
         "name": payload.name,
         "alert_types": payload.alert_types,
@@ -2488,8 +4879,13 @@ def create_vc_notification(view_id: str, payload: VCNotificationCreate):
         "created_at": now,
         "updated_at": now,
     }
-    _next_vc_notif_id += 1
-    _vc_notifications.setdefault(view_id, []).append(notif)
+    _validate_vc_schedule(notif)
+    with _vc_rules_lock:
+        notif["id"] = _insert_vc_notification(notif)
+        _vc_notifications.setdefault(view_id, []).append(notif)
+    _publish_state_event("vc_rule", str(notif["id"]))
+    _index_vc_rules()
+    _schedule_digest(notif)
     return notif
 
 
@@ -2499,6 +4895,7 @@ def update_vc_notification(view_id: str, notif_id: int, payload: VCNotificationU
     notif = next((n for n in notifs if n["id"] == notif_id), None)
     if not notif:
         raise HTTPException(status_code=404, detail="Notification not found")
+    changes = {}
     for field in [
         "name", "alert_types", "channels", "teams_channels",
         "email_recipients", "frequency", "days_of_week",
@@ -2506,8 +4903,15 @@ def update_vc_notification(view_id: str, notif_id: int, payload: VCNotificationU
     ]:
         val = getattr(payload, field, None)
         if val is not None:
-            notif[field] = val
-    notif["updated_at"] = datetime.utcnow().strftime("%Y-%m-%dT%H:%M:%SZ")
+            changes[field] = val
+    _validate_vc_schedule({**notif, **changes})
+    with _vc_rules_lock:
+        notif.update(changes)
+        notif["updated_at"] = datetime.utcnow().strftime("%Y-%m-%dT%H:%M:%SZ")
+        _store_vc_notification(notif)
+    _publish_state_event("vc_rule", str(notif_id))
+    _index_vc_rules()
+    _schedule_digest(notif)
     return notif
 
 
@@ -2517,25 +4921,35 @@ def toggle_vc_notification(view_id: str, notif_id: int):
     notif = next((n for n in notifs if n["id"] == notif_id), None)
     if not notif:
         raise HTTPException(status_code=404, detail="Notification not found")
-    notif["enabled"] = not notif["enabled"]
-    notif["updated_at"] = datetime.utcnow().strftime("%Y-%m-%dT%H:%M:%SZ")
+    with _vc_rules_lock:
+        notif["enabled"] = not notif["enabled"]
+        notif["updated_at"] = datetime.utcnow().strftime("%Y-%m-%dT%H:%M:%SZ")
+        _store_vc_notification(notif)
+    _publish_state_event("vc_rule", str(notif_id))
+    _index_vc_rules()
+    _schedule_digest(notif)
     return notif
 
 
 @app.delete("/api/vc-notifications/{view_id}/{notif_id}")
 def delete_vc_notification(view_id: str, notif_id: int):
-    notifs = _vc_notifications.get(view_id, [])
-    before = len(notifs)
-    _vc_notifications[view_id] = [n for n in notifs if n["id"] != notif_id]
-    if len(_vc_notifications[view_id]) == before:
+    with _vc_rules_lock:
+        notifs = _vc_notifications.get(view_id, [])
+        kept = [n for n in notifs if n["id"] != notif_id]
+        if len(kept) < len(notifs):
+            _vc_notifications[view_id] = kept
+            _delete_vc_notification(notif_id)
+    if len(kept) == len(notifs):
         raise HTTPException(status_code=404, detail="Notification not found")
-    for k in [k for k in _vc_alert_state if k.startswith(f"{notif_id}:")]:
-        del _vc_alert_state[k]
+    _publish_state_event("vc_rule", str(notif_id))
+    _index_vc_rules()
+    _forget_vc_alerts(notif_id)
+    _unschedule_digest(notif_id)
     return {"ok": True}
 
 
 @app.post("/api/vc-notifications/{view_id}/{notif_id}/test")
-async def test_vc_notification(view_id: str, notif_id: int, background_tasks: BackgroundTasks):
+async def test_vc_notification(view_id: str, notif_id: int):
     """Send a test email immediately, bypassing condition evaluation."""
     notifs = _vc_notifications.get(view_id, [])
     notif = next((n for n in notifs if n["id"] == notif_id), None)
@@ -2550,142 +4964,1058 @@ async def test_vc_notification(view_id: str, notif_id: int, background_tasks: Ba
         alerts=[{"app_name": "Test App", "app_seal": "00000", "alert_type": "critical", "detail": "This is a test alert"}],
         is_test=True,
     )
-    background_tasks.add_task(
-        _send_email_sync, notif["email_recipients"], subject, html_body,
-        f"Test alert for notification: {notif['name']}",
+    queued = _enqueue_email(
+        notif["email_recipients"], subject, html_body,
+        f"Test alert for notification: {notif['name']}", block=False, durable=False,
     )
+    if queued.done() and queued.result().get("detail") == "queue_full":
+        raise HTTPException(status_code=503, detail="Email queue is full, try again shortly")
     return {"ok": True, "detail": f"Test email queued to {len(notif['email_recipients'])} recipients"}
 
 
 # ── VC Notification Condition Evaluation & Dispatch ──────────────────────────
 
+# Templates are compiled once; app names, details, rule names and view ids are
+# escaped on render. Rows and whole tables are cached by content, so a table
+# shared by several rules or recipients (or unchanged since the last cycle) is
+# rendered once.
+_VC_ALERT_COLORS = {"critical": "#f44336", "warning": "#ff9800", "slo": "#a855f7"}
+_VC_ALERT_ROW = Template(
+    '<tr>'
+    '<td style="padding:8px;border-bottom:1px solid #eee">{app_name} ({app_seal})</td>'
+    '<td style="padding:8px;border-bottom:1px solid #eee">'
+    '<span style="color:{color};font-weight:600">{label}</span></td>'
+    '<td style="padding:8px;border-bottom:1px solid #eee">{detail}</td>'
+    '</tr>'
+)
+_VC_ALERT_TABLE = Template(
+    '<table style="width:100%;border-collapse:collapse;margin:16px 0">'
+    '<thead><tr style="background:#f8fafc">'
+    '<th style="padding:8px;text-align:left;border-bottom:2px solid #e2e8f0">Application</th>'
+    '<th style="padding:8px;text-align:left;border-bottom:2px solid #e2e8f0">Alert</th>'
+    '<th style="padding:8px;text-align:left;border-bottom:2px solid #e2e8f0">Detail</th>'
+    '</tr></thead>'
+    '<tbody>{rows:raw}</tbody></table>'
+)
+_VC_TEST_BANNER = '<p style="color:#ff9800;font-weight:700">[TEST] This is a test notification</p>'
+_VC_ALERT_EMAIL = Template(
+    '<div style="font-family:Arial,sans-serif;max-width:600px;margin:0 auto">'
+    '{banner:raw}'
+    '<h2 style="color:#1e293b">View Central Alert: {notif_name}</h2>'
+    '<p style="color:#64748b">The following conditions were detected for your monitored view:</p>'
+    '{table:raw}'
+    '<p style="color:#94a3b8;font-size:12px">View: {view_id} | Sent by Obs Dashboard</p>'
+    '</div>'
+)
+_VC_COMBINED_SECTION = Template(
+    '<h3 style="color:#1e293b;margin:24px 0 0">{notif_name}</h3>'
+    '<p style="color:#94a3b8;font-size:12px;margin:4px 0 0">View: {view_id}</p>'
+    '{table:raw}'
+)
+_VC_COMBINED_EMAIL = Template(
+    '<div style="font-family:Arial,sans-serif;max-width:600px;margin:0 auto">'
+    '<h2 style="color:#1e293b">View Central Alerts</h2>'
+    '<p style="color:#64748b">The following conditions were detected for the views you monitor:</p>'
+    '{sections:raw}'
+    '<p style="color:#94a3b8;font-size:12px">Sent by Obs Dashboard</p>'
+    '</div>'
+)
+_vc_row_cache = RenderCache(8192)
+_vc_table_cache = RenderCache(1024)
+
+
+def _render_vc_alert_row(row: tuple[str, str, str, str]) -> str:
+    app_name, app_seal, alert_type, detail = row
+    return _VC_ALERT_ROW.render(
+        app_name=app_name, app_seal=app_seal, detail=detail,
+        color=_VC_ALERT_COLORS.get(alert_type, "#60a5fa"), label=alert_type.upper(),
+    )
+
+
+def _render_vc_alert_table(rows: tuple) -> str:
+    return _VC_ALERT_TABLE.render(
+        rows="".join(_vc_row_cache.get_or_render(row, lambda: _render_vc_alert_row(row)) for row in rows)
+    )
+
+
+def _vc_alert_table(alerts) -> str:
+    rows = tuple((a["app_name"], a["app_seal"], a["alert_type"], a.get("detail", "")) for a in alerts)
+    return _vc_table_cache.get_or_render(rows, lambda: _render_vc_alert_table(rows))
+
+
 def _build_vc_alert_email(notif_name, view_id, alerts, is_test=False):
     """Build HTML email body for VC notification alerts."""
-    rows = ""
-    for a in alerts:
-        color = {"critical": "#f44336", "warning": "#ff9800", "slo": "#a855f7"}.get(a["alert_type"], "#60a5fa")
-        rows += (
-            f'<tr>'
-            f'<td style="padding:8px;border-bottom:1px solid #eee">{a["app_name"]} ({a["app_seal"]})</td>'
-            f'<td style="padding:8px;border-bottom:1px solid #eee">'
-            f'<span style="color:{color};font-weight:600">{a["alert_type"].upper()}</span></td>'
-            f'<td style="padding:8px;border-bottom:1px solid #eee">{a.get("detail", "")}</td>'
-            f'</tr>'
-        )
-    test_banner = '<p style="color:#ff9800;font-weight:700">[TEST] This is a test notification</p>' if is_test else ""
-    return (
-        f'<div style="font-family:Arial,sans-serif;max-width:600px;margin:0 auto">'
-        f'{test_banner}'
-        f'<h2 style="color:#1e293b">View Central Alert: {notif_name}</h2>'
-        f'<p style="color:#64748b">The following conditions were detected for your monitored view:</p>'
-        f'<table style="width:100%;border-collapse:collapse;margin:16px 0">'
-        f'<thead><tr style="background:#f8fafc">'
-        f'<th style="padding:8px;text-align:left;border-bottom:2px solid #e2e8f0">Application</th>'
-        f'<th style="padding:8px;text-align:left;border-bottom:2px solid #e2e8f0">Alert</th>'
-        f'<th style="padding:8px;text-align:left;border-bottom:2px solid #e2e8f0">Detail</th>'
-        f'</tr></thead>'
-        f'<tbody>{rows}</tbody></table>'
-        f'<p style="color:#94a3b8;font-size:12px">View: {view_id} | Sent by Obs Dashboard</p>'
-        f'</div>'
+    return _VC_ALERT_EMAIL.render(
+        banner=_VC_TEST_BANNER if is_test else "",
+        notif_name=notif_name, view_id=view_id, table=_vc_alert_table(alerts),
     )
 
 
-def _evaluate_vc_conditions(notif):
-    """Check enriched app data against notification alert types.
-    Returns list of {app_name, app_seal, alert_type, detail}."""
-    view_filters = notif.get("view_filters", {})
-    filter_kwargs = {
-        k: v for k, v in view_filters.items()
-        if k in ("lob", "sub_lob", "cto", "cbt", "seal", "status", "search") and v
-    }
+def _build_vc_combined_email(sections) -> str:
+    """One email body covering several notifications: a table per (view_id, notif, alerts)."""
+    return _VC_COMBINED_EMAIL.render(sections="".join(
+        _VC_COMBINED_SECTION.render(notif_name=notif["name"], view_id=view_id, table=_vc_alert_table(alerts))
+        for view_id, notif, alerts in sections
+    ))
+
+
+_VC_FILTER_KEYS = ("lob", "sub_lob", "cto", "cbt", "seal", "status", "search")
+_VC_ALERT_TYPES = ("critical", "warning", "slo")
+
+
+def _vc_scope_key(view_filters: dict | None) -> tuple:
+    """Canonical, hashable form of a notification's view_filters.
+    Empty values are dropped, list values are de-duplicated and sorted, and the
+    search term is case-folded (the filter compares lowercase anyway), so rules
+    that select the same apps share one key regardless of how they were saved."""
+    key = []
+    for k in _VC_FILTER_KEYS:
+        v = (view_filters or {}).get(k)
+        if not v:
+            continue
+        if k == "search":
+            v = str(v).lower()
+        elif isinstance(v, (list, tuple, set)):
+            v = tuple(sorted(set(v)))
+        key.append((k, v))
+    return tuple(key)
+
+
+def _evaluate_vc_scope(scope_key: tuple, alert_types=_VC_ALERT_TYPES) -> list[dict]:
+    """Alert candidates for every app in a scope, for the given alert types.
+    Returns {app_name, app_seal, alert_type, detail} dicts in app order."""
+    filter_kwargs = {k: list(v) if isinstance(v, tuple) else v for k, v in scope_key}
     apps = _filter_dashboard_apps(**filter_kwargs)
-    alert_types = set(notif.get("alert_types", []))
+    alert_types = set(alert_types)
+    slo_by_seal = _get_slo_table() if "slo" in alert_types else {}
     triggered = []
-
     for app in apps:
-        if "critical" in alert_types and app["status"] == "critical":
-            triggered.append({
-                "app_name": app["name"], "app_seal": app["seal"],
-                "alert_type": "critical",
-                "detail": f'{app["name"]} is in critical status',
-            })
-        if "warning" in alert_types and app["status"] == "warning":
+        triggered.extend(_vc_app_alerts(app, alert_types, slo_by_seal))
+    return triggered
+
+
+def _vc_app_alerts(app: dict, alert_types: set, slo_by_seal: dict) -> list[dict]:
+    """Alerts one dashboard app raises for the given alert types."""
+    triggered = []
+    if "critical" in alert_types and app["status"] == "critical":
+        triggered.append({
+            "app_name": app["name"], "app_seal": app["seal"],
+            "alert_type": "critical",
+            "detail": f'{app["name"]} is in critical status',
+        })
+    if "warning" in alert_types and app["status"] == "warning":
+        triggered.append({
+            "app_name": app["name"], "app_seal": app["seal"],
+            "alert_type": "warning",
+            "detail": f'{app["name"]} is in warning status',
+        })
+    if "slo" in alert_types:
+        slo = slo_by_seal.get(app["seal"]) or {}
+        if slo.get("status") in ("critical", "warning"):
             triggered.append({
                 "app_name": app["name"], "app_seal": app["seal"],
-                "alert_type": "warning",
-                "detail": f'{app["name"]} is in warning status',
+                "alert_type": "slo",
+                "detail": f'{app["name"]} SLO is {slo["status"]} '
+                          f'(current: {slo.get("current", "N/A")}%)',
             })
-        if "slo" in alert_types:
-            enriched = get_enriched_applications()
-            match = next((e for e in enriched if e["seal"] == app["seal"]), None)
-            if match and match.get("slo", {}).get("status") in ("critical", "warning"):
-                triggered.append({
-                    "app_name": app["name"], "app_seal": app["seal"],
-                    "alert_type": "slo",
-                    "detail": f'{app["name"]} SLO is {match["slo"]["status"]} '
-                              f'(current: {match["slo"].get("current", "N/A")}%)',
-                })
     # "change" and "deployment" alert types require real event streams — TODO
     return triggered
 
 
+def _evaluate_vc_conditions(notif):
+    """Check enriched app data against notification alert types.
+    Returns list of {app_name, app_seal, alert_type, detail}."""
+    return _evaluate_vc_scope(
+        _vc_scope_key(notif.get("view_filters")), notif.get("alert_types", []),
+    )
+
+
+# ── Alert dedup store ──
+# (notif_id, alert_type, app_seal) → monotonic time the cooldown ends. Expired
+# keys are popped off a min-heap (stale heap entries from re-marks are skipped
+# lazily) and VC_DEDUP_MAX caps memory. Entries are written through to SQLite
+# with wall-clock expiry, so a restart keeps suppressing alerts sent before it;
+# expired rows are purged by the reconcile sweep, not on the alert path.
+VC_DEDUP_MAX = 100_000
+
+_vc_dedup: dict[tuple[int, str, str], float] = {}
+_vc_dedup_heap: list[tuple[float, tuple[int, str, str]]] = []
+_vc_dedup_by_notif: dict[int, set[tuple[int, str, str]]] = {}
+# Keys collected by a pass whose emails have not resolved yet. Another pass
+# overlapping the sends skips them; delivery starts their cooldown or, on
+# failure, just clears them.
+_vc_inflight: set[tuple[int, str, str]] = set()
+_vc_dedup_lock = threading.Lock()
+
+
+def _vc_dedup_put(key: tuple[int, str, str], expires: float):
+    _vc_dedup[key] = expires
+    heapq.heappush(_vc_dedup_heap, (expires, key))
+    _vc_dedup_by_notif.setdefault(key[0], set()).add(key)
+
+
+def _vc_dedup_drop(key: tuple[int, str, str]):
+    del _vc_dedup[key]
+    keys = _vc_dedup_by_notif.get(key[0])
+    if keys is not None:
+        keys.discard(key)
+        if not keys:
+            del _vc_dedup_by_notif[key[0]]
+
+
+def _expire_vc_dedup(now: float):
+    """Pop expired keys (and, past VC_DEDUP_MAX, the soonest-expiring ones).
+    Memory only — callers hold _vc_dedup_lock."""
+    while _vc_dedup_heap and (_vc_dedup_heap[0][0] <= now or len(_vc_dedup) > VC_DEDUP_MAX):
+        expires, key = heapq.heappop(_vc_dedup_heap)
+        if _vc_dedup.get(key) == expires:
+            _vc_dedup_drop(key)
+
+
+def _purge_vc_dedup():
+    """Delete expired dedup rows from the state store."""
+    with _state_db_lock:
+        _state_db().execute("DELETE FROM vc_alert_dedup WHERE expires_at <= ?", (time.time(),))
+
+
+@_state_store_init
+def _load_vc_dedup():
+    """Create the dedup table and reload unexpired entries into memory."""
+    with _state_db_lock:
+        db = _state_db()
+        db.execute(
+            "CREATE TABLE IF NOT EXISTS vc_alert_dedup ("
+            " notif_id INTEGER NOT NULL, alert_type TEXT NOT NULL, app_seal TEXT NOT NULL,"
+            " expires_at REAL NOT NULL, PRIMARY KEY (notif_id, alert_type, app_seal))"
+        )
+        db.execute("CREATE INDEX IF NOT EXISTS vc_alert_dedup_expiry ON vc_alert_dedup (expires_at)")
+        wall = time.time()
+        db.execute("DELETE FROM vc_alert_dedup WHERE expires_at <= ?", (wall,))
+        rows = db.execute("SELECT notif_id, alert_type, app_seal, expires_at FROM vc_alert_dedup").fetchall()
+    mono = time.monotonic()
+    with _vc_dedup_lock:
+        for notif_id, alert_type, app_seal, expires_at in rows:
+            _vc_dedup_put((notif_id, alert_type, app_seal), mono + (expires_at - wall))
+
+
 def _should_send_alert(notif_id, alert_type, app_seal):
-    """Check cooldown to avoid duplicate alerts."""
-    key = f"{notif_id}:{alert_type}:{app_seal}"
-    last_sent = _vc_alert_state.get(key)
-    if last_sent:
-        elapsed = (datetime.utcnow() - datetime.fromisoformat(last_sent)).total_seconds()
-        if elapsed < VC_ALERT_COOLDOWN:
+    """Check cooldown (and in-flight sends) to avoid duplicate alerts."""
+    now = time.monotonic()
+    key = (notif_id, alert_type, app_seal)
+    with _vc_dedup_lock:
+        if key in _vc_inflight:
             return False
-    return True
+        _expire_vc_dedup(now)
+        expires = _vc_dedup.get(key)
+    return expires is None or expires <= now
+
+
+def _mark_alerts_inflight(notif_id, keys, inflight: bool = True):
+    """Flag (or unflag) a rule's (alert_type, app_seal) keys as being sent."""
+    with _vc_dedup_lock:
+        for alert_type, app_seal in keys:
+            if inflight:
+                _vc_inflight.add((notif_id, alert_type, app_seal))
+            else:
+                _vc_inflight.discard((notif_id, alert_type, app_seal))
+
+
+def _mark_alerts_sent(notif_id, keys):
+    """Start the cooldown for each sent (alert_type, app_seal) in one transaction."""
+    mono, wall = time.monotonic(), time.time()
+    rows = [(notif_id, alert_type, app_seal, wall + VC_ALERT_COOLDOWN) for alert_type, app_seal in keys]
+    with _vc_dedup_lock:
+        for alert_type, app_seal in keys:
+            _vc_dedup_put((notif_id, alert_type, app_seal), mono + VC_ALERT_COOLDOWN)
+        _expire_vc_dedup(mono)
+    with _state_db_lock:
+        db = _state_db()
+        db.execute("BEGIN")
+        db.executemany("INSERT OR REPLACE INTO vc_alert_dedup VALUES (?, ?, ?, ?)", rows)
+        db.execute("COMMIT")
+
+
+def _forget_vc_alerts(notif_id):
+    """Drop every dedup entry for a notification."""
+    with _vc_dedup_lock:
+        for key in list(_vc_dedup_by_notif.get(notif_id, ())):
+            _vc_dedup_drop(key)
+    with _state_db_lock:
+        _state_db().execute("DELETE FROM vc_alert_dedup WHERE notif_id = ?", (notif_id,))
+
+
+
+def _group_vc_notifications() -> dict[tuple, list[tuple[str, dict]]]:
+    """Enabled notifications grouped by canonical scope key."""
+    groups: dict[tuple, list[tuple[str, dict]]] = {}
+    for view_id, notif in _vc_notif_index.values():
+        if not notif.get("enabled"):
+            continue
+        groups.setdefault(_vc_scope_key(notif.get("view_filters")), []).append((view_id, notif))
+    return groups
+
+
+# Status alerts of apps degraded by the same upstream component are shown as
+# one alert for that root cause. Cooldowns and digests still track the
+# individual (alert_type, app_seal) alerts; correlation only shapes what is sent.
+_VC_CORRELATED_TYPES = ("critical", "warning")
+
+
+def _root_cause_alert(root: str, members: list[dict]) -> dict:
+    node = NODE_MAP[root]
+    seal = COMP_TO_SEAL.get(root)
+    names = [m["app_name"] for m in members]
+    shown = ", ".join(names[:5]) + (f" and {len(names) - 5} more" if len(names) > 5 else "")
+    return {
+        "app_name": SEAL_LABELS.get(seal, seal) if seal else node["label"],
+        "app_seal": seal or root,
+        "alert_type": "critical" if any(m["alert_type"] == "critical" for m in members) else "warning",
+        "detail": f'Shared root cause {node["label"]} is {node["status"]}: {len(members)} apps affected ({shown})',
+        "root_cause": root,
+        "correlated": [m["app_seal"] for m in members],
+    }
+
+
+def _correlate_vc_alerts(alerts: list[dict]) -> list[dict]:
+    """Fold status alerts that share an unhealthy upstream root cause into one
+    alert per root, placed where its first member was. Roots explaining the
+    most alerts claim them first; an app is folded at most once, and a root
+    that explains a single alert leaves it as it is."""
+    roots_by_seal = _root_causes_by_seal()
+    by_root: dict[str, list[int]] = {}
+    for i, a in enumerate(alerts):
+        if a["alert_type"] in _VC_CORRELATED_TYPES:
+            for root in roots_by_seal.get(a["app_seal"], ()):
+                by_root.setdefault(root, []).append(i)
+    folded: set[int] = set()
+    grouped: dict[int, dict] = {}
+    for root in sorted(by_root, key=lambda r: -len(by_root[r])):
+        members = [i for i in by_root[root] if i not in folded]
+        if len(members) < 2:
+            continue
+        folded.update(members)
+        grouped[members[0]] = _root_cause_alert(root, [alerts[i] for i in members])
+    if not grouped:
+        return alerts
+    return [grouped.get(i, a) for i, a in enumerate(alerts) if i not in folded or i in grouped]
+
+
+def _collect_vc_alerts(view_id: str, notif: dict, candidates: list[dict], batches: list):
+    """Narrow candidates to the rule's alert types and cooldown and add them to the
+    cycle's batches. Digest rules (non-realtime) collect them for their next fire;
+    realtime rules are rate limited and, while in storm mode, collect for the storm digest."""
+    if notif.get("frequency") != "realtime":
+        _accumulate_digest(notif, candidates)
+        return
+    alert_types = set(notif.get("alert_types", []))
+    new_alerts = [
+        a for a in candidates
+        if a["alert_type"] in alert_types
+        and _should_send_alert(notif["id"], a["alert_type"], a["app_seal"])
+    ]
+    if notif["id"] in _vc_storms:
+        _hold_for_storm_digest(notif, new_alerts, candidates)
+        return
+    if new_alerts:
+        new_alerts = _limit_vc_rule_alerts(notif, new_alerts, candidates)
+    if new_alerts:
+        # Cleared by _deliver_vc_batches once the sends resolve
+        _mark_alerts_inflight(notif["id"], [(a["alert_type"], a["app_seal"]) for a in new_alerts])
+        batches.append((view_id, notif, new_alerts))
+
+
+async def _deliver_vc_batches(batches: list, digest_since: dict[int, datetime] | None = None):
+    """Deliver a cycle's batches (see _send_vc_batches). Realtime batches come
+    from _collect_vc_alerts with their alerts marked in flight; the marks are
+    cleared once the cooldowns of the delivered ones have started."""
+    try:
+        await _send_vc_batches(batches, digest_since)
+    finally:
+        if digest_since is None:
+            for _, notif, alerts in batches:
+                _mark_alerts_inflight(notif["id"], [(a["alert_type"], a["app_seal"]) for a in alerts], False)
+
+
+async def _send_vc_batches(batches: list, digest_since: dict[int, datetime] | None):
+    """Send one email per recipient for everything a cycle produced.
+    Recipients are matched case-insensitively; recipients subscribed to exactly
+    the same rules share one send. Cooldowns are then started per rule, as if
+    each rule had emailed on its own, for the rules whose every send was
+    delivered or handed to the retry outbox; a rule with a rejected or failed
+    send stays eligible for the next cycle. Recipients out of realtime budget
+    get the alerts in a deferred summary instead, which counts as delivery.
+    `digest_since` (notif id → period start) marks the batches as digests,
+    which carry no cooldown and no recipient limit."""
+    batches = [b for b in batches if b[1]["channels"].get("email") and b[1]["email_recipients"]]
+    by_recipient: dict[str, tuple[str, list[int]]] = {}
+    for i, (_, notif, _) in enumerate(batches):
+        for addr in notif["email_recipients"]:
+            entry = by_recipient.setdefault(addr.strip().lower(), (addr.strip(), []))
+            if not entry[1] or entry[1][-1] != i:
+                entry[1].append(i)
+    by_sections: dict[tuple[int, ...], list[str]] = {}
+    for addr, idxs in by_recipient.values():
+        by_sections.setdefault(tuple(idxs), []).append(addr)
+
+    if not batches:
+        return
+    loop = asyncio.get_running_loop()
+    # Correlation reads the root-cause index under the snapshot lock — keep it off the loop
+    shown = await loop.run_in_executor(
+        None, lambda: [(view_id, notif, _correlate_vc_alerts(alerts)) for view_id, notif, alerts in batches],
+    )
+    sends, carried = [], []
+    deferred_to: dict[int, int] = {}   # batch index → recipients deferred
+    for idxs, addrs in by_sections.items():
+        if digest_since is None:
+            addrs, throttled = _limit_vc_recipients(addrs)
+            if throttled:
+                _defer_for_recipients(throttled, [batches[i] for i in idxs])
+                for i in idxs:
+                    deferred_to[i] = deferred_to.get(i, 0) + len(throttled)
+            if not addrs:
+                continue
+        sections = [shown[i] for i in idxs]
+        total = sum(len(alerts) for _, _, alerts in sections)
+        if len(sections) == 1:
+            view_id, notif, alerts = sections[0]
+            if digest_since is not None:
+                since = f'{digest_since[notif["id"]]:%Y-%m-%d %H:%M} UTC'
+                tag = "Storm digest" if notif["id"] in _vc_storms else "Digest"
+                subject = f'[{tag}] {notif["name"]}: {total} condition(s) since {since}'
+                plain = f'{tag}: {notif["name"]} - {total} conditions since {since}'
+            else:
+                subject = f'[Alert] {notif["name"]}: {total} condition(s) detected'
+                plain = f'Alert: {notif["name"]} - {total} conditions detected'
+            html_body = _build_vc_alert_email(notif_name=notif["name"], view_id=view_id, alerts=alerts)
+        else:
+            tag = "Digest" if digest_since is not None else "Alert"
+            subject = f'[{tag}] {total} condition(s) across {len(sections)} notifications'
+            plain = f'{tag}: {total} conditions across ' + ", ".join(n["name"] for _, n, _ in sections)
+            html_body = _build_vc_combined_email(sections)
+        sends.append(send_email_async(addrs, subject, html_body, plain))
+        carried.append((idxs, len(addrs)))
+    sent_to: dict[int, int] = {}   # batch index → recipients reached
+    failed = set()
+    for (idxs, n_addrs), result in zip(carried, await asyncio.gather(*sends, return_exceptions=True)):
+        if isinstance(result, Exception):
+            logger.error("VC alert email failed: %s", result)
+        elif result.get("status") not in ("sent", "queued"):
+            logger.error("VC alert email not delivered: %s", result.get("detail"))
+        else:
+            for i in idxs:
+                sent_to[i] = sent_to.get(i, 0) + n_addrs
+            continue
+        failed.update(idxs)
+    delivered = sorted((sent_to.keys() | deferred_to.keys()) - failed)
+
+    if digest_since is None:
+        await loop.run_in_executor(None, lambda: [
+            _mark_alerts_sent(batches[i][1]["id"], [(a["alert_type"], a["app_seal"]) for a in batches[i][2]])
+            for i in delivered
+        ])
+    for i in delivered:
+        view_id, notif, alerts = batches[i]
+        logger.info(
+            "VC %s %s: notif=%d view=%s alerts=%d recipients=%d deferred=%d",
+            "digest" if digest_since is not None else "alert",
+            "sent" if i in sent_to else "deferred",
+            notif["id"], view_id, len(alerts), sent_to.get(i, 0), deferred_to.get(i, 0),
+        )
+    if sends:
+        raw, grouped = sum(len(b[2]) for b in batches), sum(len(b[2]) for b in shown)
+        logger.info(
+            "VC delivery: %d rule batch(es) coalesced into %d email(s); %d alert(s) shown as %d after root-cause correlation",
+            len(batches), len(sends), raw, grouped,
+        )
 
 
-def _mark_alert_sent(notif_id, alert_type, app_seal):
-    """Record that an alert was sent."""
-    key = f"{notif_id}:{alert_type}:{app_seal}"
-    _vc_alert_state[key] = datetime.utcnow().isoformat()
+_vc_eval_lock = threading.Lock()   # one evaluation pass at a time (executor threads)
 
 
 async def _evaluate_all_notifications():
-    """Iterate all enabled realtime notifications, evaluate conditions, send emails."""
-    for view_id, notifs in _vc_notifications.items():
-        for notif in notifs:
-            if not notif.get("enabled") or notif.get("frequency") != "realtime":
+    """Evaluate all enabled notifications; send realtime alerts, collect digests.
+    Rules are grouped by scope: each distinct scope's apps and alert candidates
+    are computed once, then narrowed to each rule's alert_types. Emails go out
+    at the end of the pass, coalesced per recipient."""
+    batches = await asyncio.get_running_loop().run_in_executor(None, _collect_all_vc_alerts)
+    await _deliver_vc_batches(batches)
+
+
+def _collect_all_vc_alerts() -> list:
+    """The evaluation half of a full sweep. Blocking (snapshot lock, SQLite
+    cooldowns), so it runs in the default executor, off the event loop."""
+    batches: list = []
+    with _vc_eval_lock:
+        for scope_key, members in _group_vc_notifications().items():
+            wanted = set().union(*(n.get("alert_types", []) for _, n in members))
+            try:
+                candidates = _evaluate_vc_scope(scope_key, wanted)
+            except Exception as exc:
+                logger.error("VC scope eval error (scope=%s, rules=%d): %s", scope_key, len(members), exc)
+                continue
+            if not candidates:
+                continue
+            for view_id, notif in members:
+                try:
+                    _collect_vc_alerts(view_id, notif, candidates, batches)
+                except Exception as exc:
+                    logger.error("VC notification eval error (notif=%d): %s", notif.get("id", -1), exc)
+    return batches
+
+
+# ── Event-driven VC evaluation ──────────────────────────────────────────────
+# A snapshot listener records apps whose (status, SLO status) moved; marking
+# the snapshot dirty wakes _vc_event_loop, which refreshes it and matches only
+# the changed apps against an inverted index of rule scopes. The periodic
+# sweep above remains as a reconcile pass (and re-alerts after cooldown).
+
+# Scope attributes rules are indexed under, most selective first.
+# filter key → dashboard app field
+_VC_INDEX_KEYS = (("seal", "seal"), ("sub_lob", "subLob"), ("cbt", "cbt"), ("cto", "cto"), ("lob", "lob"))
+_VC_APP_FIELDS = {"lob": "lob", "sub_lob": "subLob", "cto": "cto", "cbt": "cbt", "seal": "seal", "status": "status"}
+
+_vc_rule_index: dict[tuple[str, str], list[tuple[str, dict]]] = {}
+_vc_notif_index: dict[int, tuple[str, dict]] = {}  # notif id → (view_id, notif), all rules
+_vc_wildcard_rules: list[tuple[str, dict]] = []   # no indexable attribute — checked for every change
+_vc_app_state: dict[str, tuple[str, str]] = {}    # seal → (status, slo status) last seen
+_vc_pending_seals: set[str] = set()               # guarded by _snapshot_lock
+_vc_loop: asyncio.AbstractEventLoop | None = None
+_vc_wake_event: asyncio.Event | None = None
+
+
+def _index_vc_rules():
+    """Rebuild the scope-attribute → rules index. Each rule is indexed under the
+    values of its most selective list-valued filter; a changed app then hits at
+    most one bucket per rule, and the full scope is verified on match.
+    The indexes are built fresh and swapped in, never edited in place, so the
+    evaluator can iterate the ones it picked up while a rule edit rebuilds them."""
+    global _vc_rule_index, _vc_wildcard_rules, _vc_notif_index
+    rule_index: dict[tuple[str, str], list[tuple[str, dict]]] = {}
+    wildcard: list[tuple[str, dict]] = []
+    by_id: dict[int, tuple[str, dict]] = {}
+    with _vc_rules_lock:
+        for view_id, notif in ((v, n) for v, ns in _vc_notifications.items() for n in ns):
+            by_id[notif["id"]] = (view_id, notif)
+            if not notif.get("enabled"):
                 continue
+            scope = dict(_vc_scope_key(notif.get("view_filters")))
+            key = next((k for k, _ in _VC_INDEX_KEYS if isinstance(scope.get(k), tuple)), None)
+            if key is None:
+                wildcard.append((view_id, notif))
+                continue
+            for value in scope[key]:
+                rule_index.setdefault((key, value), []).append((view_id, notif))
+        _vc_rule_index, _vc_wildcard_rules, _vc_notif_index = rule_index, wildcard, by_id
+
+
+def _vc_scope_matches(scope_key: tuple, app: dict) -> bool:
+    """Whether one dashboard app falls inside a scope (same rules as _filter_dashboard_apps)."""
+    for k, v in scope_key:
+        if k == "search":
+            if v not in app["name"].lower() and v not in app.get("seal", "").lower():
+                return False
+        elif app.get(_VC_APP_FIELDS[k], "") not in v:
+            return False
+    return True
+
+
+def _vc_wake():
+    """Schedule an event-driven evaluation pass; safe from any thread."""
+    if _vc_loop is not None and _vc_wake_event is not None:
+        _vc_loop.call_soon_threadsafe(_vc_wake_event.set)
+
+
+def _track_app_transitions(slugs: set[str]):
+    if _vc_loop is None:
+        return
+    for slug in slugs:
+        e = _enriched_snapshot[slug]
+        state = (_dashboard_status(e), e["slo"]["status"])
+        if _vc_app_state.get(e["seal"]) != state:
+            _vc_app_state[e["seal"]] = state
+            _vc_pending_seals.add(e["seal"])
+
+
+_snapshot_listeners.append(_track_app_transitions)
+
+
+async def _evaluate_changed_apps():
+    """Evaluate only the apps whose status or SLO status changed since the last pass."""
+    batches = await asyncio.get_running_loop().run_in_executor(None, _collect_changed_app_alerts)
+    if batches:
+        await _deliver_vc_batches(batches)
+
+
+def _collect_changed_app_alerts() -> list:
+    """The evaluation half of an event-driven pass; runs in the default executor."""
+    with _vc_eval_lock:
+        with _snapshot_lock:
+            _get_enriched_apps()
+            seals = set(_vc_pending_seals)
+            _vc_pending_seals.clear()
+            apps = [_enriched_cache_by_slug[_SEAL_SLUG[s]] for s in seals if _SEAL_SLUG.get(s) in _enriched_cache_by_slug]
+            slo_by_seal = _SLO_BY_SEAL
+        if not apps:
+            return []
+
+        wildcard, rule_index = _vc_wildcard_rules, _vc_rule_index
+        matched: dict[int, tuple[str, dict, list[dict]]] = {}
+        for app in apps:
+            rules = list(wildcard)
+            for key, field in _VC_INDEX_KEYS:
+                rules.extend(rule_index.get((key, app.get(field, "")), ()))
+            for view_id, notif in rules:
+                if _vc_scope_matches(_vc_scope_key(notif.get("view_filters")), app):
+                    matched.setdefault(notif["id"], (view_id, notif, []))[2].append(app)
+        if not matched:
+            return []
+
+        app_alerts = {app["seal"]: _vc_app_alerts(app, set(_VC_ALERT_TYPES), slo_by_seal) for app in apps}
+        batches: list = []
+        for view_id, notif, in_scope in matched.values():
             try:
-                alerts = _evaluate_vc_conditions(notif)
-                new_alerts = [
-                    a for a in alerts
-                    if _should_send_alert(notif["id"], a["alert_type"], a["app_seal"])
-                ]
-                if not new_alerts:
-                    continue
-                if notif["channels"].get("email") and notif["email_recipients"]:
-                    subject = f'[Alert] {notif["name"]}: {len(new_alerts)} condition(s) detected'
-                    html_body = _build_vc_alert_email(
-                        notif_name=notif["name"], view_id=view_id, alerts=new_alerts,
-                    )
-                    await send_email_async(
-                        notif["email_recipients"], subject, html_body,
-                        f'Alert: {notif["name"]} - {len(new_alerts)} conditions detected',
-                    )
-                    for a in new_alerts:
-                        _mark_alert_sent(notif["id"], a["alert_type"], a["app_seal"])
-                    logger.info(
-                        "VC alert sent: notif=%d view=%s alerts=%d recipients=%d",
-                        notif["id"], view_id, len(new_alerts), len(notif["email_recipients"]),
-                    )
+                candidates = [a for app in in_scope for a in app_alerts[app["seal"]]]
+                _collect_vc_alerts(view_id, notif, candidates, batches)
             except Exception as exc:
                 logger.error("VC notification eval error (notif=%d): %s", notif.get("id", -1), exc)
+        return batches
+
+
+@_leader_job
+async def _vc_event_loop():
+    """Wait for snapshot changes and evaluate the apps they moved."""
+    global _vc_loop, _vc_wake_event
+    _vc_loop = asyncio.get_running_loop()
+    _vc_wake_event = asyncio.Event()
+    _index_vc_rules()
+    with _snapshot_lock:
+        # Transitions are not tracked while another worker leads — start from a
+        # fresh baseline so the first pass covers (and alerts on) the current state
+        _get_enriched_apps()
+        _vc_app_state.clear()
+        _track_app_transitions(set(_enriched_snapshot))
+    _vc_wake_event.set()
+    logger.info("VC event-driven evaluation started")
+    while True:
+        try:
+            await _vc_wake_event.wait()
+            await asyncio.sleep(VC_EVENT_DEBOUNCE)
+            _vc_wake_event.clear()
+            await _evaluate_changed_apps()
+        except asyncio.CancelledError:
+            _vc_loop = _vc_wake_event = None
+            logger.info("VC event-driven evaluation stopped")
+            break
+        except Exception as exc:
+            logger.error("VC event loop error: %s", exc)
+
+
+# ── Digest scheduling ──
+# Non-realtime rules collect triggered alerts into a per-rule digest that is
+# emailed at the rule's fire times (UTC, like every other timestamp here):
+#   hourly / custom — on the hour from start_time through end_time
+#   daily           — at start_time
+#   weekly          — at start_time on the first selected day (Monday if none)
+# days_of_week limits the days a window may start on (every day if empty); an
+# end_time at or before start_time means the window runs past midnight.
+# A min-heap holds each rule's next fire. Rescheduling bumps the rule's
+# generation, so superseded heap entries are skipped and a tick only touches
+# the rules that are due.
+
+VC_FREQUENCIES = ("realtime", "hourly", "daily", "weekly", "custom")
+VC_DIGEST_MAX_SLEEP = 60   # seconds — upper bound between scheduler wake-ups
+_WEEKDAYS = ("Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun")
+
+_vc_digests: dict[int, dict[tuple[str, str], dict]] = {}   # notif id → (alert_type, seal) → alert
+_vc_digest_since: dict[int, datetime] = {}                 # start of the period being collected
+_vc_digest_heap: list[tuple[datetime, int, int]] = []       # (fire at, notif id, generation)
+_vc_digest_gen: dict[int, int] = {}
+_vc_digest_lock = threading.Lock()
+_vc_digest_wake: asyncio.Event | None = None
+
+
+def _parse_hhmm(value) -> int | None:
+    """"HH:MM" → minutes after midnight, or None if malformed."""
+    try:
+        h, m = (int(p) for p in str(value).split(":"))
+    except ValueError:
+        return None
+    return h * 60 + m if 0 <= h < 24 and 0 <= m < 60 else None
+
+
+def _validate_vc_schedule(notif: dict):
+    if notif.get("frequency") not in VC_FREQUENCIES:
+        raise HTTPException(status_code=400, detail=f"Invalid frequency '{notif.get('frequency')}'")
+    for field in ("start_time", "end_time"):
+        if _parse_hhmm(notif.get(field)) is None:
+            raise HTTPException(status_code=400, detail=f"Invalid {field} '{notif.get(field)}', expected HH:MM")
+    bad_days = [d for d in notif.get("days_of_week") or [] if d not in _WEEKDAYS]
+    if bad_days:
+        raise HTTPException(status_code=400, detail=f"Invalid days_of_week {bad_days}")
+
+
+def _next_digest_fire(notif: dict, after: datetime) -> datetime | None:
+    """First fire time strictly after `after` for a digest rule."""
+    freq = notif.get("frequency")
+    start, end = _parse_hhmm(notif.get("start_time")), _parse_hhmm(notif.get("end_time"))
+    if freq not in VC_FREQUENCIES[1:] or start is None or end is None:
+        return None
+    days = sorted({_WEEKDAYS.index(d) for d in notif.get("days_of_week") or [] if d in _WEEKDAYS}) or list(range(7))
+    if freq == "weekly":
+        days = days[:1]
+    span = (end - start) % 1440 or 1440
+    if freq in ("hourly", "custom"):
+        offsets = range(0, span + 1, 60) if span < 1440 else range(0, 1440, 60)
+    else:
+        offsets = (0,)
+    # Start from yesterday: a window that opened then may still be running
+    day = datetime(after.year, after.month, after.day) - timedelta(days=1)
+    for _ in range(9):
+        if day.weekday() in days:
+            for offset in offsets:
+                fire = day + timedelta(minutes=start + offset)
+                if fire > after:
+                    return fire
+        day += timedelta(days=1)
+    return None
+
+
+def _schedule_digest(notif: dict):
+    """(Re)compute a rule's next fire. Disabled rules, and realtime rules not in
+    storm mode, are dropped."""
+    nid = notif["id"]
+    with _vc_digest_lock:
+        gen = _vc_digest_gen.get(nid, 0) + 1
+        _vc_digest_gen[nid] = gen
+        storm = nid in _vc_storms
+        if not notif.get("enabled") or (notif.get("frequency") == "realtime" and not storm):
+            _vc_digests.pop(nid, None)
+            _vc_digest_since.pop(nid, None)
+            _vc_storms.pop(nid, None)
+            return
+        now = datetime.utcnow()
+        if notif.get("frequency") != "realtime":
+            _vc_storms.pop(nid, None)   # digest rules are already bounded
+            fire = _next_digest_fire(notif, now)
+        else:
+            fire = now + timedelta(seconds=VC_STORM_DIGEST_INTERVAL)
+        if fire is None:
+            return
+        _vc_digest_since.setdefault(nid, now)
+        heapq.heappush(_vc_digest_heap, (fire, nid, gen))
+    if _vc_loop is not None and _vc_digest_wake is not None:
+        _vc_loop.call_soon_threadsafe(_vc_digest_wake.set)
+
+
+def _unschedule_digest(notif_id: int):
+    with _vc_digest_lock:
+        _vc_digest_gen.pop(notif_id, None)
+        _vc_digests.pop(notif_id, None)
+        _vc_digest_since.pop(notif_id, None)
+        _vc_storms.pop(notif_id, None)
+    with _vc_rate_lock:
+        _vc_rule_buckets.pop(notif_id, None)
+
+
+def _accumulate_digest(notif: dict, candidates: list[dict]):
+    """Fold triggered alerts into the rule's pending digest (latest detail wins)."""
+    alert_types = set(notif.get("alert_types", []))
+    with _vc_digest_lock:
+        if notif["id"] not in _vc_digest_since:
+            return   # not scheduled (e.g. no fire time) — nothing would ever flush it
+        digest = _vc_digests.setdefault(notif["id"], {})
+        for a in candidates:
+            if a["alert_type"] in alert_types:
+                digest[(a["alert_type"], a["app_seal"])] = a
+
+
+def _pop_due_digests(now: datetime) -> list[tuple[str, dict, datetime, list[dict]]]:
+    """Pop every rule due at `now`, taking its collected alerts and opening the next period."""
+    due = []
+    with _vc_digest_lock:
+        while _vc_digest_heap and _vc_digest_heap[0][0] <= now:
+            fire, nid, gen = heapq.heappop(_vc_digest_heap)
+            if _vc_digest_gen.get(nid) != gen or nid not in _vc_notif_index:
+                continue
+            view_id, notif = _vc_notif_index[nid]
+            since = _vc_digest_since.get(nid, fire)
+            _vc_digest_since[nid] = fire
+            due.append((view_id, notif, since, list(_vc_digests.pop(nid, {}).values())))
+    return due
+
+
+# ── Alert rate limits & storm mode ──
+# Each realtime rule draws its alerts from a token bucket (VC_RULE_ALERT_BURST,
+# refilled at VC_RULE_ALERT_RATE per hour). When a cycle's new alerts overflow
+# it — a large scope going red, or an app flapping faster than the cooldown —
+# the rule enters storm mode: the overflow and every later alert go into a
+# summary digest sent every VC_STORM_DIGEST_INTERVAL. Alerts held for the digest
+# start their cooldown as if sent, so each period counts the alerts realtime
+# delivery would have sent; when a period has at most VC_STORM_RECOVER_ALERTS
+# of them the rule returns to realtime.
+# Realtime emails also draw one token per recipient from a per-address bucket.
+# A recipient out of tokens gets that email's alerts folded into a deferred
+# summary instead, sent by the digest scheduler once the address has a token
+# again (digests are not limited).
+VC_RULE_ALERT_RATE = float(os.environ.get("VC_RULE_ALERT_RATE", "30"))          # alerts / hour / rule
+VC_RULE_ALERT_BURST = int(os.environ.get("VC_RULE_ALERT_BURST", "20"))
+VC_RECIPIENT_EMAIL_RATE = float(os.environ.get("VC_RECIPIENT_EMAIL_RATE", "60"))  # emails / hour / address
+VC_RECIPIENT_EMAIL_BURST = int(os.environ.get("VC_RECIPIENT_EMAIL_BURST", "10"))
+VC_STORM_DIGEST_INTERVAL = int(os.environ.get("VC_STORM_DIGEST_INTERVAL", "900"))  # seconds
+VC_STORM_RECOVER_ALERTS = int(os.environ.get("VC_STORM_RECOVER_ALERTS", "5"))
+
+_vc_rule_buckets: dict[int, tuple[float, float]] = {}       # notif id → (tokens, monotonic updated)
+_vc_recipient_buckets: dict[str, tuple[float, float]] = {}  # lowercase address → (tokens, updated)
+_vc_storms: dict[int, dict] = {}   # notif id → {"since", "periods", "held"}; guarded by _vc_digest_lock
+# lowercase address → {"addr", "since", "rules": {notif id → (view_id, notif, {(alert_type, seal) → alert})}};
+# guarded by _vc_digest_lock
+_vc_recipient_deferred: dict[str, dict] = {}
+_vc_rate_lock = threading.Lock()
+_vc_rate_metrics = {
+    "alerts_allowed": 0, "alerts_rate_limited": 0, "alerts_to_storm_digest": 0,
+    "storms_entered": 0, "storms_recovered": 0, "storm_digests_sent": 0,
+    "emails_recipient_limited": 0, "recipients_deferred": 0, "recipient_summaries_sent": 0,
+}
 
 
+def _vc_rate_count(key: str, n: int = 1):
+    with _vc_rate_lock:
+        _vc_rate_metrics[key] += n
+
+
+def _take_tokens(buckets: dict, key, wanted: int, per_hour: float, burst: int) -> int:
+    """Token bucket: refill at `per_hour` up to `burst`, then take up to `wanted`
+    whole tokens. Returns how many were taken."""
+    now = time.monotonic()
+    with _vc_rate_lock:
+        tokens, updated = buckets.get(key, (float(burst), now))
+        tokens = min(float(burst), tokens + (now - updated) * per_hour / 3600)
+        taken = min(wanted, int(tokens))
+        buckets[key] = (tokens - taken, now)
+    return taken
+
+
+def _limit_vc_rule_alerts(notif: dict, new_alerts: list[dict], candidates: list[dict]) -> list[dict]:
+    """Alerts a realtime rule may send now. On overflow the rule enters storm
+    mode and its current alerts are collected for the storm digest instead."""
+    allowed = _take_tokens(_vc_rule_buckets, notif["id"], len(new_alerts), VC_RULE_ALERT_RATE, VC_RULE_ALERT_BURST)
+    _vc_rate_count("alerts_allowed", allowed)
+    if allowed == len(new_alerts):
+        return new_alerts
+    _vc_rate_count("alerts_rate_limited", len(new_alerts) - allowed)
+    with _vc_digest_lock:
+        entered = notif["id"] not in _vc_storms
+        if entered:
+            _vc_storms[notif["id"]] = {"since": datetime.utcnow(), "periods": 0, "held": 0}
+    if entered:
+        _vc_rate_count("storms_entered")
+        logger.warning(
+            "VC rule %d (%s) entered storm mode: %d new alert(s), %d allowed; switching to %ds summary digests",
+            notif["id"], notif["name"], len(new_alerts), allowed, VC_STORM_DIGEST_INTERVAL,
+        )
+        _schedule_digest(notif)
+    _hold_for_storm_digest(notif, new_alerts[allowed:], candidates)
+    return new_alerts[:allowed]
+
+
+def _hold_for_storm_digest(notif: dict, new_alerts: list[dict], candidates: list[dict]):
+    """Collect a storm rule's alerts for its digest; the new ones start their cooldown."""
+    if new_alerts:
+        _mark_alerts_sent(notif["id"], [(a["alert_type"], a["app_seal"]) for a in new_alerts])
+        with _vc_digest_lock:
+            storm = _vc_storms.get(notif["id"])
+            if storm is not None:
+                storm["held"] += len(new_alerts)
+        _vc_rate_count("alerts_to_storm_digest", len(new_alerts))
+    _accumulate_digest(notif, candidates)
+
+
+def _vc_storm_period_closed(notif: dict, sent: bool):
+    """After a storm digest period: recover the rule if it was quiet enough."""
+    with _vc_digest_lock:
+        storm = _vc_storms.get(notif["id"])
+        if storm is None:
+            return
+        storm["periods"] += 1
+        recovered = storm["held"] <= VC_STORM_RECOVER_ALERTS
+        storm["held"] = 0
+        if recovered:
+            del _vc_storms[notif["id"]]
+    if sent:
+        _vc_rate_count("storm_digests_sent")
+    if recovered:
+        _vc_rate_count("storms_recovered")
+        logger.info("VC rule %d (%s) recovered from storm mode after %d period(s)",
+                    notif["id"], notif["name"], storm["periods"])
+
+
+def _limit_vc_recipients(addrs: list[str]) -> tuple[list[str], list[str]]:
+    """Split recipients into those with realtime email budget (each takes one
+    token) and those out of it."""
+    kept, throttled = [], []
+    for addr in addrs:
+        ok = _take_tokens(_vc_recipient_buckets, addr.lower(), 1, VC_RECIPIENT_EMAIL_RATE, VC_RECIPIENT_EMAIL_BURST)
+        (kept if ok else throttled).append(addr)
+    if throttled:
+        _vc_rate_count("emails_recipient_limited")
+        _vc_rate_count("recipients_deferred", len(throttled))
+    return kept, throttled
+
+
+def _defer_for_recipients(addrs: list[str], batches: list):
+    """Fold (view_id, notif, alerts) batches into each address's deferred summary
+    (latest detail wins)."""
+    now = datetime.utcnow()
+    with _vc_digest_lock:
+        for addr in addrs:
+            pending = _vc_recipient_deferred.setdefault(addr.lower(), {"addr": addr, "since": now, "rules": {}})
+            for view_id, notif, alerts in batches:
+                held = pending["rules"].setdefault(notif["id"], (view_id, notif, {}))[2]
+                for a in alerts:
+                    held[(a["alert_type"], a["app_seal"])] = a
+
+
+def _pop_recipient_summaries() -> list[tuple[str, datetime, list]]:
+    """Take the deferred summaries of addresses whose budget has a token again
+    (the summary spends it). Returns (address, since, [(view_id, notif, alerts)])."""
+    with _vc_digest_lock:
+        waiting = list(_vc_recipient_deferred)
+    due = []
+    for key in waiting:
+        if not _take_tokens(_vc_recipient_buckets, key, 1, VC_RECIPIENT_EMAIL_RATE, VC_RECIPIENT_EMAIL_BURST):
+            continue
+        with _vc_digest_lock:
+            pending = _vc_recipient_deferred.pop(key, None)
+        if pending is not None:
+            sections = [
+                (view_id, notif, list(held.values())) for view_id, notif, held in pending["rules"].values()
+                if notif["id"] in _vc_notif_index   # skip rules deleted meanwhile
+            ]
+            if sections:
+                due.append((pending["addr"], pending["since"], sections))
+    return due
+
+
+async def _deliver_recipient_summaries(summaries: list[tuple[str, datetime, list]]):
+    """Email each deferred summary; one that does not go out is deferred again."""
+    loop = asyncio.get_running_loop()
+    for addr, since, sections in summaries:
+        shown = await loop.run_in_executor(
+            None, lambda: [(view_id, notif, _correlate_vc_alerts(alerts)) for view_id, notif, alerts in sections],
+        )
+        total = sum(len(alerts) for _, _, alerts in shown)
+        subject = f'[Deferred alerts] {total} condition(s) held by rate limit since {since:%Y-%m-%d %H:%M} UTC'
+        plain = "Deferred alerts: " + ", ".join(n["name"] for _, n, _ in shown)
+        if len(shown) == 1:
+            view_id, notif, alerts = shown[0]
+            html_body = _build_vc_alert_email(notif_name=notif["name"], view_id=view_id, alerts=alerts)
+        else:
+            html_body = _build_vc_combined_email(shown)
+        try:
+            result = await send_email_async([addr], subject, html_body, plain)
+        except Exception as exc:
+            result = {"status": "error", "detail": str(exc)}
+        if result.get("status") in ("sent", "queued"):
+            _vc_rate_count("recipient_summaries_sent")
+            logger.info("VC deferred summary sent: to=%s alerts=%d rules=%d", addr, total, len(shown))
+        else:
+            logger.error("VC deferred summary to %s not delivered: %s", addr, result.get("detail"))
+            _defer_for_recipients([addr], sections)
+
+
+@app.get("/api/vc-alerts/metrics")
+def get_vc_alert_metrics():
+    """Rate-limit counters, limits and the rules currently in storm mode."""
+    now = time.monotonic()
+    with _vc_rate_lock:
+        counters = dict(_vc_rate_metrics)
+        limited_recipients = sum(
+            1 for tokens, updated in _vc_recipient_buckets.values()
+            if tokens + (now - updated) * VC_RECIPIENT_EMAIL_RATE / 3600 < 1
+        )
+    with _vc_digest_lock:
+        deferred = sum(
+            len(held) for pending in _vc_recipient_deferred.values() for _, _, held in pending["rules"].values()
+        )
+        deferred_recipients = len(_vc_recipient_deferred)
+        storms = [
+            {"notif_id": nid, "since": storm["since"].strftime("%Y-%m-%dT%H:%M:%SZ"),
+             "periods": storm["periods"], "held_this_period": storm["held"],
+             "pending_alerts": len(_vc_digests.get(nid, {}))}
+            for nid, storm in _vc_storms.items()
+        ]
+    for storm in storms:
+        view_id, notif = _vc_notif_index.get(storm["notif_id"], (None, {}))
+        storm.update(view_id=view_id, name=notif.get("name"))
+    return {
+        "counters": counters,
+        "storms": storms,
+        "recipients_throttled_now": limited_recipients,
+        "deferred_summaries": {"recipients": deferred_recipients, "alerts": deferred},
+        "limits": {
+            "rule_alerts_per_hour": VC_RULE_ALERT_RATE, "rule_alert_burst": VC_RULE_ALERT_BURST,
+            "recipient_emails_per_hour": VC_RECIPIENT_EMAIL_RATE, "recipient_email_burst": VC_RECIPIENT_EMAIL_BURST,
+            "storm_digest_interval_seconds": VC_STORM_DIGEST_INTERVAL,
+            "storm_recover_alerts": VC_STORM_RECOVER_ALERTS,
+        },
+    }
+
+
+@_leader_job
+async def _vc_digest_loop():
+    """Sleep until the earliest fire time, then flush and reschedule the due rules.
+    Each wake-up also sends the deferred summaries whose recipients have budget."""
+    global _vc_digest_wake
+    _vc_digest_wake = asyncio.Event()
+    with _vc_rules_lock:
+        rules = [n for ns in _vc_notifications.values() for n in ns]
+    for notif in rules:   # stored rules loaded at startup have no fire time yet
+        _schedule_digest(notif)
+    logger.info("VC digest scheduler started")
+    while True:
+        try:
+            due = _pop_due_digests(datetime.utcnow())
+            if due:
+                try:
+                    await _deliver_vc_batches(
+                        [(view_id, notif, alerts) for view_id, notif, _, alerts in due if alerts],
+                        digest_since={notif["id"]: since for _, notif, since, _ in due},
+                    )
+                except Exception as exc:
+                    logger.error("VC digest delivery error (%d rules): %s", len(due), exc)
+                for _, notif, _, alerts in due:
+                    _vc_storm_period_closed(notif, bool(alerts))
+                    _schedule_digest(notif)
+            summaries = _pop_recipient_summaries()
+            if summaries:
+                await _deliver_recipient_summaries(summaries)
+            _vc_digest_wake.clear()
+            with _vc_digest_lock:
+                next_fire = _vc_digest_heap[0][0] if _vc_digest_heap else None
+            timeout = VC_DIGEST_MAX_SLEEP
+            if next_fire is not None:
+                timeout = min(timeout, max(0.0, (next_fire - datetime.utcnow()).total_seconds()))
+            try:
+                await asyncio.wait_for(_vc_digest_wake.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+        except asyncio.CancelledError:
+            logger.info("VC digest scheduler stopped")
+            break
+        except Exception as exc:
+            logger.error("VC digest loop error: %s", exc)
+
+
+@_leader_job
 async def _vc_notification_loop():
-    """Background loop that evaluates notification conditions and dispatches alerts."""
-    logger.info("VC notification monitoring started (interval=%ds)", VC_CHECK_INTERVAL)
+    """Background reconcile loop: full grouped sweep every VC_CHECK_INTERVAL."""
+    logger.info("VC notification reconcile started (interval=%ds)", VC_CHECK_INTERVAL)
     while True:
         try:
             await asyncio.sleep(VC_CHECK_INTERVAL)
             await _evaluate_all_notifications()
+            await asyncio.get_running_loop().run_in_executor(None, _purge_vc_dedup)
         except asyncio.CancelledError:
             logger.info("VC notification monitoring stopped")
             break
@@ -2693,16 +6023,11 @@ async def _vc_notification_loop():
             logger.error("VC notification loop error: %s", exc)
 
 
-@app.on_event("startup")
-async def _start_vc_notification_loop():
-    asyncio.create_task(_vc_notification_loop())
-
-
 # ── Contact / Send Message ───────────────────────────────────────────────────
 
 class ContactSendRequest(BaseModel):
     channels: dict = {"email": False, "teams": False}
-    email_recipients: list[str] = []
+    email_recipients: list[EmailAddress] = []
     teams_channels: list[str] = []
     subject: Optional[str] = None
     email_body: Optional[str] = None
@@ -2723,7 +6048,7 @@ async def send_contact_message(payload: ContactSendRequest):
             f"[{payload.app_name}] Contact Message" if payload.app_name
             else "Message from Obs Dashboard"
         )
-        html_body = payload.email_body or f"<p>{payload.message}</p>"
+        html_body = payload.email_body or _EMAIL_PARAGRAPH.render(text=payload.message)
 
         email_result = await send_email_async(
             recipients=payload.email_recipients,
@@ -2737,6 +6062,61 @@ async def send_contact_message(payload: ContactSendRequest):
     return result
 
 
+@app.get("/api/email/metrics")
+def get_email_metrics():
+    """Delivery pipeline health: queue depth, counters and latency percentiles."""
+    return _email_pipeline_metrics()
+
+
+@app.get("/api/email/dead-letters")
+def list_email_dead_letters(
+    response: Response,
+    limit: int = Query(50, ge=1, le=500),
+    offset: int = Query(0, ge=0),
+):
+    """Messages that were permanently rejected or ran out of retries, newest first."""
+    with _state_db_lock:
+        db = _state_db()
+        total = db.execute("SELECT COUNT(*) FROM email_dead_letter").fetchone()[0]
+        rows = db.execute(
+            "SELECT id, recipients, subject, attempts, last_error, created_at, failed_at"
+            " FROM email_dead_letter ORDER BY id DESC LIMIT ? OFFSET ?",
+            (limit, offset),
+        ).fetchall()
+    response.headers["X-Total-Count"] = str(total)
+    fmt = lambda ts: datetime.utcfromtimestamp(ts).strftime("%Y-%m-%dT%H:%M:%SZ")
+    return [
+        {"id": dl_id, "recipients": json.loads(recipients), "subject": subject, "attempts": attempts,
+         "last_error": last_error, "created_at": fmt(created_at), "failed_at": fmt(failed_at)}
+        for dl_id, recipients, subject, attempts, last_error, created_at, failed_at in rows
+    ]
+
+
+@app.post("/api/email/dead-letters/{dead_letter_id}/retry")
+def retry_email_dead_letter(dead_letter_id: int):
+    """Move a dead letter back to the outbox for immediate redelivery, with a fresh attempt budget."""
+    now = time.time()
+    with _state_db_lock:
+        db = _state_db()
+        db.execute("BEGIN")
+        cur = db.execute(
+            "INSERT INTO email_outbox (recipients, subject, message, attempts, next_attempt_at, last_error, created_at)"
+            " SELECT recipients, subject, message, 0, ?, last_error, created_at FROM email_dead_letter WHERE id = ?",
+            (now, dead_letter_id),
+        )
+        if cur.rowcount == 0:
+            db.execute("ROLLBACK")
+            raise HTTPException(status_code=404, detail="Dead letter not found")
+        db.execute("DELETE FROM email_dead_letter WHERE id = ?", (dead_letter_id,))
+        db.execute("COMMIT")
+    return {"ok": True, "outbox_id": cur.lastrowid}
+
+
+@app.on_event("shutdown")
+def _drain_email_pipeline():
+    _stop_email_pipeline()
+
+
 # ── AURA Assistant Chat ──────────────────────────────────────────────────────
 
 class AuraChatRequest(BaseModel):
@@ -0,0 +1,264 @@
+"""
+Minimal non-blocking SMTP client on asyncio streams.
+
+Supports EHLO/HELO, STARTTLS (or implicit TLS), AUTH PLAIN/LOGIN and
+PIPELINING (RFC 2920): when the server advertises it, MAIL FROM, every
+RCPT TO and DATA go out in one write and the replies are read back in order.
+Errors are raised as the standard smtplib exception types so callers can
+handle both clients the same way.
+"""
+
+import asyncio
+import base64
+import re
+import smtplib
+import ssl
+
+CRLF = b"\r\n"
+_LINE_ENDINGS = re.compile(rb"\r\n|\r|\n")
+
+
+def _quote_data(msg: str | bytes) -> bytes:
+    """CRLF line endings, leading dots doubled, terminated with CRLF.CRLF."""
+    if isinstance(msg, str):
+        msg = msg.encode("utf-8")
+    msg = _LINE_ENDINGS.sub(CRLF, msg)
+    msg = re.sub(rb"(?m)^\.", b"..", msg)
+    if not msg.endswith(CRLF):
+        msg += CRLF
+    return msg + b"." + CRLF
+
+
+class SMTPClient:
+    """One SMTP connection. Not safe for concurrent transactions — pool clients
+    and give each in-flight send its own."""
+
+    def __init__(
+        self,
+        host: str,
+        port: int = 587,
+        *,
+        timeout: float = 30.0,
+        use_tls: bool = False,          # implicit TLS (port 465)
+        start_tls: bool = True,         # upgrade with STARTTLS when advertised
+        require_tls: bool = False,      # fail if STARTTLS is not available
+        username: str = "",
+        password: str = "",
+        local_hostname: str = "localhost",
+        ssl_context: ssl.SSLContext | None = None,
+    ):
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self.use_tls = use_tls
+        self.start_tls = start_tls
+        self.require_tls = require_tls
+        self.username = username
+        self.password = password
+        self.local_hostname = local_hostname
+        self.ssl_context = ssl_context
+        self.esmtp_features: dict[str, str] = {}
+        self._reader: asyncio.StreamReader | None = None
+        self._writer: asyncio.StreamWriter | None = None
+        self._tls = False
+
+    @property
+    def is_connected(self) -> bool:
+        return self._writer is not None and not self._writer.is_closing()
+
+    # ── wire ──
+
+    async def _read_reply(self) -> tuple[int, str]:
+        if self._reader is None:
+            raise smtplib.SMTPServerDisconnected("Not connected")
+        lines = []
+        try:
+            # asyncio.timeout rather than wait_for: no extra task per read
+            async with asyncio.timeout(self.timeout):
+                while True:
+                    line = await self._reader.readline()
+                    if not line:
+                        self.close()
+                        raise smtplib.SMTPServerDisconnected("Connection unexpectedly closed")
+                    try:
+                        code = int(line[:3])
+                    except ValueError:
+                        self.close()
+                        raise smtplib.SMTPServerDisconnected(f"Malformed reply: {line!r}")
+                    lines.append(line[4:].strip().decode("utf-8", "replace"))
+                    if line[3:4] != b"-":
+                        return code, "\n".join(lines)
+        except TimeoutError:
+            self.close()
+            raise smtplib.SMTPServerDisconnected("Timed out waiting for server reply")
+        except ConnectionError as exc:
+            self.close()
+            raise smtplib.SMTPServerDisconnected(f"Read failed: {exc}")
+
+    async def _write(self, data: bytes):
+        if not self.is_connected:
+            raise smtplib.SMTPServerDisconnected("Not connected")
+        self._writer.write(data)
+        try:
+            async with asyncio.timeout(self.timeout):
+                await self._writer.drain()
+        except (TimeoutError, ConnectionError) as exc:
+            self.close()
+            raise smtplib.SMTPServerDisconnected(f"Write failed: {exc}")
+
+    async def command(self, line: str) -> tuple[int, str]:
+        await self._write(line.encode("ascii") + CRLF)
+        return await self._read_reply()
+
+    # ── session ──
+
+    async def connect(self):
+        """Open the connection and run greeting, EHLO, STARTTLS and AUTH."""
+        try:
+            async with asyncio.timeout(self.timeout):
+                self._reader, self._writer = await asyncio.open_connection(
+                    self.host, self.port,
+                    ssl=self._ssl_context() if self.use_tls else None,
+                    server_hostname=self.host if self.use_tls else None,
+                )
+        except (OSError, TimeoutError) as exc:
+            raise smtplib.SMTPConnectError(-1, f"{self.host}:{self.port}: {exc}")
+        self._tls = self.use_tls
+        code, msg = await self._read_reply()
+        if code != 220:
+            self.close()
+            raise smtplib.SMTPConnectError(code, msg)
+        await self.ehlo()
+        if not self._tls and self.start_tls:
+            if "starttls" in self.esmtp_features:
+                await self.starttls()
+            elif self.require_tls:
+                await self.quit()
+                raise smtplib.SMTPNotSupportedError("STARTTLS extension not supported by server")
+        if self.username:
+            await self.login(self.username, self.password)
+
+    async def ehlo(self):
+        code, msg = await self.command(f"EHLO {self.local_hostname}")
+        if code != 250:
+            code, msg = await self.command(f"HELO {self.local_hostname}")
+            if code != 250:
+                raise smtplib.SMTPHeloError(code, msg)
+            self.esmtp_features = {}
+            return
+        features = {}
+        for line in msg.split("\n")[1:]:
+            name, _, params = line.partition(" ")
+            features[name.lower()] = params
+        self.esmtp_features = features
+
+    def _ssl_context(self) -> ssl.SSLContext:
+        # Built on demand: loading the default CA store costs tens of ms
+        if self.ssl_context is None:
+            self.ssl_context = ssl.create_default_context()
+        return self.ssl_context
+
+    async def starttls(self):
+        code, msg = await self.command("STARTTLS")
+        if code != 220:
+            raise smtplib.SMTPResponseException(code, msg)
+        await self._writer.start_tls(self._ssl_context(), server_hostname=self.host)
+        self._tls = True
+        await self.ehlo()   # capabilities may change after the upgrade
+
+    async def login(self, username: str, password: str):
+        mechanisms = self.esmtp_features.get("auth", "").upper().split()
+        if "PLAIN" in mechanisms or not mechanisms:
+            token = base64.b64encode(f"\0{username}\0{password}".encode()).decode()
+            code, msg = await self.command(f"AUTH PLAIN {token}")
+        elif "LOGIN" in mechanisms:
+            code, msg = await self.command("AUTH LOGIN")
+            if code == 334:
+                code, msg = await self.command(base64.b64encode(username.encode()).decode())
+            if code == 334:
+                code, msg = await self.command(base64.b64encode(password.encode()).decode())
+        else:
+            raise smtplib.SMTPException(f"No supported AUTH mechanism (server offers {mechanisms})")
+        if code not in (235, 503):   # 503: already authenticated
+            raise smtplib.SMTPAuthenticationError(code, msg)
+
+    async def sendmail(self, from_addr: str, to_addrs: list[str], msg: str | bytes) -> dict[str, tuple[int, str]]:
+        """Send one message. Returns {recipient: (code, msg)} for refused
+        recipients; raises if the sender, every recipient or the data is refused.
+        Raises ValueError, before anything is written, if an address contains
+        CR or LF (it would inject SMTP commands)."""
+        for addr in (from_addr, *to_addrs):
+            if "\r" in addr or "\n" in addr:
+                raise ValueError(f"Line break in email address {addr!r}")
+        data = _quote_data(msg)
+        mail_cmd = f"MAIL FROM:<{from_addr}>"
+        rcpt_cmds = [f"RCPT TO:<{addr}>" for addr in to_addrs]
+
+        if "pipelining" in self.esmtp_features:
+            await self._write(CRLF.join(c.encode("ascii") for c in [mail_cmd, *rcpt_cmds, "DATA"]) + CRLF)
+            mail_reply = await self._read_reply()
+            rcpt_replies = [await self._read_reply() for _ in rcpt_cmds]
+            data_reply = await self._read_reply()
+        else:
+            mail_reply = await self.command(mail_cmd)
+            if mail_reply[0] != 250:
+                await self._reset()
+                raise smtplib.SMTPSenderRefused(mail_reply[0], mail_reply[1], from_addr)
+            rcpt_replies = [await self.command(c) for c in rcpt_cmds]
+            data_reply = None
+
+        if mail_reply[0] != 250:
+            if data_reply is not None and data_reply[0] == 354:
+                await self._abort_data()
+            await self._reset()
+            raise smtplib.SMTPSenderRefused(mail_reply[0], mail_reply[1], from_addr)
+        refused = {
+            addr: reply for addr, reply in zip(to_addrs, rcpt_replies) if reply[0] not in (250, 251)
+        }
+        if len(refused) == len(to_addrs):
+            if data_reply is not None and data_reply[0] == 354:
+                await self._abort_data()
+            await self._reset()
+            raise smtplib.SMTPRecipientsRefused(refused)
+
+        if data_reply is None:
+            data_reply = await self.command("DATA")
+        if data_reply[0] != 354:
+            await self._reset()
+            raise smtplib.SMTPDataError(*data_reply)
+        await self._write(data)
+        code, reply = await self._read_reply()
+        if code != 250:
+            await self._reset()
+            raise smtplib.SMTPDataError(code, reply)
+        return refused
+
+    async def _abort_data(self):
+        # Server already accepted DATA — an empty message keeps the session in step
+        await self._write(b"." + CRLF)
+        await self._read_reply()
+
+    async def _reset(self):
+        try:
+            await self.command("RSET")
+        except smtplib.SMTPServerDisconnected:
+            pass
+
+    async def noop(self) -> int:
+        return (await self.command("NOOP"))[0]
+
+    async def quit(self):
+        try:
+            if self.is_connected:
+                await self.command("QUIT")
+        except smtplib.SMTPException:
+            pass
+        finally:
+            self.close()
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+        self._reader = self._writer = None
+        self.esmtp_features = {}
+        self._tls = False
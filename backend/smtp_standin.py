@@ -0,0 +1,293 @@
+"""
+In-process SMTP stand-in for offline email tests and load tests.
+Run:  python backend/smtp_standin.py --port 2525 --latency 0.02 --temp-fail-rate 0.05
+
+Speaks enough ESMTP for the delivery pipeline (EHLO/HELO, PIPELINING, AUTH
+PLAIN/LOGIN accepting any credentials, MAIL/RCPT/DATA/RSET/NOOP/QUIT) on an
+asyncio loop of its own, and records every accepted message instead of
+relaying it. Faults can be injected per transaction:
+
+  latency          seconds before each reply (server / network round trip)
+  data_latency     extra seconds before the reply to the message body
+  temp_fail_rate   share of messages answered 451 (transient — retried)
+  perm_fail_rate   share of messages answered 554 (permanent — dead-lettered)
+  drop_rate        share of messages after which the connection is cut
+                   without a reply (the client reconnects)
+  max_recipients   RCPTs accepted per transaction; the rest get 452
+
+Messages are recorded with the perf_counter() time they were accepted, so a
+harness in the same process can measure end-to-end latency.
+"""
+
+import argparse
+import asyncio
+import base64
+import random
+import threading
+import time
+from dataclasses import dataclass, field
+from email.parser import BytesHeaderParser
+
+
+@dataclass
+class ReceivedMessage:
+    mail_from: str
+    rcpt_to: list[str]
+    data: bytes
+    received_at: float          # time.perf_counter() when the body was accepted
+
+    @property
+    def subject(self) -> str:
+        return BytesHeaderParser().parsebytes(self.data).get("Subject", "")
+
+
+@dataclass
+class StandInStats:
+    connections: int = 0
+    auths: int = 0
+    messages: int = 0
+    recipients: int = 0
+    temp_failures: int = 0
+    perm_failures: int = 0
+    drops: int = 0
+    recipients_deferred: int = 0
+    bytes_received: int = 0
+    by_connection: dict = field(default_factory=dict)   # connection no. → messages accepted
+
+
+class SMTPStandIn:
+    """Recording SMTP server on its own event-loop thread. Use as a context
+    manager, or call start() / stop()."""
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        *,
+        latency: float = 0.0,
+        data_latency: float = 0.0,
+        temp_fail_rate: float = 0.0,
+        perm_fail_rate: float = 0.0,
+        drop_rate: float = 0.0,
+        max_recipients: int | None = None,
+        keep_data: bool = True,
+        seed: int | None = None,
+    ):
+        self.host = host
+        self.port = port
+        self.latency = latency
+        self.data_latency = data_latency
+        self.temp_fail_rate = temp_fail_rate
+        self.perm_fail_rate = perm_fail_rate
+        self.drop_rate = drop_rate
+        self.max_recipients = max_recipients
+        self.keep_data = keep_data
+        self.messages: list[ReceivedMessage] = []
+        self.stats = StandInStats()
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._received = threading.Condition(self._lock)
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._server: asyncio.Server | None = None
+        self._thread: threading.Thread | None = None
+
+    # ── lifecycle ──
+
+    def start(self) -> "SMTPStandIn":
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="smtp-standin", daemon=True)
+        self._thread.start()
+        self._server = asyncio.run_coroutine_threadsafe(
+            asyncio.start_server(self._handle, self.host, self.port, backlog=1024), self._loop,
+        ).result()
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self
+
+    def stop(self):
+        if self._loop is None:
+            return
+
+        async def _close():
+            self._server.close()
+            await self._server.wait_closed()
+
+        try:
+            asyncio.run_coroutine_threadsafe(_close(), self._loop).result(5)
+        except Exception:
+            pass   # connections still open — the loop is stopped regardless
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(5)
+        self._loop = self._server = self._thread = None
+
+    def __enter__(self) -> "SMTPStandIn":
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    # ── inspection ──
+
+    def reset(self):
+        with self._lock:
+            self.messages.clear()
+            self.stats = StandInStats()
+
+    def wait_for(self, count: int, timeout: float) -> bool:
+        """Block until at least `count` messages were accepted, or timeout."""
+        deadline = time.monotonic() + timeout
+        with self._received:
+            while self.stats.messages < count:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self._received.wait(remaining)
+        return True
+
+    # ── protocol ──
+
+    async def _reply(self, writer: asyncio.StreamWriter, line: str, delay: float = 0.0):
+        if self.latency or delay:
+            await asyncio.sleep(self.latency + delay)
+        writer.write(line.encode("ascii") + b"\r\n")
+        await writer.drain()
+
+    def _fault(self) -> str | None:
+        with self._lock:
+            r = self._rng.random()
+        if r < self.drop_rate:
+            return "drop"
+        r -= self.drop_rate
+        if r < self.temp_fail_rate:
+            return "temp"
+        r -= self.temp_fail_rate
+        if r < self.perm_fail_rate:
+            return "perm"
+        return None
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        with self._lock:
+            self.stats.connections += 1
+            conn_no = self.stats.connections
+        mail_from, rcpt_to = None, []
+        try:
+            await self._reply(writer, "220 smtp-standin ESMTP ready")
+            while True:
+                line = await reader.readline()
+                if not line:
+                    return
+                cmd = line.decode("utf-8", "replace").rstrip("\r\n")
+                verb = cmd.split(" ", 1)[0].upper()
+                if verb == "EHLO":
+                    writer.write(b"250-smtp-standin\r\n250-PIPELINING\r\n250-8BITMIME\r\n")
+                    await self._reply(writer, "250 AUTH PLAIN LOGIN")
+                elif verb == "HELO":
+                    await self._reply(writer, "250 smtp-standin")
+                elif verb == "AUTH":
+                    if cmd.upper().startswith("AUTH LOGIN"):
+                        await self._reply(writer, "334 " + base64.b64encode(b"Username:").decode())
+                        await reader.readline()
+                        await self._reply(writer, "334 " + base64.b64encode(b"Password:").decode())
+                        await reader.readline()
+                    with self._lock:
+                        self.stats.auths += 1
+                    await self._reply(writer, "235 2.7.0 Authentication successful")
+                elif verb == "MAIL":
+                    mail_from, rcpt_to = cmd[10:].strip().strip("<>"), []
+                    await self._reply(writer, "250 2.1.0 OK")
+                elif verb == "RCPT":
+                    if mail_from is None:
+                        await self._reply(writer, "503 5.5.1 MAIL first")
+                    elif self.max_recipients is not None and len(rcpt_to) >= self.max_recipients:
+                        with self._lock:
+                            self.stats.recipients_deferred += 1
+                        await self._reply(writer, "452 4.5.3 Too many recipients")
+                    else:
+                        rcpt_to.append(cmd[8:].strip().strip("<>"))
+                        await self._reply(writer, "250 2.1.5 OK")
+                elif verb == "DATA":
+                    if not rcpt_to:
+                        await self._reply(writer, "554 5.5.1 No valid recipients")
+                        continue
+                    await self._reply(writer, "354 End data with <CR><LF>.<CR><LF>")
+                    chunks = []
+                    while True:
+                        chunk = await reader.readline()
+                        if not chunk or chunk == b".\r\n":
+                            break
+                        chunks.append(chunk[1:] if chunk.startswith(b"..") else chunk)
+                    if not chunk:
+                        return
+                    fault = self._fault()
+                    if fault == "drop":
+                        with self._lock:
+                            self.stats.drops += 1
+                        return
+                    if fault == "temp":
+                        with self._lock:
+                            self.stats.temp_failures += 1
+                        await self._reply(writer, "451 4.3.0 Temporary failure, try again later", self.data_latency)
+                    elif fault == "perm":
+                        with self._lock:
+                            self.stats.perm_failures += 1
+                        await self._reply(writer, "554 5.7.1 Message rejected", self.data_latency)
+                    else:
+                        if self.data_latency:
+                            await asyncio.sleep(self.data_latency)
+                        data = b"".join(chunks)
+                        msg = ReceivedMessage(mail_from, rcpt_to, data if self.keep_data else data[:4096],
+                                              time.perf_counter())
+                        with self._received:
+                            self.messages.append(msg)
+                            self.stats.messages += 1
+                            self.stats.recipients += len(rcpt_to)
+                            self.stats.bytes_received += len(data)
+                            self.stats.by_connection[conn_no] = self.stats.by_connection.get(conn_no, 0) + 1
+                            self._received.notify_all()
+                        await self._reply(writer, "250 2.0.0 Queued")
+                    mail_from, rcpt_to = None, []
+                elif verb == "RSET":
+                    mail_from, rcpt_to = None, []
+                    await self._reply(writer, "250 2.0.0 OK")
+                elif verb == "NOOP":
+                    await self._reply(writer, "250 2.0.0 OK")
+                elif verb == "QUIT":
+                    await self._reply(writer, "221 2.0.0 Bye")
+                    return
+                else:
+                    await self._reply(writer, "502 5.5.2 Command not recognized")
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=2525)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--data-latency", type=float, default=0.0)
+    parser.add_argument("--temp-fail-rate", type=float, default=0.0)
+    parser.add_argument("--perm-fail-rate", type=float, default=0.0)
+    parser.add_argument("--drop-rate", type=float, default=0.0)
+    parser.add_argument("--max-recipients", type=int)
+    args = parser.parse_args()
+
+    server = SMTPStandIn(
+        args.host, args.port, latency=args.latency, data_latency=args.data_latency,
+        temp_fail_rate=args.temp_fail_rate, perm_fail_rate=args.perm_fail_rate,
+        drop_rate=args.drop_rate, max_recipients=args.max_recipients, keep_data=False,
+    ).start()
+    print(f"SMTP stand-in listening on {args.host}:{server.port} (Ctrl-C to stop)")
+    try:
+        while True:
+            time.sleep(5)
+            s = server.stats
+            print(f"  connections={s.connections} messages={s.messages} recipients={s.recipients} "
+                  f"451={s.temp_failures} 554={s.perm_failures} drops={s.drops}")
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main_cli()
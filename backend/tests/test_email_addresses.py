@@ -0,0 +1,45 @@
+"""Email addresses with line breaks are rejected before they reach SMTP."""
+
+import asyncio
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+_STATE_DIR = tempfile.TemporaryDirectory(prefix="obs_state_")
+os.environ["OBS_STATE_DB"] = str(Path(_STATE_DIR.name) / "obs_state.db")
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import main  # noqa: E402
+from smtp_client import SMTPClient  # noqa: E402
+from smtp_standin import SMTPStandIn  # noqa: E402
+
+import pytest  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+
+INJECTED = "victim@example.com>\r\nRCPT TO:<attacker@example.com"
+
+
+def test_sendmail_rejects_line_breaks_before_writing():
+    async def run(port):
+        client = SMTPClient("127.0.0.1", port, start_tls=False)
+        await client.connect()
+        try:
+            for sender, rcpts in (("ops@example.com", [INJECTED]), ("ops@example.com\r\nDATA", ["a@example.com"])):
+                with pytest.raises(ValueError):
+                    await client.sendmail(sender, rcpts, "Subject: x\r\n\r\nbody")
+            # Nothing was written, so the connection is still in a clean state
+            await client.sendmail("ops@example.com", ["a@example.com"], "Subject: ok\r\n\r\nbody")
+        finally:
+            await client.quit()
+
+    with SMTPStandIn() as server:
+        asyncio.run(run(server.port))
+        assert [m.rcpt_to for m in server.messages] == [["a@example.com"]]
+
+
+@pytest.mark.parametrize("path", ["/api/vc-notifications/v-test", "/api/contact/send", "/api/announcements"])
+def test_request_models_reject_line_breaks(path):
+    client = TestClient(main.app)
+    resp = client.post(path, json={"name": "x", "title": "x", "email_recipients": [INJECTED]})
+    assert resp.status_code == 422
@@ -0,0 +1,74 @@
+"""VC alert delivery: overlapping evaluation passes must not email twice."""
+
+import asyncio
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+_STATE_DIR = tempfile.TemporaryDirectory(prefix="obs_state_")
+os.environ["OBS_STATE_DB"] = str(Path(_STATE_DIR.name) / "obs_state.db")
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import main  # noqa: E402
+
+main._init_state_store()
+
+import pytest  # noqa: E402
+
+
+@pytest.fixture
+def rule(monkeypatch):
+    notif = {
+        "id": 9001, "view_id": "v-test", "name": "Overlap", "enabled": True, "frequency": "realtime",
+        "alert_types": ["critical"], "channels": {"email": True}, "email_recipients": ["oncall@example.com"],
+    }
+    monkeypatch.setitem(main._vc_notif_index, notif["id"], ("v-test", notif))
+    yield notif
+    main._forget_vc_alerts(notif["id"])
+    main._unschedule_digest(notif["id"])
+
+
+def _alert(seal: str) -> dict:
+    return {"alert_type": "critical", "app_seal": seal, "app_name": f"App {seal}", "detail": "down", "severity": "critical"}
+
+
+def _pass(notif: dict, candidates: list[dict]) -> list:
+    batches: list = []
+    main._collect_vc_alerts(notif["view_id"], notif, candidates, batches)
+    return batches
+
+
+def test_overlapping_passes_send_once(rule, monkeypatch):
+    sent = []
+
+    async def slow_send(recipients, subject, html_body, plain_body=""):
+        sent.append(subject)
+        await asyncio.sleep(0.2)
+        return {"status": "sent"}
+
+    monkeypatch.setattr(main, "send_email_async", slow_send)
+    candidates = [_alert("101"), _alert("102")]
+
+    async def run():
+        first = asyncio.create_task(main._deliver_vc_batches(_pass(rule, candidates)))
+        await asyncio.sleep(0.05)   # first pass is waiting on its send
+        second = _pass(rule, candidates)
+        await main._deliver_vc_batches(second)
+        await first
+        return second
+
+    assert asyncio.run(run()) == []
+    assert len(sent) == 1
+    assert not main._should_send_alert(rule["id"], "critical", "101")
+
+
+def test_failed_send_clears_inflight_without_cooldown(rule, monkeypatch):
+    async def rejected(recipients, subject, html_body, plain_body=""):
+        return {"status": "error", "detail": "queue_full"}
+
+    monkeypatch.setattr(main, "send_email_async", rejected)
+    batches = _pass(rule, [_alert("201")])
+    assert not main._should_send_alert(rule["id"], "critical", "201")   # in flight
+    asyncio.run(main._deliver_vc_batches(batches))
+    assert main._should_send_alert(rule["id"], "critical", "201")
@@ -162,7 +162,9 @@ const InteractiveEdge = memo(({
 
 const edgeTypes = { interactive: InteractiveEdge }
 
-// ── Dagre-based hierarchical layout ─────────────────────────────────────────
+// ── Hierarchical layout ─────────────────────────────────────────────────────
+// Positions come precomputed from the API (apiData.layout); dagre is the
+// fallback for responses without them.
 
 // Padding added to each node's dimensions so dagre routes edges around them
 const NODE_PAD_X = 16
@@ -172,22 +174,7 @@ const ROOT_H = 62
 const SVC_W  = 190
 const SVC_H  = 50
 
-function buildGraphElements(apiData, mode) {
-  if (!apiData) return { nodes: [], edges: [] }
-
-  const { root, dependencies, impacted, edges: apiEdges } = apiData
-  const serviceList = mode === 'dependencies' ? (dependencies || []) : (impacted || [])
-
-  // Build node map for quick lookup
-  const allNodeMap = {}
-  allNodeMap[root.id] = root
-  serviceList.forEach(s => { allNodeMap[s.id] = s })
-
-  // Filter edges to only include nodes in our set
-  const validEdges = (apiEdges || []).filter(
-    e => e.source in allNodeMap && e.target in allNodeMap
-  )
-
+function dagrePositions(root, serviceList, validEdges) {
   // Compute per-node edge counts to assign weights
   const edgeCount = {}
   validEdges.forEach(e => {
@@ -195,7 +182,6 @@ function buildGraphElements(apiData, mode) {
     edgeCount[e.target] = (edgeCount[e.target] || 0) + 1
   })
 
-  // Create dagre graph
   const g = new dagre.graphlib.Graph()
   g.setDefaultEdgeLabel(() => ({}))
   g.setGraph({
@@ -228,19 +214,45 @@ function buildGraphElements(apiData, mode) {
   // Run dagre layout
   dagre.layout(g)
 
-  // Build ReactFlow nodes from dagre positions
+  const positions = {}
+  g.nodes().forEach(id => {
+    const p = g.node(id)
+    positions[id] = { x: p.x, y: p.y }
+  })
+  return positions
+}
+
+function buildGraphElements(apiData, mode) {
+  if (!apiData) return { nodes: [], edges: [] }
+
+  const { root, dependencies, impacted, edges: apiEdges } = apiData
+  const serviceList = mode === 'dependencies' ? (dependencies || []) : (impacted || [])
+
+  // Build node map for quick lookup
+  const allNodeMap = {}
+  allNodeMap[root.id] = root
+  serviceList.forEach(s => { allNodeMap[s.id] = s })
+
+  // Filter edges to only include nodes in our set
+  const validEdges = (apiEdges || []).filter(
+    e => e.source in allNodeMap && e.target in allNodeMap
+  )
+
+  const positions = apiData.layout?.positions || dagrePositions(root, serviceList, validEdges)
+
+  // Build ReactFlow nodes from the computed centre positions
   const rfNodes = [
     {
       id: root.id,
       type: 'root',
       position: {
-        x: g.node(root.id).x - ROOT_W / 2,
-        y: g.node(root.id).y - ROOT_H / 2,
+        x: positions[root.id].x - ROOT_W / 2,
+        y: positions[root.id].y - ROOT_H / 2,
       },
       data: { ...root },
     },
     ...serviceList.map(svc => {
-      const pos = g.node(svc.id)
+      const pos = positions[svc.id]
       return {
         id: svc.id,
         type: 'service',
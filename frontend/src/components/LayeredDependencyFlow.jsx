@@ -146,15 +146,9 @@ function clampToZoneBounds(items, nodeWidth, upColX, downColX) {
   }
 }
 
-// ── Build layered graph (two-phase layout) ──────────────────────────────────
-// Phase 1: Dagre for component-to-component layout (LR flow)
-// Phase 2: Manual positioning of platform/datacenter/indicator rows below
-function buildLayeredGraph(apiData, activeLayers) {
-  if (!apiData) return { nodes: [], edges: [] }
-
-  const VERTICAL_GAP = 80
-
-  // ── Phase 1: Dagre for component nodes only ──
+// ── Dagre fallback for component positions ─────────────────────────────────
+// Only used when the API response carries no precomputed layout.
+function dagreComponentPositions(compNodes, extNodes, activeEdges) {
   const g = new dagre.graphlib.Graph()
   g.setDefaultEdgeLabel(() => ({}))
   g.setGraph({
@@ -166,31 +160,15 @@ function buildLayeredGraph(apiData, activeLayers) {
     marginy: 20,
     ranker: 'network-simplex',
   })
-
-  const { nodes: compNodes, edges: compEdges, external_nodes: extNodesRaw = [] } = apiData.components
-  const showCrossApp = activeLayers.crossapp !== false
-  const extNodes = showCrossApp ? extNodesRaw : []
-  const extIds = new Set(extNodes.map(n => n.id))
-  compNodes.forEach(n => {
-    const dims = NODE_DIMS.service
-    g.setNode(n.id, { width: dims.w + PAD_X, height: dims.h + PAD_Y })
-  })
-  extNodes.forEach(n => {
-    const dims = NODE_DIMS.service
-    g.setNode(n.id, { width: dims.w + PAD_X, height: dims.h + PAD_Y })
-  })
-  // Only include edges that have both endpoints in the graph
-  const activeEdges = compEdges.filter(e => {
-    const isCross = extIds.has(e.source) || extIds.has(e.target)
-    return !isCross || showCrossApp
-  })
+  const dims = NODE_DIMS.service
+  compNodes.forEach(n => g.setNode(n.id, { width: dims.w + PAD_X, height: dims.h + PAD_Y }))
+  extNodes.forEach(n => g.setNode(n.id, { width: dims.w + PAD_X, height: dims.h + PAD_Y }))
   activeEdges.forEach(e => {
     g.setEdge(e.source, e.target, { weight: 1, minlen: 1 })
   })
 
   dagre.layout(g)
 
-  // Collect component center positions (including external nodes)
   const compPos = {}
   compNodes.forEach(n => {
     const p = g.node(n.id)
@@ -200,6 +178,40 @@ function buildLayeredGraph(apiData, activeLayers) {
     const p = g.node(n.id)
     if (p) compPos[n.id] = { x: p.x, y: p.y }
   })
+  return compPos
+}
+
+// ── Build layered graph (two-phase layout) ──────────────────────────────────
+// Phase 1: Component-to-component layout (LR flow) — precomputed by the
+//          backend (components.layout), dagre as fallback
+// Phase 2: Manual positioning of platform/datacenter/indicator rows below
+function buildLayeredGraph(apiData, activeLayers) {
+  if (!apiData) return { nodes: [], edges: [] }
+
+  const VERTICAL_GAP = 80
+
+  // ── Phase 1: component nodes only ──
+  const { nodes: compNodes, edges: compEdges, external_nodes: extNodesRaw = [], layout } = apiData.components
+  const showCrossApp = activeLayers.crossapp !== false
+  const extNodes = showCrossApp ? extNodesRaw : []
+  const extIds = new Set(extNodes.map(n => n.id))
+  // Only include edges that have both endpoints in the graph
+  const activeEdges = compEdges.filter(e => {
+    const isCross = extIds.has(e.source) || extIds.has(e.target)
+    return !isCross || showCrossApp
+  })
+
+  const serverPos = layout?.[showCrossApp ? 'positions' : 'internal_positions']
+  let compPos
+  if (serverPos) {
+    compPos = {}
+    for (const n of [...compNodes, ...extNodes]) {
+      const p = serverPos[n.id]
+      if (p) compPos[n.id] = { x: p.x, y: p.y }
+    }
+  } else {
+    compPos = dagreComponentPositions(compNodes, extNodes, activeEdges)
+  }
 
   // ── Enforce upstream/downstream separation ──
   // Push upstream external nodes to a column LEFT of all components,
@@ -330,7 +330,7 @@ export default function GraphExplorer() {
 
   // Load service list once
   useEffect(() => {
-    fetch('/api/graph/nodes')
+    fetch('/api/graph/nodes?fields=id,label,status,seal')
       .then(r => r.json())
       .then(setServiceList)
       .catch(() => {})
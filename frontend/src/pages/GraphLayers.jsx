@@ -575,6 +575,23 @@ function NodeDetailPanel({ node, onGoToApp, onJumpToSeal }) {
 
 
 // ── Main page ───────────────────────────────────────────────────────────────
+const GRAPH_REFRESH_MS = 30000
+
+// Patch component/external node statuses from a /api/graph/diff response
+function applyStatusChanges(apiData, diff) {
+  const next = new Map(diff.status_changes.map(c => [c.id, c.status]))
+  const patch = n => (next.has(n.id) ? { ...n, status: next.get(n.id) } : n)
+  return {
+    ...apiData,
+    versions: diff.to,
+    components: {
+      ...apiData.components,
+      nodes: apiData.components.nodes.map(patch),
+      external_nodes: (apiData.components.external_nodes || []).map(patch),
+    },
+  }
+}
+
 export default function GraphLayers() {
   const { activeFilters, filteredApps, searchText } = useFilters()
   const navigate = useNavigate()
@@ -667,6 +684,34 @@ export default function GraphLayers() {
       .finally(() => setLoading(false))
   }, [selectedSeal])
 
+  // Periodic refresh — health-only changes arrive as status deltas; a topology
+  // change (or versions too old to diff) refetches the full layer graph
+  const versionsRef = useRef(null)
+  useEffect(() => { versionsRef.current = apiData?.versions || null }, [apiData])
+  useEffect(() => {
+    if (!selectedSeal) return
+    const timer = setInterval(() => {
+      const v = versionsRef.current
+      if (!v) return
+      fetch(`/api/graph/diff?view=layers&id=${selectedSeal}&since_topology=${v.topology}&since_health=${v.health}`)
+        .then(r => (r.ok ? r.json() : null))
+        .then(diff => {
+          if (!diff) return
+          if (diff.full_refresh || diff.to.topology !== v.topology) {
+            return fetch(`/api/graph/layers/${selectedSeal}`)
+              .then(r => (r.ok ? r.json() : null))
+              .then(data => { if (data) setApiData(prev => (prev?.seal === data.seal ? data : prev)) })
+          }
+          if (diff.status_changes.length > 0) {
+            setApiData(prev => (prev?.seal === diff.id ? applyStatusChanges(prev, diff) : prev))
+          }
+          else versionsRef.current = diff.to
+        })
+        .catch(() => {})
+    }, GRAPH_REFRESH_MS)
+    return () => clearInterval(timer)
+  }, [selectedSeal])
+
   const toggleLayer = useCallback((key) => {
     setLayers(prev => {
       const next = { ...prev, [key]: !prev[key] }